@@ -0,0 +1,94 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_incremental
+###  A meet's results report grows an event at a time, and every save has all the events
+###  before it.  Replay that with the pages of a results report (the first event, the
+###  first two, ...) and time each save written in full against -I/--incremental,
+###  which only parses and writes the events whose pages changed.
+###
+###    benchmark_incremental.py
+###    benchmark_incremental.py -r ../data/2021_dac_champs/results.txt -n 5
+#############################################################################################
+#############################################################################################
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import generate_wirecast_files as gen_wc_files
+import sst_module_page_index as sst_page_index
+
+
+def write_results_so_far( results_filename: str, partial_filename: str, num_events: int ):
+    """ The report as it is after its first num_events events """
+
+    meet_name, meet_date, license_name, report_type, report_type_meet_name = gen_wc_files.get_report_header_info( results_filename )
+    with sst_page_index.PageIndex( results_filename, license_name ) as page_index:
+        event_nums = []
+        for page in page_index.get_pages():
+            if page.event_num not in event_nums:
+                event_nums.append( page.event_num )
+        pages = page_index.get_pages( event_nums[:num_events] )
+        with open( partial_filename, "wb" ) as partial_file:
+            partial_file.write( page_index.mm[:page_index.pages[0].start] )
+            for page in pages:
+                partial_file.write( page_index.mm[page.start:page.end] )
+        return len( event_nums )
+
+
+def time_generate( report_dir: str, output_dir: str, options: list ) -> float:
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout( io.StringIO() ):
+        gen_wc_files.generate_wc_files( ['-i', report_dir, '-f', 'results.txt', '-o', output_dir, '-C', '-a', '-v', 'error'] + options )
+    return (time.perf_counter() - start_time) * 1000
+
+
+def process_main():
+    default_report = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..', 'data', '2022_divii', 'results.txt' )
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--report',       dest='report',      default=default_report,     help="Results report, with its schools.txt next to it")
+    parser.add_argument('-n', '--iterations',   dest='iterations',  type=int, default=3,        help="Replays of the meet, the median of each save is shown")
+    args = parser.parse_args()
+
+    report_dir = os.path.dirname( os.path.abspath( args.report ) )
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        partial_dir = os.path.join( work_dir, 'reports' )
+        os.makedirs( partial_dir )
+        shutil.copy( os.path.join( report_dir, 'schools.txt' ), partial_dir )
+        partial_filename = os.path.join( partial_dir, 'results.txt' )
+        num_events = write_results_so_far( args.report, partial_filename, 1 )
+
+        full_ms = [ [] for num_saved in range( num_events ) ]
+        incremental_ms = [ [] for num_saved in range( num_events ) ]
+        for iteration in range( args.iterations ):
+            full_dir = os.path.join( work_dir, f"full_{iteration}" )
+            incremental_dir = os.path.join( work_dir, f"incremental_{iteration}" )
+            for num_saved in range( num_events ):
+                write_results_so_far( args.report, partial_filename, num_saved + 1 )
+                full_ms[num_saved].append( time_generate( partial_dir, full_dir, [] ) )
+                incremental_ms[num_saved].append( time_generate( partial_dir, incremental_dir, ['-I'] ) )
+
+    print(f"{'events':>6} {'full ms':>8} {'-I ms':>7}")
+    for num_saved in range( num_events ):
+        print(f"{num_saved + 1:>6} {statistics.median( full_ms[num_saved] ):>8.1f} {statistics.median( incremental_ms[num_saved] ):>7.1f}")
+
+    ## How much longer a save takes at the end of the meet than at the start
+    num_compared = max( num_events // 4, 1 )
+    for name, save_ms in ( ('full', full_ms), ('-I', incremental_ms) ):
+        first_ms = statistics.mean( statistics.median( times ) for times in save_ms[:num_compared] )
+        last_ms = statistics.mean( statistics.median( times ) for times in save_ms[-num_compared:] )
+        print(f"{name:>4}: first {num_compared} saves {first_ms:.1f} ms, last {num_compared} saves {last_ms:.1f} ms ({last_ms / first_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    process_main()
@@ -0,0 +1,173 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_line_classifier
+###  Compare deciding what each report line is with the line classifier (one match)
+###  against the chains of tests the results and program parsers ran on every line:
+###  the license name search, startswith event/(event/heat, the place/lane regex and
+###  the relay swimmer names search.
+###
+###  Only the classification is timed, not pulling out the fields.  Both ways must
+###  find the same kinds of lines.
+###
+###    benchmark_line_classifier.py
+###    benchmark_line_classifier.py -r ../data/2022_vcac_champs/program.txt -n 500
+#############################################################################################
+#############################################################################################
+
+import argparse
+import glob
+import os
+import re
+import statistics
+import time
+
+import generate_wirecast_files as gen_wc_files
+import sst_module_line_classifier as sst_line_classifier
+import sst_module_pipeline as sst_pipeline
+
+
+#####################################################################################
+## The tests as sst_module_results.process_result ran them, in order.
+## Place lines and --- lines were one test there
+#####################################################################################
+def classify_results_chain( lines: list, mm_license_name: str ) -> list:
+
+    re_results_lane = re.compile('^([*]?\d{1,2} )|(--- )')
+    re_results_check_relay_name_line = re.compile('1\)')
+
+    line_kinds = []
+    for line in lines:
+        if re.search("^%s" % mm_license_name, line):
+            line_kinds.append( sst_line_classifier.LINE_LICENSE )
+        elif line.lower().startswith(("event")):
+            line_kinds.append( sst_line_classifier.LINE_EVENT )
+        elif line.lower().startswith(("(event")):
+            line_kinds.append( sst_line_classifier.LINE_EVENT_CONTINUED )
+        elif re.search("^[1-9] ", line) or re_results_lane.search(line):
+            line_kinds.append( sst_line_classifier.LINE_LANE )
+        elif re_results_check_relay_name_line.search(line):
+            line_kinds.append( sst_line_classifier.LINE_RELAY_NAMES )
+        else:
+            line_kinds.append( sst_line_classifier.LINE_OTHER )
+    return line_kinds
+
+
+#####################################################################################
+## The tests as sst_module_program.process_program ran them, in order
+#####################################################################################
+def classify_program_chain( lines: list, mm_license_name: str ) -> list:
+
+    re_program_lane = re.compile('^[*]?\d{1,2} ')
+    re_program_check_relay_name_line = re.compile('1\)')
+
+    line_kinds = []
+    for line in lines:
+        if re.search("^%s" % mm_license_name, line):
+            line_kinds.append( sst_line_classifier.LINE_LICENSE )
+        elif line.lower().startswith(("event")):
+            line_kinds.append( sst_line_classifier.LINE_EVENT )
+        elif line.lower().startswith(("heat", "flight")):
+            line_kinds.append( sst_line_classifier.LINE_HEAT )
+        elif re_program_lane.search(line):
+            line_kinds.append( sst_line_classifier.LINE_LANE )
+        elif re_program_check_relay_name_line.search(line):
+            line_kinds.append( sst_line_classifier.LINE_RELAY_NAMES )
+        else:
+            line_kinds.append( sst_line_classifier.LINE_OTHER )
+    return line_kinds
+
+
+def classify_lines( lines: list, mm_license_name: str ) -> list:
+
+    line_classifier = sst_line_classifier.LineClassifier( mm_license_name )
+    return [ line_classifier.classify( line ) for line in lines ]
+
+
+def get_chain_kinds( line_kinds: list, chain_kinds: tuple ) -> list:
+    """ The classifier's kinds, as the chain for one parser tells them apart """
+
+    chain_line_kinds = []
+    for line_kind in line_kinds:
+        if line_kind == sst_line_classifier.LINE_UNPLACED:
+            line_kind = sst_line_classifier.LINE_LANE
+        chain_line_kinds.append( line_kind if line_kind in chain_kinds else sst_line_classifier.LINE_OTHER )
+    return chain_line_kinds
+
+
+def time_classify( classify_fns: list, lines: list, mm_license_name: str, iterations: int ) -> list:
+    """ Median milliseconds per pass over the lines for each classify function, taken in turns """
+
+    times_ms = [ [] for classify_fn in classify_fns ]
+    for iteration in range( iterations ):
+        for classify_num, classify_fn in enumerate( classify_fns ):
+            start_time = time.perf_counter()
+            classify_fn( lines, mm_license_name )
+            times_ms[classify_num].append( (time.perf_counter() - start_time) * 1000 )
+    return [ statistics.median( classify_times_ms ) for classify_times_ms in times_ms ]
+
+
+def benchmark_report( report_filename: str, iterations: int ) -> dict:
+
+    report_lines = list( sst_pipeline.read_lines( report_filename ) )
+    meet_name, meet_date, license_name, report_type, report_type_meet_name = gen_wc_files.get_report_header_info_from_lines( report_lines )
+
+    ## The parsers classify stripped, non blank lines
+    lines = [ line.strip() for line in report_lines if line.strip() ]
+
+    if report_type == 'Meet Program':
+        chain_fn = classify_program_chain
+        chain_kinds = ( sst_line_classifier.LINE_LICENSE, sst_line_classifier.LINE_EVENT, sst_line_classifier.LINE_HEAT,
+                        sst_line_classifier.LINE_LANE, sst_line_classifier.LINE_RELAY_NAMES )
+    else:
+        chain_fn = classify_results_chain
+        chain_kinds = ( sst_line_classifier.LINE_LICENSE, sst_line_classifier.LINE_EVENT, sst_line_classifier.LINE_EVENT_CONTINUED,
+                        sst_line_classifier.LINE_LANE, sst_line_classifier.LINE_RELAY_NAMES )
+
+    if get_chain_kinds( classify_lines( lines, license_name ), chain_kinds ) != chain_fn( lines, license_name ):
+        raise RuntimeError( "the classifier and the test chain found different kinds of lines" )
+
+    chain_ms, classifier_ms = time_classify( [ chain_fn, classify_lines ], lines, license_name, iterations )
+
+    return { "lines": len(lines),
+             "chain_ms": chain_ms,
+             "classifier_ms": classifier_ms,
+             "speedup": chain_ms / classifier_ms if classifier_ms else 0.0 }
+
+
+def process_main():
+    report_root = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..' )
+    default_reports = [ os.path.join( report_root, 'data', '*', '*.txt' ), os.path.join( report_root, 'reports', '*', '*.txt' ) ]
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--report',       dest='reports',     action='append',
+                                                                    help=f"Report to classify. Repeat for more than one. Default: {' '.join(default_reports)}")
+    parser.add_argument('-n', '--iterations',   dest='iterations',  type=int, default=200,      help="Passes over each report per way, the median is shown")
+    args = parser.parse_args()
+
+    reports = args.reports or sorted( report_filename for pattern in default_reports for report_filename in glob.glob( pattern )
+                                      if os.path.basename( report_filename ) != 'schools.txt' )
+
+    print(f"{'report':<62} {'lines':>6} {'chain ms':>9} {'match ms':>9} {'speedup':>8}")
+    chain_total = 0.0
+    classifier_total = 0.0
+    for report_filename in reports:
+        report_name = os.path.relpath( report_filename )
+        try:
+            result = benchmark_report( report_filename, args.iterations )
+        except Exception as error:
+            print(f"{report_name:<62} not classified: {type(error).__name__} {error}")
+            continue
+
+        chain_total += result["chain_ms"]
+        classifier_total += result["classifier_ms"]
+        print(f"{report_name:<62} {result['lines']:>6} {result['chain_ms']:>9.3f} {result['classifier_ms']:>9.3f} {result['speedup']:>7.2f}x")
+
+    if classifier_total:
+        print(f"{'total':<62} {'':>6} {chain_total:>9.3f} {classifier_total:>9.3f} {chain_total / classifier_total:>7.2f}x")
+
+
+if __name__ == "__main__":
+    process_main()
@@ -0,0 +1,84 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_parallel
+###  Time generate_wirecast_files on one process against -j/--jobs processes, for
+###  programs of growing size (synthetic programs made by repeating the pages of the
+###  report, each copy with its own heat numbers), and show where -j starts paying off.
+###
+###  Each run is the whole run, starting the process pool and writing the files into
+###  a temp directory included.  Starting the pool is the fixed cost -j has to win back.
+###
+###    benchmark_parallel.py
+###    benchmark_parallel.py -j 4 -x 1,5,10,25,50 -n 3
+#############################################################################################
+#############################################################################################
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import generate_wirecast_files as gen_wc_files
+from benchmark_program_memory import write_synthetic_program
+
+
+def time_generate( report_dir: str, report_name: str, num_jobs: int, iterations: int ) -> float:
+    """ Median milliseconds of a run """
+
+    run_ms = []
+    for iteration in range( iterations ):
+        with tempfile.TemporaryDirectory() as output_dir:
+            start_time = time.perf_counter()
+            with contextlib.redirect_stdout( io.StringIO() ):
+                gen_wc_files.generate_wc_files( ['-i', report_dir, '-f', report_name, '-o', output_dir, '-j', str(num_jobs)] )
+            run_ms.append( (time.perf_counter() - start_time) * 1000 )
+    return statistics.median( run_ms )
+
+
+def process_main():
+    default_report = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..', 'data', '2022_vcac_champs', 'program.txt' )
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--report',       dest='report',      default=default_report,     help="Meet program report, with its schools.txt next to it")
+    parser.add_argument('-j', '--jobs',         dest='jobs',        type=int, default=max( os.cpu_count() or 1, 2 ),
+                                                                                                help="Processes for the -j runs. Default: the number of CPUs")
+    parser.add_argument('-x', '--times',        dest='times',       default="1,2,5,10,25,50",   help="Sizes of the synthetic programs, in copies of the report")
+    parser.add_argument('-n', '--iterations',   dest='iterations',  type=int, default=3,        help="Runs of each size, the median is shown")
+    args = parser.parse_args()
+
+    report_dir = os.path.dirname( os.path.abspath( args.report ) )
+    crossover = None
+
+    print(f"{os.cpu_count()} CPUs")
+    print(f"{'program':<24} {'lines':>8} {'1 process ms':>13} {f'-j {args.jobs} ms':>10} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        shutil.copy( os.path.join( report_dir, 'schools.txt' ), synthetic_dir )
+
+        for times in [ int( times ) for times in args.times.split(",") ]:
+            report_name = f"program_x{times}.txt"
+            write_synthetic_program( args.report, os.path.join( synthetic_dir, report_name ), times )
+            with open( os.path.join( synthetic_dir, report_name ), "r" ) as report_file:
+                num_lines = sum( 1 for line in report_file )
+
+            serial_ms = time_generate( synthetic_dir, report_name, 1, args.iterations )
+            parallel_ms = time_generate( synthetic_dir, report_name, args.jobs, args.iterations )
+            if crossover is None and parallel_ms < serial_ms:
+                crossover = ( report_name, num_lines )
+
+            print(f"{report_name:<24} {num_lines:>8} {serial_ms:>13.0f} {parallel_ms:>10.0f} {serial_ms / parallel_ms:>7.2f}x")
+
+    if crossover:
+        print(f"-j {args.jobs} is faster from {crossover[0]} ({crossover[1]} lines)")
+    else:
+        print(f"-j {args.jobs} is not faster for any of the sizes")
+
+
+if __name__ == "__main__":
+    process_main()
@@ -0,0 +1,86 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_parse_cache
+###  Time generate_wirecast_files without the -K parse cache against a cache miss (the
+###  report parsed and its pages saved) and a cache hit (the same report with other
+###  render options, written from the saved pages), for programs of growing size.
+###  Each run writes its files into a temp directory, the miss runs start with an
+###  empty cache.
+###
+###    benchmark_parse_cache.py
+###    benchmark_parse_cache.py -r ../data/2022_divii/results.txt -x 1 -n 10
+#############################################################################################
+#############################################################################################
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import generate_wirecast_files as gen_wc_files
+from benchmark_program_memory import write_synthetic_program
+
+
+## The options of the no cache and cache hit runs
+render_options = [ '-n', '3', '-R' ]
+
+
+def time_generate( report_dir: str, report_name: str, options: list, iterations: int, cache_dir: str = None, clear_cache: bool = False ) -> float:
+    """ Median milliseconds of a run """
+
+    run_ms = []
+    for iteration in range( iterations ):
+        if clear_cache:
+            shutil.rmtree( cache_dir, ignore_errors=True )
+        cache_options = [ '-K', cache_dir ] if cache_dir else []
+        with tempfile.TemporaryDirectory() as output_dir:
+            start_time = time.perf_counter()
+            with contextlib.redirect_stdout( io.StringIO() ):
+                gen_wc_files.generate_wc_files( ['-i', report_dir, '-f', report_name, '-o', output_dir] + options + cache_options )
+            run_ms.append( (time.perf_counter() - start_time) * 1000 )
+    return statistics.median( run_ms )
+
+
+def process_main():
+    default_report = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..', 'data', '2022_vcac_champs', 'program.txt' )
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--report',       dest='report',      default=default_report,     help="Program or Results report, with its schools.txt next to it")
+    parser.add_argument('-x', '--times',        dest='times',       default="1,10,50",          help="Sizes of the synthetic reports, in copies of a program. 1 only for a results report")
+    parser.add_argument('-n', '--iterations',   dest='iterations',  type=int, default=5,        help="Runs of each size, the median is shown")
+    args = parser.parse_args()
+
+    report_dir = os.path.dirname( os.path.abspath( args.report ) )
+
+    print(f"{'report':<24} {'lines':>8} {'no cache ms':>12} {'miss ms':>8} {'hit ms':>7} {'hit speedup':>12} {'cache KiB':>10}")
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        shutil.copy( os.path.join( report_dir, 'schools.txt' ), synthetic_dir )
+        cache_dir = os.path.join( synthetic_dir, 'cache' )
+
+        for times in [ int( times ) for times in args.times.split(",") ]:
+            report_name = f"report_x{times}.txt"
+            if times == 1:
+                shutil.copy( args.report, os.path.join( synthetic_dir, report_name ) )
+            else:
+                write_synthetic_program( args.report, os.path.join( synthetic_dir, report_name ), times )
+            with open( os.path.join( synthetic_dir, report_name ), "r", errors="replace" ) as report_file:
+                num_lines = sum( 1 for line in report_file )
+
+            no_cache_ms = time_generate( synthetic_dir, report_name, render_options, args.iterations )
+            miss_ms = time_generate( synthetic_dir, report_name, [], args.iterations, cache_dir, clear_cache=True )
+            ## Only the render options changed, so the pages saved by the last miss are used
+            hit_ms = time_generate( synthetic_dir, report_name, render_options, args.iterations, cache_dir )
+            cache_kib = sum( dir_entry.stat().st_size for dir_entry in os.scandir( cache_dir ) ) / 1024
+
+            print(f"{report_name:<24} {num_lines:>8} {no_cache_ms:>12.1f} {miss_ms:>8.1f} {hit_ms:>7.1f} {no_cache_ms / hit_ms:>11.2f}x {cache_kib:>10.0f}")
+
+
+if __name__ == "__main__":
+    process_main()
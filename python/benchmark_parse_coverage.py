@@ -0,0 +1,77 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_parse_coverage
+###  Time parsing a program and a results report with --parsecoverage off and on.  Off,
+###  the parsers run with the plain patterns, so the time is the same as without it.
+###  On, every pattern call is timed and every line counted.
+###
+###    benchmark_parse_coverage.py
+###    benchmark_parse_coverage.py -n 50
+#############################################################################################
+#############################################################################################
+
+import argparse
+import logging
+import os
+import statistics
+import time
+
+import generate_wirecast_files as gen_wc_files
+import sst_module_common as sst_common
+import sst_module_parse_coverage as sst_parse_coverage
+import sst_module_pipeline as sst_pipeline
+import sst_module_program as sst_program
+import sst_module_results as sst_results
+import sst_module_schools as sst_module_schools
+
+
+def parse_report( report_filename: str ) -> int:
+    """ Parse the report into its pages, nothing written.  Returns the number of pages """
+
+    meet_name, meet_date, license_name, report_type, report_type_meet_name = gen_wc_files.get_report_header_info( report_filename )
+    report_pages = sst_pipeline.split_pages( sst_pipeline.read_lines( report_filename ), license_name )
+    if report_type == 'Meet Program':
+        pages = sst_program.parse_program_pages( report_pages, license_name, False, True, False, False )
+    else:
+        pages = sst_results.parse_result_pages( report_pages, license_name, False, True, False, False, True )
+    return sum( 1 for page in pages )
+
+
+def time_parse( report_filename: str, iterations: int, coverage: bool ) -> float:
+    """ Median milliseconds to parse the report """
+
+    run_ms = []
+    for iteration in range( iterations ):
+        sst_common.start_run()
+        if coverage:
+            sst_parse_coverage.start_coverage()
+        start_time = time.perf_counter()
+        parse_report( report_filename )
+        run_ms.append( (time.perf_counter() - start_time) * 1000 )
+    return statistics.median( run_ms )
+
+
+def process_main():
+    data_dir = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..', 'data' )
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--iterations',   dest='iterations',  type=int, default=20,       help="Runs of each report, the median is shown")
+    args = parser.parse_args()
+
+    logging.basicConfig( format='%(message)s', level=logging.ERROR )
+    sst_common.setEvents( "HighSchool" )
+
+    print(f"{'report':<32} {'off ms':>8} {'on ms':>8} {'on/off':>7}")
+    for report_name in ( '2022_vcac_champs/program.txt', '2022_vcac_champs/results.txt', '2020_dac_champs/results.txt' ):
+        report_filename = os.path.join( data_dir, report_name )
+        sst_module_schools.load_schools_report( os.path.join( os.path.dirname( report_filename ), 'schools.txt' ) )
+        off_ms = time_parse( report_filename, args.iterations, False )
+        on_ms = time_parse( report_filename, args.iterations, True )
+        print(f"{report_name:<32} {off_ms:>8.2f} {on_ms:>8.2f} {on_ms / off_ms:>7.2f}")
+
+
+if __name__ == "__main__":
+    process_main()
@@ -0,0 +1,138 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_program_memory
+###  Peak memory of a meet program run, for the program as is and for a synthetic one
+###  made by repeating its pages (-x times, each copy with its own heat numbers so
+###  every heat still gets a file).
+###
+###  The report goes through sst_module_pipeline a page at a time, so the peak should
+###  stay about the same however big the report is.  Each size is run:
+###    generate   generate_wirecast_files, writing the files into a temp directory
+###    render     the pipeline stages without the writer, the files only rendered
+###
+###  generate also keeps the path of each file it writes, to skip writing a file twice
+###  in a run.  That is about 130 bytes a file, so it grows with the number of files.
+###
+###  Exits 1 if a peak is over the budget (-b KiB), so it can be run as a check.
+###
+###    benchmark_program_memory.py
+###    benchmark_program_memory.py -r ../data/2022_vcac_champs/program.txt -x 100 -b 1024
+#############################################################################################
+#############################################################################################
+
+import argparse
+import contextlib
+import io
+import itertools
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import generate_wirecast_files as gen_wc_files
+import sst_module_common as sst_common
+import sst_module_pipeline as sst_pipeline
+import sst_module_program as sst_program
+import sst_module_schools as sst_module_schools
+
+re_heat_line = re.compile(r'^(\s*(?:Heat|Flight)\s+)(\d+)', re.IGNORECASE)
+
+
+def write_synthetic_program( program_filename: str, synthetic_filename: str, times: int ) -> int:
+    """ The program's lines times times over.  Copy n adds n*1000 to the heat numbers """
+
+    with open( program_filename, "r" ) as program_file:
+        program_lines = program_file.readlines()
+
+    with open( synthetic_filename, "w" ) as synthetic_file:
+        for copy_num in range( times ):
+            for line in program_lines:
+                if copy_num:
+                    line = re_heat_line.sub( lambda heat: f"{heat.group(1)}{int(heat.group(2)) + copy_num * 1000}", line )
+                synthetic_file.write( line )
+
+    return os.path.getsize( synthetic_filename )
+
+
+def run_generate( report_dir: str, report_name: str, output_dir: str ) -> int:
+    with contextlib.redirect_stdout( io.StringIO() ):
+        return gen_wc_files.generate_wc_files( ['-i', report_dir, '-f', report_name, '-o', output_dir, '-T', 'program'] )
+
+
+def run_render( report_dir: str, report_name: str, output_dir: str ) -> int:
+    """ Line source -> page splitter -> record extractor -> renderer, nothing written """
+
+    report_filename = os.path.join( report_dir, report_name )
+    args = gen_wc_files.get_arg_parser().parse_args( ['-i', report_dir, '-f', report_name, '-o', report_dir] )
+    sst_common.start_run()
+    sst_common.setEvents( args.meettype )
+    sst_module_schools.load_schools_report( os.path.join( report_dir, args.schoolfilename ) )
+
+    report_lines = sst_pipeline.read_lines( report_filename )
+    header_lines = list( itertools.islice( report_lines, 3 ) )
+    license_name = gen_wc_files.get_report_header_info_from_lines( header_lines )[2]
+    report_pages = sst_pipeline.split_pages( itertools.chain( header_lines, report_lines ), license_name )
+
+    num_files = 0
+    for heat_page in sst_program.parse_program_pages( report_pages, license_name, args.shortschoolrelay, not args.longschoolindividual,
+                                                      args.namesfirstlast, args.quote ):
+        num_files += sum( 1 for output_file_name, output_str in
+                          sst_program.render_heat_page( heat_page, args.displayRelayNames, args.splitrelays, args.relayformat ) )
+    return num_files
+
+
+def measure( run_fn, report_dir: str, report_name: str ) -> tuple:
+    """ (files, peak KiB, seconds) of one run """
+
+    ## The first run loads the schools and compiles the regexes, so they are not counted as
+    ## part of the peak of the run being measured.  Removing the files written isn't either
+    with tempfile.TemporaryDirectory() as output_dir:
+        run_fn( report_dir, report_name, output_dir )
+
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        num_files = run_fn( report_dir, report_name, output_dir )
+        run_secs = time.perf_counter() - start_time
+        peak_kib = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    return num_files, peak_kib, run_secs
+
+
+def process_main() -> int:
+    default_report = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..', 'data', '2022_vcac_champs', 'program.txt' )
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--report',       dest='report',      default=default_report,     help="Meet program report, with its schools.txt next to it")
+    parser.add_argument('-x', '--times',        dest='times',       type=int, default=100,      help="Size of the synthetic program, in copies of the report")
+    parser.add_argument('-b', '--budget',       dest='budget_kib',  type=int, default=1024,     help="Peak memory allowed for any run, KiB")
+    args = parser.parse_args()
+
+    report_dir = os.path.dirname( os.path.abspath( args.report ) )
+    over_budget = False
+
+    print(f"{'program':<28} {'MiB':>7} {'run':<9} {'files':>7} {'peak KiB':>9} {'secs':>7}")
+    with tempfile.TemporaryDirectory() as synthetic_dir:
+        shutil.copy( os.path.join( report_dir, 'schools.txt' ), synthetic_dir )
+
+        for times in ( 1, args.times ):
+            report_name = f"program_x{times}.txt"
+            report_size = write_synthetic_program( args.report, os.path.join( synthetic_dir, report_name ), times )
+
+            for run_name, run_fn in ( ('generate', run_generate), ('render', run_render) ):
+                num_files, peak_kib, run_secs = measure( run_fn, synthetic_dir, report_name )
+                over_budget = over_budget or peak_kib > args.budget_kib
+                print(f"{report_name:<28} {report_size / (1024*1024):>7.1f} {run_name:<9} {num_files:>7} {peak_kib:>9.0f} {run_secs:>7.2f}"
+                      f"{'  OVER BUDGET' if peak_kib > args.budget_kib else ''}")
+
+    print(f"Budget {args.budget_kib} KiB: {'over' if over_budget else 'ok'}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit( process_main() )
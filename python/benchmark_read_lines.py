@@ -0,0 +1,100 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_read_lines
+###  Reading a report's lines the old way against sst_module_pipeline.read_lines.
+###    old   open() with the platform encoding, then remove_accents (NFKD and a
+###          combining() check for each character) on every line, as the results
+###          parser did
+###    new   the encoding detected once, the file decoded as it is read and only the
+###          lines that aren't plain ASCII normalized, for every parser
+###  The accents columns time only the accent removal on lines already read.
+###
+###    benchmark_read_lines.py
+###    benchmark_read_lines.py -r ../data/2022_divii/results.txt -n 200
+#############################################################################################
+#############################################################################################
+
+import argparse
+import glob
+import os
+import statistics
+import time
+import unicodedata
+
+import sst_module_common as sst_common
+import sst_module_pipeline as sst_pipeline
+
+
+def old_remove_accents( input_str: str ) -> str:
+    nfkd_form = unicodedata.normalize('NFKD', input_str)
+    return u"".join([c for c in nfkd_form if not unicodedata.combining(c)])
+
+
+def read_lines_old( report_filename: str ) -> list:
+    with open( report_filename, "r" ) as report_file:
+        return [ old_remove_accents( line ) for line in report_file ]
+
+
+def read_lines_new( report_filename: str ) -> list:
+    return list( sst_pipeline.read_lines( report_filename ) )
+
+
+def read_lines_decoded( report_filename: str ) -> list:
+    """ The lines decoded, accents still in them """
+    with open( report_filename, "r", encoding=sst_pipeline.get_report_encoding( report_filename ), errors="replace" ) as report_file:
+        return report_file.readlines()
+
+
+def time_ms( fn, arg, iterations: int ) -> float:
+    times_ms = []
+    for iteration in range( iterations ):
+        start_time = time.perf_counter()
+        fn( arg )
+        times_ms.append( (time.perf_counter() - start_time) * 1000 )
+    return statistics.median( times_ms )
+
+
+def process_main():
+    report_root = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..', 'data' )
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--report',       dest='reports',     action='append',
+                                                                    help="Report. Repeat for more than one. Default: every report in data/")
+    parser.add_argument('-n', '--iterations',   dest='iterations',  type=int, default=100,      help="Runs of each report, the median is shown")
+    args = parser.parse_args()
+
+    reports = args.reports or sorted( report_filename for report_filename in glob.glob( os.path.join( report_root, '*', '*.txt' ) )
+                                      if os.path.basename( report_filename ) != 'schools.txt' )
+
+    print(f"{'report':<40} {'encoding':>9} {'lines':>6} {'non ASCII':>9} {'old ms':>7} {'new ms':>7} {'speedup':>8} "
+          f"{'accents old ms':>15} {'new ms':>7}")
+    total_old_ms = 0
+    total_new_ms = 0
+    for report_filename in reports:
+        report_name = os.path.relpath( report_filename )
+        try:
+            report_lines = read_lines_decoded( report_filename )
+            old_ms = time_ms( read_lines_old, report_filename, args.iterations )
+        except UnicodeDecodeError as error:
+            ## The platform encoding can't read every report
+            print(f"{report_name:<40} old way can't read it: {error}")
+            continue
+        new_ms = time_ms( read_lines_new, report_filename, args.iterations )
+        accents_old_ms = time_ms( lambda lines: [ old_remove_accents( line ) for line in lines ], report_lines, args.iterations )
+        accents_new_ms = time_ms( lambda lines: [ sst_common.remove_accents( line ) for line in lines ], report_lines, args.iterations )
+        total_old_ms += old_ms
+        total_new_ms += new_ms
+
+        print(f"{report_name:<40} {sst_pipeline.get_report_encoding( report_filename ):>9} {len(report_lines):>6} "
+              f"{sum( 1 for line in report_lines if not line.isascii() ):>9} {old_ms:>7.2f} {new_ms:>7.2f} {old_ms / new_ms:>7.2f}x "
+              f"{accents_old_ms:>15.2f} {accents_new_ms:>7.2f}")
+
+    if total_new_ms:
+        print(f"{'total':<40} {'':>9} {'':>6} {'':>9} {total_old_ms:>7.2f} {total_new_ms:>7.2f} {total_old_ms / total_new_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    process_main()
@@ -0,0 +1,132 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_records
+###  Size and speed of the parsed pages kept as records (sst_module_records) against
+###  the same pages kept as already formatted lines, the way the parsers stored them
+###  before: one ('PLACE'/'LANE'/'NAME', text) tuple per row.
+###
+###  Each report is run like generate_wirecast_files runs it (into a temp directory),
+###  split into parse and render time.  The size is every object the pages hold,
+###  each counted once.  Formatting every entry is the work the parsers did for each
+###  row before; now the renderers only do it for the rows they write.
+###
+###    benchmark_records.py
+###    benchmark_records.py -r ../data/2022_vcac_champs/program.txt -n 50
+#############################################################################################
+#############################################################################################
+
+import argparse
+import contextlib
+import glob
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import generate_wirecast_files as gen_wc_files
+import sst_module_common as sst_common
+import sst_module_program as sst_program
+import sst_module_records as sst_records
+import sst_module_results as sst_results
+
+
+def get_deep_size( obj, seen: set ) -> int:
+    """ Bytes of obj and everything it holds that hasn't been counted yet """
+
+    if obj is None or isinstance( obj, (bool, int) ) or id(obj) in seen:
+        return 0
+    seen.add( id(obj) )
+
+    size = sys.getsizeof( obj )
+    if isinstance( obj, (list, tuple) ):
+        size += sum( get_deep_size( item, seen ) for item in obj )
+    elif hasattr( type(obj), '__slots__' ):
+        size += sum( get_deep_size( getattr( obj, slot, None ), seen ) for slot in type(obj).__slots__ )
+    return size
+
+
+def get_row_text( page, row ) -> str:
+    if isinstance( row, sst_records.ResultRow ):
+        return sst_results.get_place_text( page, row )
+    if isinstance( row, sst_records.ProgramEntry ):
+        return sst_program.get_lane_text( page, row )
+    return row.line
+
+
+def get_formatted_pages( pages: list ) -> list:
+    """ The pages as lists of (row_type, text), like the parsers' output_list """
+    return [ [ ( row.row_type, get_row_text( page, row ) ) for row in page.rows ] for page in pages ]
+
+
+def time_format( pages: list ) -> float:
+    start_time = time.perf_counter()
+    for page in pages:
+        for row in page.rows:
+            if row.row_type in ('PLACE', 'LANE'):
+                get_row_text( page, row )
+    return (time.perf_counter() - start_time) * 1000
+
+
+def benchmark_report( report_filename: str, iterations: int, generate_argv: list ) -> dict:
+
+    report_dir = os.path.dirname( report_filename )
+    with tempfile.TemporaryDirectory() as output_dir:
+        argv = ['-i', report_dir, '-f', os.path.basename(report_filename), '-o', output_dir] + generate_argv
+
+        run_ms = []
+        render_ms = []
+        for iteration in range( iterations ):
+            start_time = time.perf_counter()
+            with contextlib.redirect_stdout( io.StringIO() ):
+                gen_wc_files.generate_wc_files( argv, keep_parsed_pages=True )
+            run_ms.append( (time.perf_counter() - start_time) * 1000 )
+            render_ms.append( sst_common.run_state.stats.get( 'render_secs', 0 ) * 1000 )
+
+    pages = [ page for page_type, page_key, page in sst_common.run_state.parsed_pages if page_type in ('results', 'program') ]
+    format_ms = statistics.median( time_format( pages ) for iteration in range( iterations ) )
+
+    return { "entries": sum( 1 for page in pages for row in page.rows if row.row_type in ('PLACE', 'LANE') ),
+             "records_kib": get_deep_size( pages, set() ) / 1024,
+             "lines_kib": get_deep_size( get_formatted_pages( pages ), set() ) / 1024,
+             "parse_ms": statistics.median( run_ms ) - statistics.median( render_ms ),
+             "render_ms": statistics.median( render_ms ),
+             "format_ms": format_ms }
+
+
+def process_main():
+    report_root = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..', 'data' )
+    default_reports = [ os.path.join( report_root, '*', 'results.txt' ), os.path.join( report_root, '*', 'program.txt' ) ]
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--report',       dest='reports',     action='append',
+                                                                    help=f"Program or results report. Repeat for more than one. Default: {' '.join(default_reports)}")
+    parser.add_argument('-n', '--iterations',   dest='iterations',  type=int, default=20,       help="Runs of each report, the median is shown")
+    args, generate_argv = parser.parse_known_args()
+
+    ## Any other options are generate_wirecast_files options, like -C or -r
+    if not generate_argv:
+        generate_argv = ['-C', '-a']
+
+    reports = args.reports or sorted( report_filename for pattern in default_reports for report_filename in glob.glob( pattern ) )
+
+    print(f"{'report':<40} {'entries':>8} {'records KiB':>12} {'lines KiB':>10} {'parse ms':>9} {'render ms':>10} {'format all ms':>14}")
+    for report_filename in reports:
+        report_name = os.path.relpath( report_filename )
+        try:
+            result = benchmark_report( report_filename, args.iterations, generate_argv )
+        except BaseException as error:
+            ## generate_wirecast_files exits on a report it can't finish
+            print(f"{report_name:<40} not run: {type(error).__name__} {error}")
+            continue
+
+        print(f"{report_name:<40} {result['entries']:>8} {result['records_kib']:>12.1f} {result['lines_kib']:>10.1f} "
+              f"{result['parse_ms']:>9.2f} {result['render_ms']:>10.2f} {result['format_ms']:>14.2f}")
+
+
+if __name__ == "__main__":
+    process_main()
@@ -0,0 +1,138 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_results_engine
+###  Compare parsing a results report in one pass (the header, results/awards and
+###  the team scores from the same lines) with the three passes it took before:
+###  the header, the results and the scores each reading and scanning the file.
+###
+###  Only parsing is timed.  Both ways produce the same pages and write the same files.
+###
+###    benchmark_results_engine.py
+###    benchmark_results_engine.py -r ../data/2022_vcac_champs/results.txt -n 200
+#############################################################################################
+#############################################################################################
+
+import argparse
+import glob
+import os
+import statistics
+import time
+
+import generate_wirecast_files as gen_wc_files
+import sst_module_common as sst_common
+import sst_module_pipeline as sst_pipeline
+import sst_module_results as sst_results
+import sst_module_results_scores as sst_result_scores
+import sst_module_schools as sst_module_schools
+
+
+def get_parse_options( args: argparse.Namespace ) -> tuple:
+    """ parse_result_pages options after the license name, as generate_wirecast_files passes them """
+    return ( args.shortschoolrelay, not args.longschoolindividual, args.namesfirstlast, args.quote, args.championshipmeet )
+
+
+#####################################################################################
+## The old way: the header, the results and the scores each read the report
+#####################################################################################
+def parse_three_pass( report_filename: str, args: argparse.Namespace ) -> int:
+
+    meet_name, meet_date, license_name, report_type, report_type_meet_name = gen_wc_files.get_report_header_info( report_filename )
+
+    report_lines = list( sst_pipeline.read_lines( report_filename ) )
+    num_pages = sum( 1 for page in sst_results.parse_result_pages( sst_pipeline.split_pages( report_lines, license_name ), license_name, *get_parse_options( args ), parse_scores=False ) )
+
+    scores_parser = sst_result_scores.ResultsScoresParser( license_name )
+    with open( report_filename, "r" ) as report_file:
+        for line in report_file:
+            line = line.strip()
+            if line:
+                scores_parser.parse_line( line )
+
+    return num_pages + 1
+
+
+#####################################################################################
+## One pass: the report is read once and every parser works from the same lines
+#####################################################################################
+def parse_one_pass( report_filename: str, args: argparse.Namespace ) -> int:
+
+    report_lines = list( sst_pipeline.read_lines( report_filename ) )
+    meet_name, meet_date, license_name, report_type, report_type_meet_name = gen_wc_files.get_report_header_info_from_lines( report_lines )
+
+    return sum( 1 for page in sst_results.parse_result_pages( sst_pipeline.split_pages( report_lines, license_name ), license_name, *get_parse_options( args ) ) )
+
+
+def time_parses( parse_fns: list, report_filename: str, args: argparse.Namespace, iterations: int ) -> list:
+    """ Median milliseconds per parse for each parse function.  Taken in turns so a
+        busy machine slows them all the same """
+
+    times_ms = [ [] for parse_fn in parse_fns ]
+    for iteration in range( iterations ):
+        for parse_num, parse_fn in enumerate( parse_fns ):
+            start_time = time.perf_counter()
+            parse_fn( report_filename, args )
+            times_ms[parse_num].append( (time.perf_counter() - start_time) * 1000 )
+    return [ statistics.median( parse_times_ms ) for parse_times_ms in times_ms ]
+
+
+def benchmark_report( report_filename: str, iterations: int, generate_argv: list ) -> dict:
+
+    report_dir = os.path.dirname( report_filename )
+    args = gen_wc_files.get_arg_parser().parse_args( ['-i', report_dir, '-f', os.path.basename(report_filename)] + generate_argv )
+
+    sst_common.start_run()
+    sst_common.setEvents( args.meettype )
+    sst_module_schools.load_schools_report( os.path.join( report_dir, args.schoolfilename ) )
+
+    ## Warm up, and both ways must find the same pages
+    num_pages = parse_one_pass( report_filename, args )
+    if parse_three_pass( report_filename, args ) != num_pages:
+        raise RuntimeError( "one pass and three pass parses found different pages" )
+
+    three_pass_ms, one_pass_ms = time_parses( [ parse_three_pass, parse_one_pass ], report_filename, args, iterations )
+
+    return { "pages": num_pages,
+             "three_pass_ms": three_pass_ms,
+             "one_pass_ms": one_pass_ms,
+             "speedup": three_pass_ms / one_pass_ms if one_pass_ms else 0.0 }
+
+
+def process_main():
+    default_reports = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..', 'data', '*', 'results.txt' )
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--report',       dest='reports',     action='append',
+                                                                    help=f"Results report to parse. Repeat for more than one. Default: {default_reports}")
+    parser.add_argument('-n', '--iterations',   dest='iterations',  type=int, default=50,       help="Parses of each report per way, the median is shown")
+    args, generate_argv = parser.parse_known_args()
+
+    ## Any other options are generate_wirecast_files options, like -C or -m JV
+    if not generate_argv:
+        generate_argv = ['-C']
+
+    reports = args.reports or sorted( glob.glob( default_reports ) )
+
+    print(f"{'report':<45} {'pages':>6} {'3 pass ms':>10} {'1 pass ms':>10} {'speedup':>8}")
+    three_pass_total = 0.0
+    one_pass_total = 0.0
+    for report_filename in reports:
+        report_name = os.path.relpath( report_filename )
+        try:
+            result = benchmark_report( report_filename, args.iterations, generate_argv )
+        except Exception as error:
+            print(f"{report_name:<45} not parsed: {type(error).__name__} {error}")
+            continue
+
+        three_pass_total += result["three_pass_ms"]
+        one_pass_total += result["one_pass_ms"]
+        print(f"{report_name:<45} {result['pages']:>6} {result['three_pass_ms']:>10.2f} {result['one_pass_ms']:>10.2f} {result['speedup']:>7.2f}x")
+
+    if one_pass_total:
+        print(f"{'total':<45} {'':>6} {three_pass_total:>10.2f} {one_pass_total:>10.2f} {three_pass_total / one_pass_total:>7.2f}x")
+
+
+if __name__ == "__main__":
+    process_main()
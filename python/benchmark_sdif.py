@@ -0,0 +1,182 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_sdif
+###  Time a results report read from its text export against the same meet read from a
+###  Hy-Tek SDIF (.cl2) export.  The .cl2 file is made from the pages parsed out of the
+###  text report (the schools looked up again in schools.txt for their team codes), so
+###  both have the same events, places and relay swimmers.
+###  Shown are the parse alone (report to pages) and the whole run with the files written.
+###
+###    benchmark_sdif.py
+###    benchmark_sdif.py -r ../data/2021_dac_champs/results.txt -x 10 -n 10
+#############################################################################################
+#############################################################################################
+
+import argparse
+import contextlib
+import io
+import itertools
+import logging
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import time
+
+import generate_wirecast_files as gen_wc_files
+import sst_module_common as sst_common
+import sst_module_pipeline as sst_pipeline
+import sst_module_records as sst_records
+import sst_module_results as sst_results
+import sst_module_schools as sst_module_schools
+import sst_module_sdif as sst_sdif
+
+
+re_event_name = re.compile( r'^Event\s+\d+\s+(Boys|Girls|Mixed)\s+(\d+)\s+(Yard|Meter|LC Meter|mtr)\s+(.*)$' )
+stroke_codes = { stroke_name: stroke_code for stroke_code, stroke_name in sst_sdif.stroke_names.items() }
+sex_codes = { sex_name: sex_code for sex_code, sex_name in sst_sdif.event_sex_names.items() }
+
+
+def format_record( record_code: str, values: dict ) -> str:
+    """ A 160 column SDIF record with the values at their sst_sdif.sdif_fields columns """
+
+    record = list( record_code.ljust( sst_sdif.sdif_record_len ) )
+    for field_name, value in values.items():
+        start, length = sst_sdif.sdif_fields[record_code][field_name]
+        record[start-1:start-1+length] = f"{value}"[:length].ljust( length )
+    return "".join( record ) + "\n"
+
+
+def write_sdif_results( results_filename: str, cl2_filename: str, times: int ):
+    """ The text results report as a .cl2 file, its swims repeated times times """
+
+    meet_name, meet_date, license_name, report_type, report_type_meet_name = gen_wc_files.get_report_header_info( results_filename )
+    event_pages = [ page for page_type, page_key, page in
+                    sst_results.parse_result_pages( sst_pipeline.split_pages( sst_pipeline.read_lines( results_filename ), license_name ),
+                                                    license_name, False, True, False, False, True, False )
+                    if page_type == 'results' ]
+    schools_by_abbr = { school_dict['school_abbr_short']: school_dict for school_dict in sst_common.meet_state.school_name_list }
+    schools_by_name = { school_dict['school_name_full']: school_dict for school_dict in sst_common.meet_state.school_name_list }
+
+    def get_team_code( school: str ) -> str:
+        school_dict = schools_by_abbr.get( school ) or schools_by_name.get( school )
+        if school_dict is None:
+            ## The relay school names are cut short in the report
+            school_dict = sst_module_schools.get_schools_dict_by_full_name( school )
+        return f"{school_dict['school_lsc']:<2}{school_dict['school_abbr_short']}"
+
+    ## The swims of each team follow its C1 record
+    team_records = { f"{school_dict['school_lsc']:<2}{school_dict['school_abbr_short']}":
+                     [ format_record( 'C1', { 'team_code': f"{school_dict['school_lsc']:<2}{school_dict['school_abbr_short']}",
+                                              'team_name': school_dict['school_name_full'], 'team_abbr': school_dict['school_name_short'] } ) ]
+                     for school_dict in sst_common.meet_state.school_name_list }
+
+    for copy_num, event_page in itertools.product( range( times ), event_pages ):
+        event_line = next( ( row.line for row in event_page.rows if row.row_type == 'H4' ), "" )
+        event_name = re_event_name.match( event_line )
+        sex, distance, course, stroke_name = event_name.groups() if event_name else ( "Girls", "", "Yard", "" )
+        event_fields = { 'event_sex': sex_codes[sex], 'distance': distance, 'stroke': stroke_codes.get( stroke_name, "" ),
+                         'event_num': event_page.event_num, 'finals_course': "Y" if course == "Yard" else "S" }
+        relay_records = None
+        for row in event_page.rows:
+            if isinstance( row, sst_records.ResultRow ):
+                result_fields = dict( event_fields, seed=row.seed, finals=row.final, points=row.points if row.points != "-" else "",
+                                      place=row.place.lstrip( "*" ) if row.place.lstrip( "*" ).isdigit() else "" )
+                team_code = get_team_code( row.school )
+                if row.relay is None:
+                    team_records[team_code].append( format_record( 'D0', dict( result_fields, name=row.name, grade=row.grade ) ) )
+                    relay_records = None
+                else:
+                    relay_fields = dict( relay=row.relay, team_code=team_code )
+                    relay_records = team_records[team_code]
+                    relay_records.append( format_record( 'E0', dict( result_fields, **relay_fields ) ) )
+            elif isinstance( row, sst_records.RelayLegs ) and relay_records is not None:
+                for leg_num, leg in enumerate( row.get_legs() or (), 1 ):
+                    ## The grade is the last word, if the name wasn't cut short before it
+                    leg_name, space, leg_grade = leg.rpartition( " " )
+                    if len( leg_grade ) > 2:
+                        leg_name, leg_grade = leg, ""
+                    relay_records.append( format_record( 'F0', dict( relay_fields, name=leg_name, grade=leg_grade, finals_order=leg_num ) ) )
+                ## A relay the report couldn't parse (DQ) leaves its swimmers without a relay
+                relay_records = None
+
+    with open( cl2_filename, "w" ) as cl2_file:
+        cl2_file.write( format_record( 'A0', { 'organization': 1, 'version': "V3", 'file_code': sst_sdif.sdif_results_file_code } ) )
+        cl2_file.write( format_record( 'B1', { 'meet_name': meet_name, 'course': 'Y' } ) )
+        for records in team_records.values():
+            cl2_file.writelines( records )
+
+
+def write_text_results( results_filename: str, copy_filename: str, times: int ):
+    """ The text results report with its pages repeated times times """
+
+    with open( results_filename, "rb" ) as results_file:
+        report = results_file.read()
+    with open( copy_filename, "wb" ) as copy_file:
+        copy_file.write( report * times )
+
+
+def time_parse( report_filename: str, iterations: int ) -> float:
+    """ Median milliseconds to read the report into its event pages """
+
+    run_ms = []
+    for iteration in range( iterations ):
+        start_time = time.perf_counter()
+        if sst_sdif.is_sdif_report( report_filename ):
+            num_pages = sum( 1 for page in sst_sdif.get_result_pages( sst_sdif.read_sdif_meet( report_filename ), False, True, False, False, True ) )
+        else:
+            meet_name, meet_date, license_name, report_type, report_type_meet_name = gen_wc_files.get_report_header_info( report_filename )
+            num_pages = sum( 1 for page in sst_results.parse_result_pages( sst_pipeline.split_pages( sst_pipeline.read_lines( report_filename ), license_name ),
+                                                                           license_name, False, True, False, False, True, False ) )
+        run_ms.append( (time.perf_counter() - start_time) * 1000 )
+    return statistics.median( run_ms )
+
+
+def time_generate( report_dir: str, report_name: str, iterations: int ) -> float:
+    """ Median milliseconds of a whole run """
+
+    run_ms = []
+    for iteration in range( iterations ):
+        with tempfile.TemporaryDirectory() as output_dir:
+            start_time = time.perf_counter()
+            with contextlib.redirect_stdout( io.StringIO() ):
+                gen_wc_files.generate_wc_files( ['-i', report_dir, '-f', report_name, '-o', output_dir, '-C', '-T', 'results', '-v', 'error'] )
+            run_ms.append( (time.perf_counter() - start_time) * 1000 )
+    return statistics.median( run_ms )
+
+
+def process_main():
+    default_report = os.path.join( os.path.dirname( os.path.abspath(__file__) ), '..', 'data', '2022_divii', 'results.txt' )
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-r', '--report',       dest='report',      default=default_report,     help="Results report, with its schools.txt next to it")
+    parser.add_argument('-x', '--times',        dest='times',       default="1,10",             help="Sizes of the reports, in copies of the meet's events")
+    parser.add_argument('-n', '--iterations',   dest='iterations',  type=int, default=5,        help="Runs of each size, the median is shown")
+    args = parser.parse_args()
+
+    report_dir = os.path.dirname( os.path.abspath( args.report ) )
+    logging.basicConfig( format='%(message)s', level=logging.ERROR )
+    sst_common.setEvents( "HighSchool" )
+    sst_module_schools.load_schools_report( os.path.join( report_dir, 'schools.txt' ) )
+
+    print(f"{'copies':>6} {'text KiB':>9} {'cl2 KiB':>8} {'text parse ms':>14} {'cl2 parse ms':>13} {'text run ms':>12} {'cl2 run ms':>11}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        shutil.copy( os.path.join( report_dir, 'schools.txt' ), work_dir )
+        for times in [ int( times ) for times in args.times.split(",") ]:
+            text_name = f"results_x{times}.txt"
+            cl2_name = f"results_x{times}.cl2"
+            write_text_results( args.report, os.path.join( work_dir, text_name ), times )
+            write_sdif_results( args.report, os.path.join( work_dir, cl2_name ), times )
+
+            sizes = [ os.path.getsize( os.path.join( work_dir, report_name ) ) / 1024 for report_name in ( text_name, cl2_name ) ]
+            parse_ms = [ time_parse( os.path.join( work_dir, report_name ), args.iterations ) for report_name in ( text_name, cl2_name ) ]
+            run_ms = [ time_generate( work_dir, report_name, args.iterations ) for report_name in ( text_name, cl2_name ) ]
+            print(f"{times:>6} {sizes[0]:>9.0f} {sizes[1]:>8.0f} {parse_ms[0]:>14.1f} {parse_ms[1]:>13.1f} {run_ms[0]:>12.1f} {run_ms[1]:>11.1f}")
+
+
+if __name__ == "__main__":
+    process_main()
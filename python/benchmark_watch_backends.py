@@ -0,0 +1,156 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### benchmark_watch_backends
+###  Measure how long each watch_mm_reports backend takes to notice a new report.
+###  Creates files in a temp directory and reports the p50/p99 delay from just before
+###  the file is closed to the watcher reporting it complete.
+###
+###  Every backend is timed on the same event, the file being complete: inotify's
+###  close-write, the poll backend's last change, and watchdog's closed event (or its
+###  last modified event where it has no closed event), not its created event, which
+###  comes when the file is opened.  The last flush of the file is in close(), so
+###  none of them can report it before the time taken
+#############################################################################################
+#############################################################################################
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+import sst_module_watchers as sst_watchers
+
+
+#####################################################################################
+## Record the last time each path is reported complete.  A file can be reported more
+## than once (watchdog's modified then closed, a poll scan during the write), the last
+## one is when it was complete
+#####################################################################################
+class LatencyHandler:
+    def __init__(self, complete_event_types: tuple):
+        self.complete_event_types = complete_event_types
+        self.lock = threading.Lock()
+        self.detected = {}
+        self.seen = threading.Event()
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in self.complete_event_types:
+            return
+        with self.lock:
+            self.detected[event.src_path] = time.perf_counter()
+        self.seen.set()
+
+    ## watchdog handlers are called through dispatch()
+    def dispatch(self, event):
+        self.on_any_event( event )
+
+
+def create_observer( backend: str, poll_interval: float ):
+    if backend == 'inotify':
+        return sst_watchers.InotifyObserver()
+    if backend == 'poll':
+        return sst_watchers.PollingObserver( poll_interval )
+
+    from watchdog.observers import Observer
+    return Observer()
+
+
+def percentile( values: list, pct: float ) -> float:
+    values = sorted(values)
+    index = min( len(values) - 1, max( 0, round( pct / 100 * len(values) ) - 1 ) )
+    return values[index]
+
+
+#####################################################################################
+## Write num_files files, one at a time, waiting for each one to be seen.
+## A random gap before each file so they don't line up with the poll backend's scans.
+## Once a file is seen, wait settle seconds for a later report of it
+#####################################################################################
+def benchmark_backend( backend: str, num_files: int, file_size: int, poll_interval: float, timeout: float, max_gap: float ) -> dict:
+
+    ## The inotify and poll backends only report a file that is new or has changed (sst_watchers.FileEvent)
+    if backend == 'watchdog':
+        handler = LatencyHandler( ('closed', 'modified') )
+    else:
+        handler = LatencyHandler( ('created',) )
+    settle = poll_interval + 0.05 if backend == 'poll' else 0.05
+    report_text = ("x" * 99 + "\n") * (file_size // 100)
+    latency_ms = []
+    num_missed = 0
+
+    with tempfile.TemporaryDirectory() as watch_dir:
+        observer = create_observer( backend, poll_interval )
+        observer.schedule( handler, watch_dir, recursive=True )
+        observer.start()
+        time.sleep( 0.2 )
+
+        for file_num in range( num_files ):
+            time.sleep( random.uniform( 0, max_gap ) )
+            path = os.path.join( watch_dir, f"report_{file_num:04}.txt" )
+            handler.seen.clear()
+            report_file = open( path, "w" )
+            report_file.write( report_text )
+            closed_time = time.perf_counter()
+            report_file.close()
+
+            deadline = closed_time + timeout
+            while path not in handler.detected and time.perf_counter() < deadline:
+                handler.seen.wait( 0.01 )
+                handler.seen.clear()
+
+            if path in handler.detected:
+                time.sleep( settle )
+                latency_ms.append( (handler.detected[path] - closed_time) * 1000 )
+            else:
+                num_missed += 1
+
+        observer.stop()
+        observer.join()
+
+    result = { "backend": backend, "files": num_files, "missed": num_missed }
+    if latency_ms:
+        result["p50_ms"] = statistics.median( latency_ms )
+        result["p99_ms"] = percentile( latency_ms, 99 )
+        result["max_ms"] = max( latency_ms )
+    return result
+
+
+def process_main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-b', '--backend',      dest='backends',    action='append', choices=['watchdog', 'inotify', 'poll'],
+                                                                    help="Backend to measure. Repeat for more than one. Default: all available")
+    parser.add_argument('-n', '--numfiles',     dest='numfiles',    type=int, default=100,      help="Number of files to create per backend")
+    parser.add_argument('-s', '--filesize',     dest='filesize',    type=int, default=50000,    help="Size of each file in bytes")
+    parser.add_argument('-p', '--pollinterval', dest='pollinterval', type=float, default=0.25,  help="Poll backend scan interval in seconds")
+    parser.add_argument('-t', '--timeout',      dest='timeout',     type=float, default=2.0,    help="Seconds to wait for each file to be seen")
+    parser.add_argument('-g', '--maxgap',       dest='maxgap',      type=float, default=0.25,   help="Maximum random delay in seconds before creating each file")
+    args = parser.parse_args()
+
+    backends = args.backends
+    if not backends:
+        backends = ['poll']
+        if sst_watchers.is_inotify_available():
+            backends.insert( 0, 'inotify' )
+        try:
+            import watchdog
+            backends.insert( 0, 'watchdog' )
+        except ImportError:
+            pass
+
+    print(f"{'backend':<10} {'files':>6} {'missed':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for backend in backends:
+        result = benchmark_backend( backend, args.numfiles, args.filesize, args.pollinterval, args.timeout, args.maxgap )
+        if "p50_ms" in result:
+            print(f"{backend:<10} {result['files']:>6} {result['missed']:>6} {result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f} {result['max_ms']:>9.2f}")
+        else:
+            print(f"{backend:<10} {result['files']:>6} {result['missed']:>6} {'-':>9} {'-':>9} {'-':>9}")
+
+
+if __name__ == "__main__":
+    process_main()
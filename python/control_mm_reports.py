@@ -0,0 +1,59 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### control_mm_reports
+###
+###  Send a command to watch_mm_reports.py running with --daemon --controlport PORT
+###  and print the response.  Without a command, read commands from stdin.
+###
+###    control_mm_reports.py --port 9110 regenerate event 17
+###    control_mm_reports.py --port 9110 set numresults 10
+###    control_mm_reports.py --port 9110 rerun last program
+###    control_mm_reports.py --port 9110 status
+###
+###  'help' lists the commands.  Add 'route NAME' when the watcher serves more than one meet
+#############################################################################################
+#############################################################################################
+
+import argparse
+import sys
+
+import sst_module_control as sst_control
+
+
+def get_arg_parser() -> argparse.ArgumentParser:
+
+    parser = argparse.ArgumentParser(description="Send a command to the watch_mm_reports.py daemon")
+    parser.add_argument('-p', '--port',     dest='port',    type=int,   default=9110,           help="Watcher --controlport")
+    parser.add_argument('-H', '--host',     dest='host',    default="127.0.0.1",                help="Watcher host")
+    parser.add_argument('-t', '--timeout',  dest='timeout', type=float, default=180.0,          help="Seconds to wait for the response")
+    parser.add_argument('command',          nargs='*',                                          help="Command, e.g. regenerate event 17. Read from stdin if not given")
+
+    return parser
+
+
+def send_command( command: str, args: argparse.Namespace ) -> bool:
+    try:
+        response = sst_control.send_command( command, args.port, args.host, args.timeout )
+    except OSError as error:
+        print(f"ERROR: no watcher on {args.host}:{args.port}: {error}")
+        return False
+
+    print( response )
+    return not response.startswith("ERROR")
+
+
+if __name__ == "__main__":
+    args = get_arg_parser().parse_args()
+
+    if args.command:
+        succeeded = send_command( " ".join( args.command ), args )
+    else:
+        succeeded = True
+        for line in sys.stdin:
+            if line.strip():
+                succeeded = send_command( line.strip(), args ) and succeeded
+
+    sys.exit( 0 if succeeded else 1 )
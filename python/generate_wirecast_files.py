@@ -36,6 +36,7 @@
 import os, os.path
 import re
 import argparse
+import copy
 from pathlib import Path
 import glob
 import logging
@@ -51,11 +52,27 @@ import sst_module_results as sst_results
 import sst_module_scores as sst_scores
 import sst_module_results_scores as sst_result_scores
 import sst_module_schools as sst_module_schools
+import sst_module_page_index as sst_page_index
+import sst_module_pipeline as sst_pipeline
+import sst_module_parallel as sst_parallel
+import sst_module_parse_cache as sst_parse_cache
+import sst_module_incremental as sst_incremental
+import sst_module_sdif as sst_sdif
+import sst_module_report_sniffer as sst_report_sniffer
+import sst_module_parse_coverage as sst_parse_coverage
 
 ## Globals
 report_type_results = "result"
 report_type_program = "program"
 
+## The processes run for each kind of report (sst_report_sniffer.report_kinds)
+process_to_run_by_kind = {
+    sst_report_sniffer.report_kind_program:             'program',
+    sst_report_sniffer.report_kind_results:             'results',
+    sst_report_sniffer.report_kind_team_rankings:       'scores_champsionship',
+    sst_report_sniffer.report_kind_dual_meet_scores:    'scores_dualmeet',
+}
+
 
 #####################################################################################
 ## CLI param to remove existing files from directory.  This is needed when
@@ -86,100 +103,59 @@ def remove_files_from_dir( reporttype: str, directory_name: str ) -> int:
 ## get_report_header_info
 ## Get the header info from the reports first X lines
 #####################################################################################
-def get_report_header_info( meet_report_filename: str ):
+def get_report_header_info( meet_report_filename: str, encoding: str = "auto" ):
     """ Get the header info from the reports first X lines """
-            
-    #####################################################################################
-    ## Example headers we are processing
-    ##
-    ## Seton School                             HY-TEK's MEET MANAGER 8.0 - 10:02 AM  11/19/2020
-    ##               2020 NoVa Catholic Invitational Championship - 1/11/2020
-    ##                                     Meet Program
-    #####################################################################################
-
-    line_num = 0
-    line1_header = ""
-    line2_header = ""
-    line3_header = ""
-
-    with open(meet_report_filename, "r") as meet_report_file:
-        for line in meet_report_file:
-            line_num += 1
-
-            #####################################################################################
-            ## Remove the extra newline at end of line
-            #####################################################################################
-            line = line.strip()
-
-            #####################################################################################
-            ## Line1: Seton School                             HY-TEK's MEET MANAGER 8.0 - 10:02 AM  11/19/2020                 
-            #####################################################################################
-            if line_num == 1:
-                line1_header = line
-                continue
-
-            #####################################################################################
-            ## Line2:               2020 NoVa Catholic Invitational Championship - 1/11/2020                
-            #####################################################################################
-            if line_num == 2:
-                line2_header = line
-                continue
-
-            #####################################################################################
-            ## Line3:                                    Meet Program               
-            #####################################################################################
-            if line_num == 3:
-                line3_header = line
-
-                ## Stop the loop now. We have our headers
-                break
-
-        #####################################################################################
-        ## Header1.  Break about license name (school name)       
-        #  There can be some garbage on the first line before the license name. Ignore that     
-        #####################################################################################
-        line1_list = re.findall('^.*?([A-z0-9 \'-]+?)\s+HY-TEK',line1_header )
-        license_name = str(line1_list[0].strip())
 
-        #####################################################################################
-        ## Header2.  Break about meet name and meet date               
-        #####################################################################################
-        line2_list = re.findall('^(.*?) - (\d+/\d+/\d+)',line2_header )
-        meet_name = line2_list[0][0].strip()
-        meet_date = line2_list[0][1].strip()
+    with sst_report_sniffer.sniff_report( meet_report_filename, encoding ) as report_sniff:
+        return report_sniff.header_info
 
-        #####################################################################################
-        ## Header2.  Break about meet name and meet date               
-        #####################################################################################
-        report_type = line3_header
-        report_type_meet_name = ""
 
-        if '-' in line3_header:
-            report_type,report_type_meet_name = line3_header.split('-',1)
-            report_type = report_type.strip()
-            report_type_meet_name = report_type_meet_name.strip()
-            
-        #logging.debug(f"Header: licensee '{license_name}' meet_name: '{meet_name}' meet_date: '{meet_date}' report_type: '{report_type}'")
+#####################################################################################
+## get_event_report_pages
+## The lines of just the pages for the events, found with the report's page index
+## instead of parsing every page.  Continued pages stay with their event.
+## A page splitter for sst_pipeline: one list of lines per page, read as it is asked for
+#####################################################################################
+def get_event_report_pages( meet_report_filename: str, mm_license_name: str, event_nums: tuple, encoding: str = "auto" ):
+    """ The report lines for each page of the events in event_nums """
 
-        return meet_name, meet_date, license_name, report_type, report_type_meet_name
+    with sst_page_index.PageIndex( meet_report_filename, mm_license_name, encoding ) as page_index:
+        event_pages = page_index.get_pages( event_nums )
+        if not event_pages:
+            logging.warning(f"No pages found for events {event_nums}. Events in the report: {page_index.get_event_nums()}")
+        for event_page in event_pages:
+            yield page_index.get_page_lines( [ event_page ] )
 
 
+#####################################################################################
+## -E/--events: 3,5,7.  Also takes back the '(3, 5, 7)' it is turned into for the watcher
+#####################################################################################
+def get_event_nums_option( value: str ) -> tuple:
+    try:
+        event_nums = [ int( event_num.strip(" ()[]") ) for event_num in value.split(",") if event_num.strip(" ()[]") ]
+    except ValueError:
+        raise argparse.ArgumentTypeError( f"'{value}' is not a list of event numbers like 3,5,7" )
+    return tuple( sorted( set( event_nums ) ) )
 
 
+#####################################################################################
+## get_report_header_info_from_lines
+## Same as get_report_header_info for a report already read in
+#####################################################################################
+def get_report_header_info_from_lines( report_lines: list ):
+    """ Get the header info from the reports first X lines """
 
+    return sst_report_sniffer.get_header_info( list( report_lines ) )
 
 
 #####################################################################################
+## get_arg_parser
+## Build the command line parser.  Split out so the watcher daemon can parse the
+## same arguments for every report without spawning a new python process
 #####################################################################################
-##  M A I N
-#####################################################################################
-#####################################################################################
-def generate_wc_files():
-    #####################################################################################
-    ## Parse out command line arguments
-    #####################################################################################
+def get_arg_parser() -> argparse.ArgumentParser:
+    """ Build the command line parser used by generate_wc_files """
 
-    spacerelaynames = True
     parser = argparse.ArgumentParser(add_help=False)
     parser.add_argument('-i', '--inputdir',         dest='inputdir',            default="C:\\Users\\SetonSwimTeam\\Dropbox\\wc_meetreports",   
                                                                                                                 help="input directory for MM extract report")
@@ -202,8 +178,15 @@ def generate_wc_files():
     parser.add_argument('-R', '--displayRelayNames',dest='displayRelayNames',   action='store_true',            help="Display relay swimmer names, not just the team name in results")
     parser.add_argument('-A', '--awardsrelaynames', dest='awardsRelayNames',    action='store_true',            help="Display relay swimmer names for the AWARDS file")
     parser.add_argument('-N', '--namesfirstlast',   dest='namesfirstlast',      action='store_true',            help="Swap Non Relay names to First Last from Last, First")
-    parser.add_argument('-T', '--reporttype',       dest='reporttype',          default="auto",                 choices=['auto','program','results', 'headers'], 
-                                                                                                                help="Program type, Meet Program or Meet Results")
+    parser.add_argument('-c', '--encoding',         dest='encoding',            default="auto",                 help="Report file encoding, like cp1252 or utf-8. auto: UTF-8 if the report is, else cp1252 (Meet Manager)")
+    parser.add_argument('-j', '--jobs',             dest='jobs',                type=int, default=1,            help="Parse and write a Program or Results report in this many processes. Pays off for big reports")
+    parser.add_argument('-K', '--cachedir',         dest='cachedir',            default=None,                   help="Keep the parsed Program and Results reports in this directory. A report run again with only -n -R -a -A -S changed is not parsed again")
+    parser.add_argument('--cachesize',              dest='cachesize',           type=int, default=64,           help="Size of the -K parse cache in MiB. The least recently used reports are removed")
+    parser.add_argument('-I', '--incremental',      dest='incremental',         action='store_true',            help="Only parse and write the events (results) or heats (program) whose pages changed since the last run into OUTPUTDIR")
+    parser.add_argument('-E', '--events',           dest='events',              type=get_event_nums_option,     help="Only generate these events, like 3,5,7. Program and Results reports")
+    parser.add_argument('--parsecoverage',          dest='parsecoverage',       default=None,                   help="Write the lines each parser read, couldn't read and skipped, by kind of line, and the time in each pattern to this JSON file")
+    parser.add_argument('-T', '--reporttype',       dest='reporttype',          default="auto",                 choices=['auto','program','results','teamrankings','dualmeetscores','headers'], 
+                                                                                                                help="Report type. auto: found from the report. headers: only show the report header")
     ## For debugging
     parser.add_argument('-v', '--log',              dest='loglevel',            default='warning',                 choices=['error', 'warning', 'info', 'debug'],            
                                                                                                                 help="Set debugging level2")
@@ -222,11 +205,47 @@ def generate_wc_files():
     parser.set_defaults(awards=False)
     parser.set_defaults(awardsRelayNames=False)
     parser.set_defaults(watcher=False)
+    parser.set_defaults(incremental=False)
+
+    return parser
+
+
+#####################################################################################
+#####################################################################################
+##  M A I N
+##
+##  argv defaults to sys.argv.  Returns the number of files generated.
+##  Raises sst_common.ReportCancelled if cancel_event gets set
+#####################################################################################
+#####################################################################################
+def generate_wc_files( argv: list = None, cancel_event = None, keep_parsed_pages: bool = False ) -> int:
+    #####################################################################################
+    ## Parse out command line arguments
+    #####################################################################################
+    parser = get_arg_parser()
+    args = parser.parse_args( argv )
+
+    return generate_wc_files_from_args( args, cancel_event, keep_parsed_pages )
 
-    args = parser.parse_args()
+
+#####################################################################################
+## Same as generate_wc_files with the arguments already parsed.  The watcher daemon
+## parses each route's options once and calls this in process for each report with
+## the inputdir and filename set.  args is not changed.
+## The arguments used are left in sst_common.run_state.args.  With keep_parsed_pages the
+## parsed pages are kept in sst_common.run_state.parsed_pages for render_parsed_pages,
+## otherwise each page is dropped once its files are written.
+## With -I and keep_parsed_pages, previous_run has the parsed_pages and page_hashes of
+## the last run of the report, for the events/heats that are not parsed again
+#####################################################################################
+def generate_wc_files_from_args( args: argparse.Namespace, cancel_event = None, keep_parsed_pages: bool = False, previous_run = None ) -> int:
+
+    spacerelaynames = True
+    args = copy.copy( args )
     
     inputfile = f"{args.inputdir}/{args.filename}"
-    schoolsfile = f"{args.inputdir}/{args.schoolfilename}"
+    ## The school file may also be a full path, for a schools.txt shared by several report directories
+    schoolsfile = os.path.join( args.inputdir, args.schoolfilename )
 
     output_dir = args.outputdir
     ## The outputdir string MUST have a trailing slash.  Check string and add it if necesssary
@@ -249,6 +268,11 @@ def generate_wc_files():
     # logging.basicConfig( format='%(levelname)s:%(message)s', level=logging.INFO)
     logging.basicConfig( format='%(message)s', level=loglevel)
 
+    ## Start tracking the files written by this run.  The parse cache saves the pages kept
+    sst_common.start_run( cancel_event, keep_parsed_pages or bool( args.cachedir ) )
+    if args.parsecoverage:
+        sst_parse_coverage.start_coverage()
+
     process_to_run = {"program": False, "results": False, "scores_champsionship": False, "scores_dualmeet": False }
     
     report_type_to_run = args.reporttype
@@ -287,166 +311,378 @@ def generate_wc_files():
 
 
     #####################################################################################
-    ## Build the school name list
+    ## Build the school name list. Only re-read if it changed since the last report
     #####################################################################################
-    sst_module_schools.process_schools_report( schoolsfile )
+    sst_module_schools.load_schools_report( schoolsfile )
 
     #####################################################################################
-    ## Get header info from the meet file
-    ## We need to dynamically get the meet name and license_name for use in processing files
-    ## The license_name is the first line on the start of every new page/event/heat
+    ## What kind of report it is, from one read of its first bytes (sst_report_sniffer).
+    ## The header lines are in them, and they are the start of the report lines for the
+    ## parsers, so the report is opened once.
+    ## For only some events the event pages are read with the page index below.
+    ## The report is closed however the run ends (errors, a cancelled run in the watcher)
     #####################################################################################
-    meet_name, meet_date, license_name, report_type, report_type_meet_name = get_report_header_info( inputfile )
+    with sst_report_sniffer.sniff_report( inputfile, args.encoding ) as report_sniff:
 
-    #####################################################################################
-    ##
-    ## Determine report type based on input file header if not specified on CLI
-    #####################################################################################
-    if (report_type_to_run == "program")   or  (report_type_to_run == "auto" and report_type == 'Meet Program'):
-        process_to_run['program'] = True
-    elif (report_type_to_run == "results") or (report_type_to_run == "auto" and report_type == 'Results'):
-        process_to_run['results'] = True
-    elif (report_type_to_run == "Team Rankings") or (report_type_to_run == "auto" and report_type == 'Team Rankings'):
-        ## Another way call this would be the args.championshipmeet
-        process_to_run['scores_champsionship'] = True
-    elif (report_type_to_run == "Dual Meet Scores") or (report_type_to_run == "auto" and report_type == 'Dual Meet Scores'):
-        process_to_run['scores_dualmeet'] = True
+        #####################################################################################
+        ## A Hy-Tek SDIF (.cl2) export instead of a text report
+        #####################################################################################
+        if report_sniff.report_kind == sst_report_sniffer.report_kind_sdif:
+            return generate_sdif_files( inputfile, output_dir, args, report_sniff.read_lines() )
 
+        #####################################################################################
+        ## Get header info from the meet file
+        ## We need to dynamically get the meet name and license_name for use in processing files
+        ## The license_name is the first line on the start of every new page/event/heat
+        #####################################################################################
+        meet_name, meet_date, license_name, report_type, report_type_meet_name = report_sniff.header_info
 
-    #####################################################################################
-    ## If the program relay is in Format2 (team abbr and swimmers on same line) then we need to force short relay names
-    #####################################################################################
-    #shortschoolrelay = args.shortschoolrelay
-    if process_to_run['program'] and args.relayformat == 2:
-        args.shortschoolrelay = True
+        #####################################################################################
+        ## -T headers: only show the report header, nothing is processed
+        #####################################################################################
+        if report_type_to_run == "headers":
+            logging.warning( f"\n   Headers: \n" + \
+                             f"\tInputFile \t\t{inputfile} \n" + \
+                             f"\tMeet Name: \t\t'{meet_name}' \n" + \
+                             f"\tMeet Date: \t\t'{meet_date}' \n" + \
+                             f"\tHeader3 Meet Name: \t'{report_type_meet_name}' \n" + \
+                             f"\tLicensee: \t\t'{license_name}' \n" + \
+                             f"\tSourceReport: \t\t'{report_type}' ({report_sniff.report_kind}, Meet Manager {report_sniff.mm_version}) \n" )
+            return 0
 
-    use_short_school_names_ind = not args.longschoolindividual
+        #####################################################################################
+        ## Determine report type based on input file header if not specified on CLI.
+        ## Stop here when it isn't a report we know, or there is no license name to find the pages by
+        #####################################################################################
+        report_kind = report_type_to_run if report_type_to_run in sst_report_sniffer.report_kinds else report_sniff.report_kind
+        if report_kind is None or license_name == "":
+            logging.error( report_sniff.get_diagnosis() )
+            sys.exit(3)
+        if report_type_to_run != "auto" and report_sniff.report_kind not in (report_kind, None):
+            logging.warning(f"-T {report_type_to_run}: {args.filename} looks like a {report_sniff.report_kind} report")
+
+        if report_kind in process_to_run_by_kind:
+            process_to_run[process_to_run_by_kind[report_kind]] = True
+
+        if args.events:
+            report_lines = None
+            report_sniff.close()
+        else:
+            report_lines = report_sniff.read_lines()
+
+        #####################################################################################
+        ## Only the pages for the events asked for.  Scores reports have no event pages
+        #####################################################################################
+        if report_lines is None:
+            if process_to_run['program'] or process_to_run['results']:
+                report_pages = get_event_report_pages( inputfile, license_name, args.events, args.encoding )
+            else:
+                logging.warning(f"Events {args.events} not used for a {report_type} report")
+                report_lines = sst_pipeline.read_lines( inputfile, args.encoding )
+        if report_lines is not None:
+            report_pages = sst_pipeline.split_pages( report_lines, license_name )
+
+        #####################################################################################
+        ## If the program relay is in Format2 (team abbr and swimmers on same line) then we need to force short relay names
+        #####################################################################################
+        #shortschoolrelay = args.shortschoolrelay
+        if process_to_run['program'] and args.relayformat == 2:
+            args.shortschoolrelay = True
+
+        sst_common.run_state.args = args
+
+        ## The pages parsed in other processes can't be kept for render_parsed_pages
+        run_parallel = args.jobs > 1 and not ( keep_parsed_pages or args.cachedir )
+        if args.jobs > 1 and not run_parallel:
+            logging.info(f"Parsed pages are kept, -j {args.jobs} not used")
+
+        #####################################################################################
+        ## The pages parsed by an earlier run of the same report, schools file and parse options
+        #####################################################################################
+        parse_cache = None
+        cached_pages = None
+        if args.cachedir and (process_to_run['program'] or process_to_run['results']):
+            parse_cache = sst_parse_cache.ParseCache( args.cachedir, args.cachesize * 1024 * 1024 )
+            cache_key = sst_parse_cache.get_cache_key( inputfile, schoolsfile, 'program' if process_to_run['program'] else 'results',
+                                                       [ getattr( args, option ) for option in parse_options ] )
+            cached_pages = parse_cache.load( cache_key )
+
+        #####################################################################################
+        ## -I: only the events/heats whose pages changed since the last run into output_dir.
+        ## Every file is written again after -d, or from the parse cache
+        #####################################################################################
+        incremental = None
+        if args.incremental and (process_to_run['program'] or process_to_run['results']):
+            if args.events:
+                logging.warning(f"-I not used for only some events")
+            else:
+                report_kind = 'program' if process_to_run['program'] else 'results'
+                options_sha256 = sst_incremental.get_options_sha256( report_kind, schoolsfile, [ getattr( args, option ) for option in parse_options + render_options ] )
+                with sst_page_index.PageIndex( inputfile, license_name, args.encoding ) as page_index:
+                    incremental = sst_incremental.IncrementalRun( output_dir, inputfile, report_kind, page_index, options_sha256,
+                                                                  args.delete or cached_pages is not None, keep_parsed_pages, previous_run )
+                    encoding = page_index.encoding
+                sst_common.run_state.page_hashes = incremental.unit_hashes
+                if not incremental.is_whole_report():
+                    run_parallel = False
+                    report_pages = sst_page_index.read_page_spans( inputfile, incremental.get_page_spans(), encoding )
+
+        use_short_school_names_ind = not args.longschoolindividual
     
-    logargs = f"{Path(__file__).stem}  \n" + \
-              f"\n   Params: \n" + \
-              f"\tOutputReportType \t{args.reporttype} \n" + \
-              f"\tInputFile \t\t{inputfile} \n" + \
-              f"\tSchool Report File Name {args.schoolfilename} \n" + \
-              f"\tRoot OutputDir \t\t{output_dir} \n" + \
-              f"\tMeet Type \t\t{args.meettype} \n" + \
-              f"\tChampionship Meet \t{args.championshipmeet} \n" + \
-              f"\tShort Sch Names Relays \t{args.shortschoolrelay} \n" + \
-              f"\tShort Sch Names Indiv \t{use_short_school_names_ind} \n" + \
-              f"\tNamesFirstlast \t\t{args.namesfirstlast} \n" + \
-              f"\tSplit Relays \t\t{args.splitrelays} \n"+ \
-              f"\tDisplay Relays Names \t{args.displayRelayNames} \n"+ \
-              f"\tSpaces in Relay Names \t{spacerelaynames}\n" + \
-              f"\tDelete exiting files \t{args.delete}\n" + \
-              f"\tNum Reslts Generate \t{args.numresults}\n" + \
-              f"\tQuote output fields \t{args.quote}\n" + \
-              f"\tLog Level \t\t{args.loglevel}\n" + \
-              f"\tEmptyResults: \t\t'{args.emptyresults}' \n" + \
-              f"\tRelayFormat: \t\t'{args.relayformat}' \n" + \
-              f"\tGen Award File: \t'{args.awards}' \n" + \
-              f"\tAwards Relay Names: \t'{args.awardsRelayNames}' \n" + \
-              f"\n   Headers: \n" + \
-              f"\tMeet Name: \t\t'{meet_name}' \n" + \
-              f"\tMeet Date: \t\t'{meet_date}' \n" + \
-              f"\tHeader3 Meet Name: \t'{report_type_meet_name}' \n" + \
-              f"\tLicensee: \t\t'{license_name}' \n" + \
-              f"\tSourceReport: \t\t'{report_type}' \n" 
-    logging.warning( logargs )
-
-    logging.warning(f"\n    Reports to generate: ")
-    for i in process_to_run:
-        if process_to_run[i]:
-            logging.warning(f"\t{i} \n")
+        logargs = f"{Path(__file__).stem}  \n" + \
+                  f"\n   Params: \n" + \
+                  f"\tOutputReportType \t{args.reporttype} \n" + \
+                  f"\tInputFile \t\t{inputfile} \n" + \
+                  f"\tEvents \t\t\t{args.events or 'All'} \n" + \
+                  f"\tSchool Report File Name {args.schoolfilename} \n" + \
+                  f"\tRoot OutputDir \t\t{output_dir} \n" + \
+                  f"\tMeet Type \t\t{args.meettype} \n" + \
+                  f"\tChampionship Meet \t{args.championshipmeet} \n" + \
+                  f"\tShort Sch Names Relays \t{args.shortschoolrelay} \n" + \
+                  f"\tShort Sch Names Indiv \t{use_short_school_names_ind} \n" + \
+                  f"\tNamesFirstlast \t\t{args.namesfirstlast} \n" + \
+                  f"\tSplit Relays \t\t{args.splitrelays} \n"+ \
+                  f"\tDisplay Relays Names \t{args.displayRelayNames} \n"+ \
+                  f"\tSpaces in Relay Names \t{spacerelaynames}\n" + \
+                  f"\tDelete exiting files \t{args.delete}\n" + \
+                  f"\tNum Reslts Generate \t{args.numresults}\n" + \
+                  f"\tQuote output fields \t{args.quote}\n" + \
+                  f"\tLog Level \t\t{args.loglevel}\n" + \
+                  f"\tEmptyResults: \t\t'{args.emptyresults}' \n" + \
+                  f"\tRelayFormat: \t\t'{args.relayformat}' \n" + \
+                  f"\tGen Award File: \t'{args.awards}' \n" + \
+                  f"\tAwards Relay Names: \t'{args.awardsRelayNames}' \n" + \
+                  f"\n   Headers: \n" + \
+                  f"\tMeet Name: \t\t'{meet_name}' \n" + \
+                  f"\tMeet Date: \t\t'{meet_date}' \n" + \
+                  f"\tHeader3 Meet Name: \t'{report_type_meet_name}' \n" + \
+                  f"\tLicensee: \t\t'{license_name}' \n" + \
+                  f"\tSourceReport: \t\t'{report_type}' ({report_kind}, Meet Manager {report_sniff.mm_version}) \n" 
+        logging.warning( logargs )
+
+        logging.warning(f"\n    Reports to generate: ")
+        for i in process_to_run:
+            if process_to_run[i]:
+                logging.warning(f"\t{i} \n")
 
 
-    #####################################################################################
-    ## Generate wirecast files from a MEET PROGRAM txt file
-    #####################################################################################
-    if process_to_run['program']:
+        #####################################################################################
+        ## Generate wirecast files from a MEET PROGRAM txt file
+        #####################################################################################
+        if process_to_run['program']:
+
+            if args.delete:
+                 ## Remove files from last run as we may have old events/heats mixed in
+                remove_files_from_dir( 'program', output_dir )
+                remove_files_from_dir( 'PROGRAM', output_dir )
+
+            if cached_pages is not None:
+                total_files_generated_program = write_parsed_pages( cached_pages, output_dir, args, args.events )
+            elif run_parallel:
+                total_files_generated_program = \
+                    sst_parallel.process_report_parallel( 'program', inputfile, schoolsfile, output_dir, license_name, args, loglevel )
+            else:
+                total_files_generated_program = \
+                    sst_program.process_program( report_pages, 
+                                                output_dir, 
+                                                license_name, 
+                                                args.shortschoolrelay, 
+                                                use_short_school_names_ind, 
+                                                args.splitrelays, 
+                                                spacerelaynames, 
+                                                args.displayRelayNames, 
+                                                args.namesfirstlast, 
+                                                args.quote,
+                                                args.relayformat )
 
-        if args.delete:
-             ## Remove files from last run as we may have old events/heats mixed in
-            remove_files_from_dir( 'program', output_dir )
-            remove_files_from_dir( 'PROGRAM', output_dir )
+        #####################################################################################
+        ## Generate wirecast files RESULTS and AWARDS from a MEET RESULTS txt file
+        #####################################################################################
+        if process_to_run['results']:
+
+            if args.delete:
+                 ## Remove files from last run as we may have old eventsmixed in
+                remove_files_from_dir( 'results', output_dir )
+                remove_files_from_dir( 'RESULTS', output_dir )
+                remove_files_from_dir( 'AWARDS', output_dir )
+
+
+            if cached_pages is not None:
+                total_files_generated_results = write_parsed_pages( cached_pages, output_dir, args, args.events )
+            elif run_parallel:
+                total_files_generated_results = \
+                    sst_parallel.process_report_parallel( 'results', inputfile, schoolsfile, output_dir, license_name, args, loglevel )
+            else:
+                total_files_generated_results = \
+                       sst_results.process_result(  report_pages, 
+                                                    output_dir, 
+                                                    license_name, 
+                                                    args.shortschoolrelay, 
+                                                    use_short_school_names_ind, 
+                                                    args.displayRelayNames, 
+                                                    args.displayRelayNames, 
+                                                    args.namesfirstlast, 
+                                                    args.quote ,
+                                                    args.numresults,
+                                                    args.championshipmeet,
+                                                    args.awards,
+                                                    args.awardsRelayNames,
+                                                    not args.events and (incremental is None or incremental.is_last_unit_changed()) )
 
-        total_files_generated_program  = \
-            sst_program.process_program( inputfile, 
-                                        output_dir, 
-                                        license_name, 
-                                        args.shortschoolrelay, 
-                                        use_short_school_names_ind, 
-                                        args.splitrelays, 
-                                        spacerelaynames, 
-                                        args.displayRelayNames, 
-                                        args.namesfirstlast, 
-                                        args.quote,
-                                        args.relayformat )
+        #####################################################################################
+        ## Generate wirecast files CHAMPSIONSHIP SCORES from a MEET SCORES txt file
+        #####################################################################################
+        if process_to_run['scores_champsionship']:
+            total_scores_files = \
+                sst_scores.process_score_champsionship(  
+                                                report_lines, 
+                                                output_dir, 
+                                                license_name, 
+                                                args.quote,
+                                                args.numresults )
 
-    #####################################################################################
-    ## Generate wirecast files RESULTS and AWARDS from a MEET RESULTS txt file
-    #####################################################################################
-    if process_to_run['results']:
+        #####################################################################################
+        ## Generate wirecast files DUALMEET SCORES from a MEET SCORES txt file
+        #####################################################################################
+        if process_to_run['scores_dualmeet']:
+            total_scores_files = \
+                   sst_scores.process_score_dualmeet(  
+                                                report_lines, 
+                                                output_dir, 
+                                                license_name, 
+                                                args.quote,
+                                                args.numresults )
+
+
+        ## Only the pages of the whole report are saved
+        if parse_cache is not None and cached_pages is None and not args.events and (incremental is None or incremental.is_whole_report()):
+            parse_cache.save( cache_key, sst_common.run_state.parsed_pages )
+
+        if incremental is not None:
+            incremental.record( sst_common.run_state.files_written )
+            if sst_common.run_state.parsed_pages is not None:
+                sst_common.run_state.parsed_pages = incremental.merge_parsed_pages( sst_common.run_state.parsed_pages )
+
+        logging.warning(f"{report_type} Process Completed:")
+
+        if total_files_generated_program > 0:
+            logging.warning(f"\tNumber of 'Program' files generated: {total_files_generated_program}")
+        if total_files_generated_results > 0:
+            logging.warning(f"\tNumber of 'Results' files generated: {total_files_generated_results}")
+        if total_scores_files > 0:
+            logging.warning(f"\tNumber of 'Score' files generated: {total_scores_files}")
+
+        run_stats = sst_common.run_state.stats
+        if run_stats.get( 'lines_fixed_width' ) or run_stats.get( 'lines_regex' ) or run_stats.get( 'lines_unparsed' ):
+            logging.warning(f"\tEntry lines read by column: {run_stats.get( 'lines_fixed_width', 0 )}  by regex: {run_stats.get( 'lines_regex', 0 )}  unparsed: {run_stats.get( 'lines_unparsed', 0 )}")
+        if incremental is not None:
+            logging.warning(f"\tEvents/heats changed since the last run: {run_stats.get( 'incremental_regenerated', 0 )}  unchanged: {run_stats.get( 'incremental_unchanged', 0 )}")
+        if parse_cache is not None:
+            logging.warning(f"\tParse cache hits: {run_stats.get( 'parse_cache_hits', 0 )}  misses: {run_stats.get( 'parse_cache_misses', 0 )}  evictions: {run_stats.get( 'parse_cache_evictions', 0 )}")
+
+        coverage = sst_parse_coverage.get_coverage()
+        if coverage is not None:
+            line_totals = coverage.get_line_totals()
+            logging.warning(f"\tLines matched/unmatched/skipped: " +
+                            "  ".join( f"{line_kind} {line_counts['matched']}/{line_counts['unmatched']}/{line_counts['skipped']}"
+                                       for line_kind, line_counts in sorted( line_totals.items() ) ))
+            coverage.write_report( args.parsecoverage, inputfile, report_kind )
+            logging.warning(f"\tParse coverage written to {args.parsecoverage}")
+
+        return total_files_generated_program + total_files_generated_results + total_scores_files
 
-        if args.delete:
-             ## Remove files from last run as we may have old eventsmixed in
+
+#####################################################################################
+## Generate the program or results files from a Hy-Tek SDIF (.cl2) export.  It has
+## the full school codes and names, and the relay swimmers one to a record, so nothing
+## is cut short like in a text report.  -T program/results picks the kind, otherwise
+## an export with finals times or places is results.
+## The whole export is read every time: -j, -K and -I are for text reports
+#####################################################################################
+def generate_sdif_files( inputfile: str, output_dir: str, args: argparse.Namespace, report_lines = None ) -> int:
+
+    sdif_meet = sst_sdif.read_sdif_meet( inputfile, args.encoding, report_lines )
+    report_kind = args.reporttype if args.reporttype in ('program', 'results') else sdif_meet.get_report_kind()
+
+    ## Same as a text program in Format2 (team abbr and swimmers on same line)
+    if report_kind == 'program' and args.relayformat == 2:
+        args.shortschoolrelay = True
+
+    sst_common.run_state.args = args
+    if args.jobs > 1 or args.cachedir or args.incremental:
+        logging.info(f"-j, -K and -I not used for an SDIF file")
+
+    logging.warning(f"{Path(__file__).stem}  \n" + \
+                    f"\n   Params: \n" + \
+                    f"\tInputFile \t\t{inputfile} (SDIF {report_kind}) \n" + \
+                    f"\tEvents \t\t\t{args.events or 'All'} \n" + \
+                    f"\tRoot OutputDir \t\t{output_dir} \n" + \
+                    f"\tMeet Name: \t\t'{sdif_meet.meet_name}' \n" + \
+                    f"\tMeet Date: \t\t'{sdif_meet.get_meet_date()}' \n" )
+
+    if args.delete:
+        ## Remove files from last run as we may have old events/heats mixed in
+        if report_kind == 'program':
+            remove_files_from_dir( 'program', output_dir )
+            remove_files_from_dir( 'PROGRAM', output_dir )
+        else:
             remove_files_from_dir( 'results', output_dir )
             remove_files_from_dir( 'RESULTS', output_dir )
             remove_files_from_dir( 'AWARDS', output_dir )
 
+    if report_kind == 'program':
+        parsed_pages = sst_sdif.get_program_pages( sdif_meet, args.shortschoolrelay, not args.longschoolindividual, args.namesfirstlast, args.quote )
+    else:
+        parsed_pages = sst_sdif.get_result_pages( sdif_meet, args.shortschoolrelay, not args.longschoolindividual, args.namesfirstlast, args.quote, args.championshipmeet )
+    num_files = write_parsed_pages( parsed_pages, output_dir, args, args.events )
 
-        total_files_generated_results = \
-               sst_results.process_result(  inputfile, 
-                                            output_dir, 
-                                            license_name, 
-                                            args.shortschoolrelay, 
-                                            use_short_school_names_ind, 
-                                            args.displayRelayNames, 
-                                            args.displayRelayNames, 
-                                            args.namesfirstlast, 
-                                            args.quote ,
-                                            args.numresults,
-                                            args.championshipmeet,
-                                            args.awards,
-                                            args.awardsRelayNames )
-        total_result_scores_generated = \
-         sst_result_scores.process_champsionship_results_score( inputfile, 
-                                                        output_dir, 
-                                                        license_name, 
-                                                        args.quote,
-                                                        args.numresults )
+    logging.warning(f"SDIF {report_kind} Process Completed:")
+    logging.warning(f"\tNumber of '{report_kind.capitalize()}' files generated: {num_files}")
+    return num_files
 
-    #####################################################################################
-    ## Generate wirecast files CHAMPSIONSHIP SCORES from a MEET SCORES txt file
-    #####################################################################################
-    if process_to_run['scores_champsionship']:
-        total_scores_files = \
-            sst_scores.process_score_champsionship(  
-                                            inputfile, 
-                                            output_dir, 
-                                            license_name, 
-                                            args.quote,
-                                            args.numresults )
 
-    #####################################################################################
-    ## Generate wirecast files DUALMEET SCORES from a MEET SCORES txt file
-    #####################################################################################
-    if process_to_run['scores_dualmeet']:
-        total_scores_files = \
-               sst_scores.process_score_dualmeet(  
-                                            inputfile, 
-                                            output_dir, 
-                                            license_name, 
-                                            args.quote,
-                                            args.numresults )
-
-
-    logging.warning(f"{report_type} Process Completed:")
-
-    if total_files_generated_program > 0:
-        logging.warning(f"\tNumber of 'Program' files generated: {total_files_generated_program}")
-    if total_files_generated_results > 0:
-        logging.warning(f"\tNumber of 'Results' files generated: {total_files_generated_results}")
-    if total_scores_files > 0:
-        logging.warning(f"\tNumber of 'Score' files generated: {total_scores_files}")
+#####################################################################################
+## Write the wirecast files again from the pages kept by an earlier run of a report
+## (sst_common.run_state.parsed_pages) without reading the report again.
+## Only the render_options can differ from the args of the run that parsed the pages,
+## the other options change how the report is parsed.
+## event_num limits it to the files for one event
+#####################################################################################
+render_options = ( 'numresults', 'displayRelayNames', 'awards', 'awardsRelayNames', 'splitrelays' )
+
+## The options that change the parsed pages, part of the -K parse cache key
+parse_options = ( 'shortschoolrelay', 'longschoolindividual', 'namesfirstlast', 'quote', 'championshipmeet', 'meettype', 'relayformat', 'encoding' )
+
+def render_parsed_pages( parsed_pages: list, args: argparse.Namespace, event_num: int = None ) -> int:
+
+    output_dir = args.outputdir
+    if output_dir[-1] != '/':
+        output_dir = f"{output_dir}/"
+
+    ## The meet state is per thread, and this may not be the thread that parsed the report
+    sst_common.start_run()
+    sst_common.setEvents( args.meettype )
+    sst_module_schools.load_schools_report( os.path.join( args.inputdir, args.schoolfilename ) )
+
+    return write_parsed_pages( parsed_pages, output_dir, args, None if event_num is None else [ event_num ] )
+
+
+#####################################################################################
+## Write the files of parsed pages in this run.  event_nums limits it to those events,
+## the team scores are only written for all events
+#####################################################################################
+def write_parsed_pages( parsed_pages: list, output_dir: str, args: argparse.Namespace, event_nums: list = None ) -> int:
+
+    num_files = 0
+    for page_type, page_key, page in parsed_pages:
+        if page_type == 'results' and (event_nums is None or page_key in event_nums):
+            num_files += sst_results.create_output_file( output_dir, page_key, page, args.displayRelayNames, args.numresults, args.awards, args.awardsRelayNames )
+        elif page_type == 'program' and (event_nums is None or page_key[0] in event_nums):
+            num_files += sst_program.create_output_file_program( output_dir, page, args.displayRelayNames, args.splitrelays, args.relayformat )
+        elif page_type == 'results_scores' and event_nums is None:
+            num_files += sst_result_scores.create_output_result_scores_champ( output_dir, page, args.numresults )
+
+    return num_files
 
 
 #####################################################################################
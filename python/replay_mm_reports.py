@@ -0,0 +1,298 @@
+#!/c/Users/SetonSwimTeam/AppData/Local/Programs/Python/Python39/python
+
+#############################################################################################
+#############################################################################################
+###
+### replay_mm_reports
+###  Load test watch_mm_reports without a live meet.  Writes a sequence of report
+###  saves into the watched directory the way Meet Manager does (delete, then create
+###  and write), at the original speed or faster.
+###
+###  The sequence comes from either:
+###   -j JOURNAL   a journal recorded by watch_mm_reports.py --journal at a real meet
+###   -r REPORT    report files or directories.  Each results report is saved several
+###                times, growing a few pages (events) per save like at a meet
+###
+###  With -J, the journal of the watcher being tested (run it with --daemon --journal),
+###  every save is matched to the regeneration of that content and the tool prints
+###  the latency from the save to the wirecast files being written, and any saves
+###  that were never regenerated (dropped) or regenerated more than once (duplicated).
+###  A save replaced by a newer save before it was processed is expected to be
+###  coalesced, not regenerated.
+#############################################################################################
+#############################################################################################
+
+import argparse
+import hashlib
+import os
+import shutil
+import statistics
+import sys
+import time
+
+import sst_module_journal as sst_journal
+
+
+#####################################################################################
+## One save of one report
+#####################################################################################
+class ReplaySave:
+    def __init__(self, offset_secs: float, report_name: str, content: bytes):
+        self.offset_secs = offset_secs
+        self.report_name = report_name
+        self.content = content
+        self.sha256 = hashlib.sha256( content ).hexdigest()
+
+        ## Set when written
+        self.report_path = None
+        self.written_time = None
+
+
+#####################################################################################
+## Sequence from a recorded journal, with the recorded gaps between saves
+#####################################################################################
+def load_journal_saves( journal_dir: str ) -> list:
+
+    saves = []
+    first_time = None
+    for entry in sst_journal.read_journal( journal_dir ):
+        if entry["event"] != "ingest":
+            continue
+        if first_time is None:
+            first_time = entry["time"]
+
+        snapshot_filename = sst_journal.get_snapshot_filename( journal_dir, entry["sha256"] )
+        with open( snapshot_filename, "rb" ) as snapshot_file:
+            content = snapshot_file.read()
+        saves.append( ReplaySave( entry["time"] - first_time, os.path.basename( entry["report"] ), content ) )
+
+    return saves
+
+
+#####################################################################################
+## Synthetic meet from report files.  A results report is saved grow_saves times,
+## each save with more of its pages, so the last save is the full report.
+## Every save is repeated resaves times resave_gap apart, like an operator
+## clicking save again
+#####################################################################################
+def split_report_pages( content: bytes ) -> list:
+    pages = content.split( b'\x0c' )
+    return [ pages[0] ] + [ b'\x0c' + page for page in pages[1:] ]
+
+
+def build_report_saves( report_paths: list, interval: float, grow_saves: int, resaves: int, resave_gap: float ) -> list:
+
+    report_files = []
+    for report_path in report_paths:
+        if os.path.isdir( report_path ):
+            for file_name in sorted( os.listdir( report_path ) ):
+                if file_name.endswith( '.txt' ) and file_name != 'schools.txt':
+                    report_files.append( os.path.join( report_path, file_name ) )
+        else:
+            report_files.append( report_path )
+
+    ## The program is saved before the meet starts
+    report_files.sort( key=lambda report_file: 'program' not in os.path.basename(report_file).lower() )
+
+    saves = []
+    offset_secs = 0.0
+    for report_file in report_files:
+        with open( report_file, "rb" ) as report_in:
+            content = report_in.read()
+        report_name = os.path.basename( report_file )
+
+        versions = [ content ]
+        pages = split_report_pages( content )
+        if 'result' in report_name.lower() and grow_saves > 1 and len(pages) > grow_saves:
+            versions = []
+            for save_num in range( 1, grow_saves + 1 ):
+                num_pages = len(pages) * save_num // grow_saves
+                versions.append( b''.join( pages[:num_pages] ) )
+
+        for version in versions:
+            for resave_num in range( max( 1, resaves ) ):
+                saves.append( ReplaySave( offset_secs + resave_num * resave_gap, report_name, version ) )
+            offset_secs += interval
+
+    return saves
+
+
+#####################################################################################
+## Write one save into the watched directory
+##  deletecreate: Meet Manager's pattern. Remove the report, create it and write it in chunks
+##  overwrite:    truncate and rewrite in place
+##  rename:       write a hidden temp file and rename it over the report
+#####################################################################################
+def write_save( save: ReplaySave, watch_dir: str, pattern: str, num_chunks: int, chunk_delay: float ):
+
+    report_path = os.path.join( watch_dir, save.report_name )
+
+    if pattern == 'rename':
+        temp_path = os.path.join( watch_dir, f".{save.report_name}.tmp" )
+        with open( temp_path, "wb" ) as report_file:
+            report_file.write( save.content )
+        os.replace( temp_path, report_path )
+    else:
+        if pattern == 'deletecreate' and os.path.exists( report_path ):
+            os.remove( report_path )
+
+        chunk_size = max( 1, -(-len(save.content) // max( 1, num_chunks )) )
+        with open( report_path, "wb" ) as report_file:
+            for chunk_start in range( 0, len(save.content), chunk_size ):
+                if chunk_start > 0 and chunk_delay > 0:
+                    report_file.flush()
+                    time.sleep( chunk_delay )
+                report_file.write( save.content[chunk_start:chunk_start + chunk_size] )
+
+    save.report_path = os.path.abspath( report_path )
+    save.written_time = time.time()
+
+
+def replay_saves( saves: list, watch_dir: str, speed: float, pattern: str, num_chunks: int, chunk_delay: float ):
+
+    start_time = time.time()
+    for save_num, save in enumerate( saves ):
+        if speed > 0:
+            delay = start_time + save.offset_secs / speed - time.time()
+            if delay > 0:
+                time.sleep( delay )
+        write_save( save, watch_dir, pattern, num_chunks, chunk_delay )
+        print(f"{save_num + 1:>4}/{len(saves)} {time.time() - start_time:8.2f}s  {save.report_name}  {len(save.content)} bytes")
+
+
+#####################################################################################
+## Match the saves to the watcher's journal.
+## A save is superseded if another save of the same report was written before it was
+## processed.  The last save of a report, or one the watcher got to before the next
+## save, must be regenerated exactly once
+#####################################################################################
+def get_done_entries( journal_dir: str, start_time: float ) -> list:
+    return [ entry for entry in sst_journal.read_journal( journal_dir )
+             if entry["event"] == "done" and entry["time"] >= start_time ]
+
+
+def match_saves( saves: list, done_entries: list ) -> dict:
+
+    saves_by_report = {}
+    for save in saves:
+        saves_by_report.setdefault( save.report_path, [] ).append( save )
+
+    ## Each completed run belongs to the newest save of that content before it finished
+    regenerations = { id(save): [] for save in saves }
+    done_times_by_report = {}
+    failed = []
+    for entry in done_entries:
+        done_times_by_report.setdefault( entry["report"], [] ).append( entry["time"] )
+        if entry["status"] not in ("completed", "failed"):
+            continue
+        candidates = [ save for save in saves_by_report.get( entry["report"], [] )
+                       if save.sha256 == entry["sha256"] and save.written_time <= entry["time"] ]
+        if not candidates:
+            continue
+        if entry["status"] == "failed":
+            failed.append( candidates[-1] )
+            continue
+        regenerations[id(candidates[-1])].append( entry["time"] )
+
+    result = { "latency_ms": [], "regenerated": 0, "coalesced": 0, "dropped": [], "duplicated": [], "failed": failed }
+    for report_saves in saves_by_report.values():
+        for save_num, save in enumerate( report_saves ):
+            done_times = regenerations[id(save)]
+            if len(done_times) > 1:
+                result["duplicated"].append( save )
+            if done_times:
+                result["regenerated"] += 1
+                result["latency_ms"].append( (min(done_times) - save.written_time) * 1000 )
+            elif save in failed:
+                continue
+            elif save_num + 1 < len(report_saves) and is_superseded( save, report_saves[save_num + 1], done_times_by_report.get( save.report_path, [] ) ):
+                result["coalesced"] += 1
+            else:
+                result["dropped"].append( save )
+
+    return result
+
+
+def is_superseded( save: ReplaySave, next_save: ReplaySave, report_done_times: list ) -> bool:
+    """ The next save was written before the watcher finished any run of the report after this save """
+    first_done_time = min( ( done_time for done_time in report_done_times if done_time >= save.written_time ), default=None )
+    return first_done_time is None or next_save.written_time <= first_done_time
+
+
+def percentile( values: list, pct: float ) -> float:
+    values = sorted(values)
+    index = min( len(values) - 1, max( 0, round( pct / 100 * len(values) ) - 1 ) )
+    return values[index]
+
+
+def process_main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-w', '--watchdir',     dest='watchdir',    required=True,              help="Directory watched by watch_mm_reports.py")
+    parser.add_argument('-j', '--journal',      dest='journal',     default=None,               help="Replay this journal recorded by watch_mm_reports.py --journal")
+    parser.add_argument('-r', '--report',       dest='reports',     action='append', default=[], help="Report file or directory of reports to replay. Repeat for more than one")
+    parser.add_argument('-J', '--watcherjournal', dest='watcherjournal', default=None,          help="Journal of the watcher under test, to measure latency, drops and duplicates")
+    parser.add_argument('-x', '--speed',        dest='speed',       type=float, default=1.0,    help="Replay speed. 1 = recorded speed, 10 = ten times faster, 0 = no gaps")
+    parser.add_argument('-i', '--interval',     dest='interval',    type=float, default=30.0,   help="Seconds between saves for -r reports, before --speed")
+    parser.add_argument('-g', '--growsaves',    dest='growsaves',   type=int,   default=6,      help="Number of saves a results report grows over for -r reports. 1 to save it whole")
+    parser.add_argument('-R', '--resaves',      dest='resaves',     type=int,   default=1,      help="Times each -r save is repeated, like an operator saving again")
+    parser.add_argument('-G', '--resavegap',    dest='resavegap',   type=float, default=0.2,    help="Seconds between repeated saves, before --speed")
+    parser.add_argument('-p', '--pattern',      dest='pattern',     default='deletecreate', choices=['deletecreate', 'overwrite', 'rename'],
+                                                                                                help="How each save is written. deletecreate is Meet Manager's pattern")
+    parser.add_argument('-c', '--chunks',       dest='chunks',      type=int,   default=4,      help="Write each save in this many chunks")
+    parser.add_argument('-C', '--chunkdelay',   dest='chunkdelay',  type=float, default=0.02,   help="Seconds between chunks")
+    parser.add_argument('-s', '--schools',      dest='schools',     default=None,               help="schools.txt to copy into the watch directory first")
+    parser.add_argument('-d', '--drain',        dest='drain',       type=float, default=30.0,   help="Seconds to wait for the last regenerations after the replay")
+    args = parser.parse_args()
+
+    if args.journal:
+        saves = load_journal_saves( args.journal )
+    elif args.reports:
+        saves = build_report_saves( args.reports, args.interval, args.growsaves, args.resaves, args.resavegap )
+    else:
+        print("ERROR: give a journal (-j) or reports (-r) to replay")
+        sys.exit(2)
+
+    if not saves:
+        print("ERROR: nothing to replay")
+        sys.exit(2)
+
+    os.makedirs( args.watchdir, exist_ok=True )
+    if args.schools:
+        shutil.copyfile( args.schools, os.path.join( args.watchdir, 'schools.txt' ) )
+
+    replay_start_time = time.time()
+    replay_saves( saves, args.watchdir, args.speed, args.pattern, args.chunks, args.chunkdelay )
+
+    if not args.watcherjournal:
+        return
+
+    ## Wait until the last save of every report has been run
+    last_saves = { save.report_path: save for save in saves }
+    deadline = time.time() + args.drain
+    while True:
+        result = match_saves( saves, get_done_entries( args.watcherjournal, replay_start_time ) )
+        waiting = [ save for save in result["dropped"] if save in last_saves.values() ]
+        if not waiting or time.time() >= deadline:
+            break
+        time.sleep( 0.25 )
+
+    ## Late duplicates show up shortly after
+    time.sleep( 1.0 )
+    result = match_saves( saves, get_done_entries( args.watcherjournal, replay_start_time ) )
+
+    print(f"\nsaves {len(saves)}  regenerated {result['regenerated']}  coalesced {result['coalesced']}  "
+          f"dropped {len(result['dropped'])}  duplicated {len(result['duplicated'])}  failed {len(result['failed'])}")
+    latency_ms = result["latency_ms"]
+    if latency_ms:
+        print(f"latency from save to files written (ms): p50 {statistics.median(latency_ms):.1f}  "
+              f"p90 {percentile(latency_ms, 90):.1f}  p99 {percentile(latency_ms, 99):.1f}  max {max(latency_ms):.1f}")
+    for save in result["dropped"]:
+        print(f"DROPPED: {save.report_name} saved at {save.offset_secs:.2f}s")
+    for save in result["duplicated"]:
+        print(f"DUPLICATED: {save.report_name} saved at {save.offset_secs:.2f}s")
+    for save in result["failed"]:
+        print(f"FAILED: {save.report_name} saved at {save.offset_secs:.2f}s")
+
+
+if __name__ == "__main__":
+    process_main()
@@ -0,0 +1,170 @@
+import re
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ C O L U M N S                          ##########
+##########                                                                 ##########
+##########    MM reports are fixed width.  Read where the columns are      ##########
+##########    from the column header line printed on each page, then cut   ##########
+##########    the entry/place lines into fields with plain slicing         ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+#####################################################################################
+## Column header lines, as they come out of the report (not stripped):
+##      Name                    Yr School                 Seed Time  Finals Time      Points
+##      Name                    Yr School                           Finals Score      Points
+##      Team                       Relay                  Seed Time  Finals Time      Points
+## Lane  Name                    Year School                  Seed Time
+## Lane  Team                         Relay                   Seed Time
+##
+## Names, teams and schools start under their title.  Times, scores and points end
+## under the end of their title.  The header doesn't show how wide the school is (it can
+## run under "Seed Time"), so that comes from the parser's header_len_dict.
+## A diving seed (NP) has no title.  It is between the school and Finals Score
+#####################################################################################
+re_column_title = re.compile(r'Seed Time|Finals Time|Finals Score|\S+')
+
+## Field values, the same as the parsers' regex groups.  A line with a field that
+## doesn't fit (columns not where the header says) goes to the parser's regex instead.
+## The fields of a line are checked with one match, joined by tabs (so no . or \s here)
+result_individual_patterns = ( r'[*]? *\d{1,2}|---', r'[^\t]{1,23}', r'[A-z0-9 ]{0,2}', r'[A-z\-\\.\' ]+',
+                               r'[0-9:.]+|NT|NP', r'[X]DQ|[xX0-9:.]+', r'[0-9]*' )
+result_relay_patterns = ( r'[*]?\d{1,2}|---', r'[A-Z \'.][^\t]*', r'[A-Z]', r'[0-9:.]+|NT', r'[X]DQ|[xX0-9:.]+', r'[0-9]*' )
+program_individual_patterns = ( r'\d{1,2}', r"[A-z' .]+, [A-z ]+?", r'[A-Z0-9]{1,2}', r"[A-Z '.][^\t]*", r'(?:[X]?[0-9:.]+|NT|XNT|NP|XNP)?' )
+program_relay_patterns = ( r'\d{1,2}', r"[A-Z '.][^\t]*", r'[A-Z]', r'(?:[X]?[0-9:.]+|NT|XNT)?' )
+
+
+#####################################################################################
+## LineLayout
+## Where to cut one kind of line on a page: the field boundaries, the left aligned
+## fields that need a space in front of them (or they ran into the column before),
+## and the check for the fields
+#####################################################################################
+class LineLayout:
+    def __init__(self, boundaries: list, field_starts: list, field_patterns: tuple):
+        self.spans = list( zip( [ 0 ] + boundaries, boundaries + [ None ] ) )
+        self.field_starts = [ field_start for field_start in field_starts if field_start > 0 ]
+        self.re_fields = re.compile( "\t".join( f"(?:{field_pattern})" for field_pattern in field_patterns ) )
+
+    def get_fields(self, line: str):
+        """ The stripped fields of the line, or None if it doesn't fit """
+
+        for field_start in self.field_starts:
+            if line[field_start-1:field_start] != " ":
+                return None
+        fields = [ line[start:end].strip() for start, end in self.spans ]
+        if self.re_fields.fullmatch( "\t".join( fields ) ) is None:
+            return None
+        return fields
+
+
+#####################################################################################
+## ColumnLayout
+## Title -> (start, end) offsets of one column header line.  The LineLayouts are
+## worked out once per page, the first time a line of that kind is read
+#####################################################################################
+class ColumnLayout:
+    def __init__(self, header_line: str):
+        self.columns = {}
+        self.line_layouts = {}
+        for match in re_column_title.finditer( header_line ):
+            self.columns.setdefault( match.group(), ( match.start(), match.end() ) )
+
+    def has(self, title: str) -> bool:
+        return title in self.columns
+
+    def get_start(self, title: str) -> int:
+        return self.columns[title][0]
+
+    def get_end(self, title: str) -> int:
+        return self.columns[title][1]
+
+    def get_line_layout(self, line_layout_fn, *layout_args):
+        """ line_layout_fn(self, *layout_args) -> LineLayout, kept for the page.  None if the
+            header is missing a column it needs """
+
+        layout_key = ( line_layout_fn, layout_args )
+        if layout_key not in self.line_layouts:
+            try:
+                self.line_layouts[layout_key] = line_layout_fn( self, *layout_args )
+            except KeyError:
+                self.line_layouts[layout_key] = None
+        return self.line_layouts[layout_key]
+
+
+#####################################################################################
+## RESULTS INDIVIDUAL/DIVING: [place, name, grade, school, seed, final, points]
+#####################################################################################
+def get_result_individual_layout( layout: ColumnLayout, school_name_len: int ) -> LineLayout:
+    name_start = layout.get_start( 'Name' )
+    school_start = layout.get_start( 'School' )
+    if layout.has( 'Seed Time' ):
+        seed_end = layout.get_end( 'Seed Time' )
+        final_end = layout.get_end( 'Finals Time' )
+    else:
+        seed_end = layout.get_start( 'Finals Score' )
+        final_end = layout.get_end( 'Finals Score' )
+
+    return LineLayout( [ name_start, layout.get_start( 'Yr' ), school_start, school_start + school_name_len, seed_end, final_end ],
+                       [ name_start, school_start ], result_individual_patterns )
+
+
+def get_result_fields_individual( line: str, layout: ColumnLayout, school_name_len: int ):
+    line_layout = layout.get_line_layout( get_result_individual_layout, school_name_len )
+    return line_layout.get_fields( line ) if line_layout else None
+
+
+#####################################################################################
+## RESULTS RELAY: [place, team, relay, seed, final, points]
+#####################################################################################
+def get_result_relay_layout( layout: ColumnLayout ) -> LineLayout:
+    team_start = layout.get_start( 'Team' )
+    relay_start = layout.get_start( 'Relay' )
+
+    return LineLayout( [ team_start, relay_start, layout.get_end( 'Relay' ), layout.get_end( 'Seed Time' ), layout.get_end( 'Finals Time' ) ],
+                       [ team_start, relay_start ], result_relay_patterns )
+
+
+def get_result_fields_relay( line: str, layout: ColumnLayout ):
+    line_layout = layout.get_line_layout( get_result_relay_layout )
+    return line_layout.get_fields( line ) if line_layout else None
+
+
+#####################################################################################
+## PROGRAM INDIVIDUAL/DIVING: [lane, name, grade, school, seed]
+#####################################################################################
+def get_program_individual_layout( layout: ColumnLayout, school_name_len: int ) -> LineLayout:
+    name_start = layout.get_start( 'Name' )
+    school_start = layout.get_start( 'School' )
+
+    return LineLayout( [ name_start, layout.get_start( 'Year' ), school_start, school_start + school_name_len ],
+                       [ name_start, school_start ], program_individual_patterns )
+
+
+def get_program_fields_individual( line: str, layout: ColumnLayout, school_name_len: int ):
+    line_layout = layout.get_line_layout( get_program_individual_layout, school_name_len )
+    return line_layout.get_fields( line ) if line_layout else None
+
+
+#####################################################################################
+## PROGRAM RELAY: [lane, team, relay, seed]
+#####################################################################################
+def get_program_relay_layout( layout: ColumnLayout ) -> LineLayout:
+    team_start = layout.get_start( 'Team' )
+    relay_start = layout.get_start( 'Relay' )
+
+    return LineLayout( [ team_start, relay_start, layout.get_end( 'Relay' ) ],
+                       [ team_start, relay_start ], program_relay_patterns )
+
+
+def get_program_fields_relay( line: str, layout: ColumnLayout ):
+    line_layout = layout.get_line_layout( get_program_relay_layout )
+    return line_layout.get_fields( line ) if line_layout else None
@@ -13,16 +13,32 @@
 #####################################################################################
 
 import os
+import time
 from os import path
 from datetime import datetime, timedelta
 import logging
+import threading
 import unicodedata
 import sst_module_schools as sst_module_schools
 
 
-event_num_individual = []
-event_num_relay      = []
-event_num_diving     = []
+#####################################################################################
+## Meet state: the events for the meet type and the school list for the report
+## being processed.  The watcher daemon processes several reports at once on worker
+## threads, each possibly for a different meet, so this is kept per thread
+#####################################################################################
+class MeetState(threading.local):
+    def __init__(self):
+        self.event_num_individual = []
+        self.event_num_relay      = []
+        self.event_num_diving     = []
+
+        ## Contains a list of dictionaries with the following Keys:
+        ## {'school_abbr_full': 'BW-PV', 'school_abbr_short': 'BW', 'school_name_full': 'Brookewood School', 'school_name_short': 'Brookewood'}
+        ## This list is populated in the function sst_modules_schools.process_schools_report
+        self.school_name_list = []
+
+meet_state = MeetState()
 
 
 ## Define the header types in the output list so we can include/exclude as necessary
@@ -32,15 +48,6 @@ headerNum3 = -3   ## Report type
 
 
 
-#####################################################################################
-## Text used for REGEX to convert long names to short names
-## Value are now loaded from the school report (saved as a txt file)
-#####################################################################################
-
-## Contains a list of dictionaries with the following Keys:
-## {'school_abbr_full': 'BW-PV', 'school_abbr_short': 'BW', 'school_name_full': 'Brookewood School', 'school_name_short': 'Brookewood'}
-## This list is populated in the function sst_modules_schools.process_schools_report
-school_name_list = []
 long_school_name_len=23
 
 #####################################################################################
@@ -167,27 +174,24 @@ proper_school_name_dict = {
 
 
 def setEvents( meet_type: str ) -> bool:
-    global event_num_individual
-    global event_num_relay
-    global event_num_diving
 
     success = True
 
     if meet_type == "SetonTimeTrials":
         # Seton time trial events
-        event_num_individual = [1,2,3,4,5,6,7,8,9,10,11,12]
-        event_num_relay      = []
-        event_num_diving     = []
+        meet_state.event_num_individual = [1,2,3,4,5,6,7,8,9,10,11,12]
+        meet_state.event_num_relay      = []
+        meet_state.event_num_diving     = []
     elif meet_type == "HighSchool":
         # Standard High School Meet order of events (Dual Meet and Championship)
-        event_num_individual = [3,4,5,6,7,8,11,12,13,14,15,16,19,20,21,22]
-        event_num_relay      = [1,2,17,18,23,24]
-        event_num_diving     = [9,10]
+        meet_state.event_num_individual = [3,4,5,6,7,8,11,12,13,14,15,16,19,20,21,22]
+        meet_state.event_num_relay      = [1,2,17,18,23,24]
+        meet_state.event_num_diving     = [9,10]
     elif meet_type == "JV":
         ## JV Invite Order of EVENTS
-        event_num_individual = [3,4,5,6,9,10,11,12,15,16,17,18]
-        event_num_relay      = [1,2,7,8,13,14,19,20,101,102,103]
-        event_num_diving     = []
+        meet_state.event_num_individual = [3,4,5,6,9,10,11,12,15,16,17,18]
+        meet_state.event_num_relay      = [1,2,7,8,13,14,19,20,101,102,103]
+        meet_state.event_num_diving     = []
     else:
         success = False
         logging.error(f"Unknow Meet  Type: {meet_type}")
@@ -251,6 +255,81 @@ def find_short_team_name_hardcoded_names( team_name_in: str ):
     logging.debug(f"Proper Name i:' {team_name_in}' o: '{proper_name}'")
     return proper_name 
 
+#####################################################################################
+## Per run state
+## The watcher daemon runs many reports in one process on worker threads, so
+## the files written by this run and its cancel flag are kept per thread
+#####################################################################################
+run_state = threading.local()
+
+class ReportCancelled(Exception):
+    """ Raised when a newer save of the report being processed supersedes this run """
+    pass
+
+def start_run( cancel_event: threading.Event = None, keep_parsed_pages: bool = False ):
+    """ Reset the per run state.  cancel_event is set by the watcher to stop a stale run.
+        keep_parsed_pages keeps every parsed page for the run (the watcher renders them
+        again), otherwise a page is dropped once its files are written """
+    run_state.files_written = set()
+    run_state.cancel_event = cancel_event
+    run_state.stats = {}
+    run_state.unmatched_schools = set()
+    run_state.parsed_pages = [] if keep_parsed_pages else None
+    ## The hash of the pages of each event/heat, set by -I/--incremental
+    run_state.page_hashes = None
+    ## The lines and pattern counts of --parsecoverage (sst_parse_coverage), None when off
+    run_state.coverage = None
+
+def merge_run_state( files_written: set, stats: dict, unmatched_schools: set ):
+    """ Add the run state of part of the report done by another process (-j/--jobs) """
+    run_state.files_written.update( files_written )
+    for stat_name, amount in stats.items():
+        if stat_name != 'unmatched_schools':
+            add_run_stat( stat_name, amount )
+    ## A school missing in more than one part is counted once
+    new_unmatched_schools = unmatched_schools - run_state.unmatched_schools
+    run_state.unmatched_schools.update( new_unmatched_schools )
+    if new_unmatched_schools:
+        add_run_stat( 'unmatched_schools', len( new_unmatched_schools ) )
+
+def add_run_stat( stat_name: str, amount: float = 1 ):
+    """ Add to a per run counter read by the watcher's metrics (files_skipped, lines_unparsed, ...) """
+    stats = getattr(run_state, 'stats', None)
+    if stats is not None:
+        stats[stat_name] = stats.get( stat_name, 0 ) + amount
+
+def save_parsed_page( page_type: str, page_key, output_list: list ):
+    """ Keep each parsed page (event or event/heat) so the watcher can write its files
+        again without reading the report again """
+    parsed_pages = getattr(run_state, 'parsed_pages', None)
+    if parsed_pages is not None:
+        parsed_pages.append( (page_type, page_key, output_list) )
+
+def add_unmatched_school( school_name: str ):
+    """ Count each report school name missing from schools.txt once per run """
+    unmatched_schools = getattr(run_state, 'unmatched_schools', None)
+    if unmatched_schools is not None and school_name not in unmatched_schools:
+        unmatched_schools.add( school_name )
+        add_run_stat( 'unmatched_schools' )
+        logging.warning(f"School not found in schools file: '{school_name}'")
+
+def render_timer( render_fn ):
+    """ Decorator for the functions that build and write output files.  Their time is
+        counted as render time and the rest of the run as parse time """
+    def timed_render( *args, **kwargs ):
+        start_time = time.perf_counter()
+        try:
+            return render_fn( *args, **kwargs )
+        finally:
+            add_run_stat( 'render_secs', time.perf_counter() - start_time )
+    return timed_render
+
+def check_run_cancelled():
+    """ Stop before writing any more stale files if this run was superseded """
+    cancel_event = getattr(run_state, 'cancel_event', None)
+    if cancel_event is not None and cancel_event.is_set():
+        raise ReportCancelled()
+
 #####################################################################################
 ## In some wierd cases, we overwrite a good file with some extra text that 
 ## wrapped to next page.  If a file was just created, and we try to write over it
@@ -284,19 +363,33 @@ def has_file_been_modified_recently( file_name: str, secs: int) -> bool:
 #####################################################################################
 def write_output_file( output_dir: str, output_file_name: str, output_str: str ):
     """ generate the actual output file """
-    
+
+    check_run_cancelled()
+
     ## Create output dir if not exists
     if not os.path.exists( output_dir ):
         os.makedirs( output_dir )
     
-    ## If this file has been created in last xx secs, then this is really results data
+    ## If this file has already been written by this run, then this is really results data
     ## from the next page. Don't overwrite existing file
+    ## Without start_run() fall back to a file created in last xx secs
     output_full_path = f"{output_dir}{output_file_name}"
-    if not has_file_been_modified_recently( output_full_path, 5 ):
+    files_written = getattr(run_state, 'files_written', None)
+    if files_written is None:
+        already_written = has_file_been_modified_recently( output_full_path, 5 )
+    else:
+        already_written = output_full_path in files_written
+
+    if not already_written:
         logging.info(f"generating file {output_full_path}")
         output_file_handler = open( output_full_path, "w+" )
         output_file_handler.write( output_str )
         output_file_handler.close()
+        if files_written is not None:
+            files_written.add( output_full_path )
+        add_run_stat( 'files_written' )
+    else:
+        add_run_stat( 'files_skipped' )
 
 
 def get_event_num_from_eventline( line: str ) -> int:
@@ -331,11 +424,11 @@ def get_header_line( event_num: int, shorten_school_names_relays: bool, shorten_
     """ Return the proper header list for the report type """
 
     name_list_header = ""
-    if event_num in event_num_individual:
+    if event_num in meet_state.event_num_individual:
         name_list_header = header_dict['individual_short'] if shorten_school_names_individual else header_dict['individual_long']   
-    elif event_num in event_num_diving:
+    elif event_num in meet_state.event_num_diving:
         name_list_header = header_dict['diving_short'] if shorten_school_names_individual else header_dict['diving_long']
-    elif event_num in event_num_relay:
+    elif event_num in meet_state.event_num_relay:
         name_list_header = header_dict['relay_short'] if shorten_school_names_relays else header_dict['relay_long']
 
     return name_list_header
@@ -376,6 +469,7 @@ def short_school_name_lookup( long_school_name: str, long_school_name_len: int,
         short_school_name = school_dict['school_name_short']
     except Exception as nssfn:
         short_school_name = long_school_name.strip()
+        add_unmatched_school( short_school_name )
 
     return short_school_name
 
@@ -384,11 +478,12 @@ def short_school_name_lookup( long_school_name: str, long_school_name_len: int,
 #####################################################################################
 def short_school_abbr_lookup( long_school_name: str, long_school_name_len: int, trunc_len :int = 0 ) -> str:
 
-    #try:
-    school_dict = sst_module_schools.get_schools_dict_by_full_name( long_school_name.strip() )
+    try:
+        school_dict = sst_module_schools.get_schools_dict_by_full_name( long_school_name.strip() )
+    except Exception as nssfn:
+        add_unmatched_school( long_school_name.strip() )
+        raise
     short_school_name = school_dict['school_abbr_short']
-    #except Exception as nssfn:
-    #    short_school_name = long_school_name.strip()
 
     return short_school_name
 def reverse_lastname_firstname( name_last_first ):
@@ -428,7 +523,7 @@ def verify_dirs_files(  input_dir: str, input_file:str, school_file:str, output_
         if not os.path.isfile( fullFile ):
             error_msg = f"\tInput file not found: {fullFile}"
         else:
-            schoolFile = f"{input_dir}/{school_file}"
+            schoolFile = os.path.join( input_dir, school_file )
             if not os.path.isfile( schoolFile ):
                 error_msg = f"School text report file not found: {schoolFile}"
 
@@ -444,7 +539,11 @@ def verify_dirs_files(  input_dir: str, input_file:str, school_file:str, output_
 
 #####################################################################################
 ## Remove characters such as Céilí 
+## Nearly every report line is plain ASCII and has nothing to remove, so only the
+## others are normalized
 #####################################################################################
 def remove_accents(input_str):
+    if input_str.isascii():
+        return input_str
     nfkd_form = unicodedata.normalize('NFKD', input_str)
     return u"".join([c for c in nfkd_form if not unicodedata.combining(c)])
\ No newline at end of file
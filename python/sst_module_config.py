@@ -0,0 +1,176 @@
+import json
+import os
+import argparse
+
+## TOML needs python 3.11 (tomllib).  JSON config files work everywhere
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ C O N F I G                            ##########
+##########                                                                 ##########
+##########    Per directory config profile for the watcher: the meet type, ##########
+##########    options and school file for the reports saved to a watched   ##########
+##########    directory, instead of a long command line                    ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+## .wirecast_config.json or .wirecast_config.toml in the watched directory.
+## Keys are generate_wirecast_files long option names (or dests), values are JSON/TOML
+## values.  Flags take true/false.  For example:
+##   { "meettype": "HighSchool", "champ": true, "awards": true, "numresults": 8,
+##     "schools": "vcac_schools.txt", "outputdir": "C:/wirecast/vcac" }
+config_basename = ".wirecast_config"
+config_extensions = ( ".json", ".toml" )
+
+## Options a config file (and the watcher's control commands) can set, by dest
+config_options = ( 'numresults', 'displayRelayNames', 'awards', 'awardsRelayNames', 'splitrelays', 'relayformat',
+                   'shortschoolrelay', 'longschoolindividual', 'namesfirstlast', 'championshipmeet', 'meettype',
+                   'schoolfilename', 'loglevel', 'outputdir' )
+
+## Same names as the routes file
+option_aliases = { 'schools': 'schoolfilename' }
+
+## The inputdir/filename are set for each report
+report_dests = ( 'inputdir', 'filename', 'help' )
+
+
+def is_config_file( filepath: str ) -> bool:
+    return os.path.basename( filepath ) in [ config_basename + extension for extension in config_extensions ]
+
+
+def get_config_filename( dir_path: str ):
+    """ The config file in dir_path, or None """
+
+    for extension in config_extensions:
+        config_filename = os.path.join( dir_path, config_basename + extension )
+        if os.path.isfile( config_filename ):
+            return config_filename
+    return None
+
+
+def get_file_state( filename: str ):
+    """ (filename, mtime, size) to tell if the config changed.  None if there is no config """
+
+    if filename is None:
+        return None
+    try:
+        stat = os.stat( filename )
+    except FileNotFoundError:
+        return None
+    return ( filename, stat.st_mtime_ns, stat.st_size )
+
+
+def read_config( config_filename: str ) -> dict:
+    """ The options in a config file.  Raises ValueError if it can't be read """
+
+    try:
+        if config_filename.endswith( ".toml" ):
+            if tomllib is None:
+                raise ValueError( "TOML config files need python 3.11 or newer. Use .wirecast_config.json" )
+            with open( config_filename, "rb" ) as config_file:
+                config = tomllib.load( config_file )
+        else:
+            with open( config_filename, "r" ) as config_file:
+                config = json.load( config_file )
+    except OSError as error:
+        raise ValueError( f"can't read {config_filename}: {error}" )
+    except ValueError as error:
+        raise ValueError( f"{config_filename} is not valid: {error}" )
+
+    if not isinstance( config, dict ):
+        raise ValueError( f"{config_filename} must hold a table of options" )
+    return config
+
+
+#####################################################################################
+## Lower case long option name or dest -> argparse action, for the options in dests
+#####################################################################################
+def get_option_actions( parser: argparse.ArgumentParser, dests: tuple = config_options ) -> dict:
+
+    option_actions = {}
+    for action in parser._actions:
+        if action.dest not in dests:
+            continue
+        option_actions[action.dest.lower()] = action
+        for option_string in action.option_strings:
+            if option_string.startswith('--'):
+                option_actions[option_string[2:].strip().lower()] = action
+
+    for alias, dest in option_aliases.items():
+        if dest.lower() in option_actions:
+            option_actions[alias] = option_actions[dest.lower()]
+
+    return option_actions
+
+
+def get_option_action( option_actions: dict, option_name: str ):
+    """ The action for an option name, or raise ValueError listing the names that can be used """
+
+    action = option_actions.get( option_name.lstrip('-').lower() )
+    if action is None:
+        option_names = ", ".join( sorted( set( action.option_strings[-1].lstrip('-') for action in option_actions.values() ) ) )
+        raise ValueError( f"'{option_name}' can't be set. Options: {option_names}" )
+    return action
+
+
+def convert_option_value( action: argparse.Action, option_name: str, value ):
+    """ Check and convert a value from a config file or a control command (a string).
+        Flags take true/false or on/off.  Raises ValueError """
+
+    if action.nargs == 0:
+        if isinstance( value, bool ):
+            return value
+        if str(value).lower() not in ('on', 'off', 'true', 'false', 'yes', 'no', '1', '0'):
+            raise ValueError( f"{option_name} is on or off" )
+        return str(value).lower() in ('on', 'true', 'yes', '1')
+
+    if isinstance( value, (bool, dict, list) ):
+        raise ValueError( f"{option_name}: '{value}' is not a valid value" )
+    try:
+        value = action.type( value ) if action.type else str( value )
+    except ValueError:
+        raise ValueError( f"{option_name}: '{value}' is not a valid value" )
+    if action.choices is not None and value not in action.choices:
+        choices = ", ".join( str(choice) for choice in action.choices )
+        raise ValueError( f"{option_name}: '{value}' is not one of {choices}" )
+    return value
+
+
+def apply_config( args: argparse.Namespace, config: dict, option_actions: dict ):
+    """ Set the options in config on args.  Raises ValueError for an unknown option or bad value """
+
+    for option_name, value in config.items():
+        action = get_option_action( option_actions, option_name )
+        setattr( args, action.dest, convert_option_value( action, option_name, value ) )
+
+
+#####################################################################################
+## Command line options giving the same namespace, for running a report in a new
+## python process.  Options left at their default aren't listed
+#####################################################################################
+def get_option_argv( parser: argparse.ArgumentParser, args: argparse.Namespace ) -> list:
+
+    argv = []
+    for action in parser._actions:
+        if not action.option_strings or action.dest in report_dests:
+            continue
+        value = getattr( args, action.dest, None )
+        if value is None or value == action.default:
+            continue
+        if action.nargs == 0:
+            argv.append( action.option_strings[-1] )
+        else:
+            argv.extend( [ action.option_strings[-1], str(value) ] )
+
+    return argv
@@ -0,0 +1,75 @@
+import logging
+import socket
+import socketserver
+import threading
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ C O N T R O L                          ##########
+##########                                                                 ##########
+##########    Operator command channel for the watcher daemon.  One text   ##########
+##########    command per line on a loopback TCP port.  Each response is   ##########
+##########    one or more lines ended by an empty line.  Works the same    ##########
+##########    on Windows and Linux                                         ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+class ControlRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            command = line.decode( "utf-8", errors="replace" ).strip()
+            if not command:
+                continue
+            if command.lower() in ('quit', 'exit'):
+                break
+
+            try:
+                response = self.server.command_fn( command )
+            except Exception as error:
+                logging.exception(f"control command failed: {command}")
+                response = f"ERROR {error}"
+
+            self.wfile.write( (response.rstrip("\n") + "\n\n").encode( "utf-8" ) )
+            self.wfile.flush()
+
+
+class ControlServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def start_control_server( port: int, command_fn, host: str = "127.0.0.1" ):
+    """ Call command_fn(command) -> response for each command line. Returns the server, or None if the port can't be used """
+
+    try:
+        server = ControlServer( (host, port), ControlRequestHandler )
+    except OSError as error:
+        logging.error(f"Control port not opened on {host}:{port}: {error}")
+        return None
+
+    server.command_fn = command_fn
+    thread = threading.Thread( target=server.serve_forever, name="control-server", daemon=True )
+    thread.start()
+    return server
+
+
+def send_command( command: str, port: int, host: str = "127.0.0.1", timeout: float = 120.0 ) -> str:
+    """ Send one command to the watcher and return its response """
+
+    with socket.create_connection( (host, port), timeout=timeout ) as control_socket:
+        control_socket.sendall( (command + "\n").encode( "utf-8" ) )
+        control_file = control_socket.makefile( "rb" )
+        response_lines = []
+        for line in control_file:
+            line = line.decode( "utf-8" ).rstrip("\n")
+            if line == "":
+                break
+            response_lines.append( line )
+        return "\n".join( response_lines )
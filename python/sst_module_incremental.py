@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import sst_module_common as sst_common
+import sst_module_manifest as sst_manifest
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ I N C R E M E N T A L                  ##########
+##########                                                                 ##########
+##########    -I/--incremental.  Results reports are cumulative, so after  ##########
+##########    event 20 the report still has events 1-19.  The hash of the  ##########
+##########    pages of each event (results) or heat (program) is saved in  ##########
+##########    the output directory, and the next run of the report only    ##########
+##########    parses and writes the events or heats whose pages changed    ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+## Part of the options hash.  Change it when the way pages are split into units changes
+state_format = 1
+state_filename = ".wirecast_pages.json"
+
+## The state files are read, changed and saved by one thread at a time
+state_lock = threading.Lock()
+
+
+#####################################################################################
+## Units.  An event for results, an event/heat for a program: the pages a parser
+## writes the files of one event or heat from.  Pages without an Event line (continued
+## pages, the team scores at the end of results) go with the event before them
+#####################################################################################
+def get_unit_key( report_kind: str, event_num: int, heat_num: int ) -> str:
+    return f"{event_num}/{heat_num}" if report_kind == 'program' else f"{event_num}"
+
+
+def get_parsed_page_unit( page_type: str, page_key, last_unit_key: str ) -> str:
+    if page_type == 'program':
+        return f"{page_key[0]}/{page_key[1]}"
+    if page_type == 'results':
+        return f"{page_key}"
+    ## The team scores are parsed from the last pages
+    return last_unit_key
+
+
+#####################################################################################
+## get_options_sha256
+## The schools file and every option that changes what is written.  Files written
+## with other options are all written again
+#####################################################################################
+def get_options_sha256( report_kind: str, schools_filename: str, option_values: list ) -> str:
+
+    sha = hashlib.sha256()
+    for key_part in ( state_format, report_kind, sst_manifest.compute_file_sha256( schools_filename ), option_values ):
+        sha.update( repr( key_part ).encode() + b"\0" )
+    return sha.hexdigest()
+
+
+#####################################################################################
+## PageState
+## One JSON file in each output directory:
+##  { "report full path|kind": { "options": get_options_sha256,
+##                               "units": { unit key: sha256 of its pages },
+##                               "outputs": [ output full path ] } }
+#####################################################################################
+class PageState:
+    def __init__(self, output_dir: str):
+        self.state_filename = os.path.join( output_dir, state_filename )
+
+    def load(self) -> dict:
+        try:
+            with open( self.state_filename, "r" ) as state_file:
+                return json.load( state_file )
+        except FileNotFoundError:
+            return {}
+        except (ValueError, OSError) as error:
+            logging.warning(f"Ignoring unreadable page state {self.state_filename}: {error}")
+            return {}
+
+    def get(self, report_filename: str, report_kind: str) -> dict:
+        with state_lock:
+            return self.load().get( f"{os.path.abspath(report_filename)}|{report_kind}" )
+
+    def record(self, report_filename: str, report_kind: str, entry: dict):
+        """ Write to a temp file and rename so a crash never leaves a half written file """
+
+        with state_lock:
+            reports = self.load()
+            reports[f"{os.path.abspath(report_filename)}|{report_kind}"] = entry
+            temp_filename = f"{self.state_filename}.tmp"
+            with open( temp_filename, "w" ) as state_file:
+                json.dump( reports, state_file, indent=1, sort_keys=True )
+            os.replace( temp_filename, self.state_filename )
+
+
+#####################################################################################
+## IncrementalRun
+## One run of a program or results report with -I.  Works out the units whose pages
+## changed from the report's page index (sst_page_index.PageIndex) and the state saved
+## by the last run, and saves the state once the files are written.
+## With keep_parsed_pages, previous_run has the parsed_pages and page_hashes kept by the
+## last run of the report in this process (the watcher's ParsedReport), or is None.
+## Its pages are kept for the units not parsed again, and a unit without one is parsed again
+#####################################################################################
+class IncrementalRun:
+    def __init__(self,
+                 output_dir: str,
+                 report_filename: str,
+                 report_kind: str,
+                 page_index,
+                 options_sha256: str,
+                 regenerate_all: bool = False,
+                 keep_parsed_pages: bool = False,
+                 previous_run = None):
+
+        self.page_state = PageState( output_dir )
+        self.report_filename = report_filename
+        self.report_kind = report_kind
+        self.options_sha256 = options_sha256
+        self.previous_run = previous_run if keep_parsed_pages else None
+
+        ## Each unit's pages and their hash, in report order
+        self.unit_pages = {}
+        for page in page_index.get_pages():
+            self.unit_pages.setdefault( get_unit_key( report_kind, page.event_num, page.heat_num ), [] ).append( page )
+        self.unit_hashes = { unit_key: hashlib.sha256( b"".join( page_index.mm[page.start:page.end] for page in pages ) ).hexdigest()
+                             for unit_key, pages in self.unit_pages.items() }
+        self.last_unit_key = next( reversed( self.unit_pages ), None )
+
+        entry = None if regenerate_all else self.page_state.get( report_filename, report_kind )
+        self.previous_outputs = []
+        if entry is None or entry.get( "options" ) != options_sha256:
+            self.changed_units = set( self.unit_pages )
+        elif not all( os.path.exists( output_filename ) for output_filename in entry["outputs"] ):
+            logging.info(f"Files written by the last run are missing, all pages of {os.path.basename(report_filename)} written again")
+            self.changed_units = set( self.unit_pages )
+        else:
+            self.previous_outputs = entry["outputs"]
+            previous_hashes = entry["units"]
+            if keep_parsed_pages:
+                ## Only the pages kept from the same pages can be used again
+                kept_hashes = ( previous_run.page_hashes if previous_run is not None else None ) or {}
+                previous_hashes = { unit_key: unit_hash for unit_key, unit_hash in previous_hashes.items()
+                                    if kept_hashes.get( unit_key ) == unit_hash }
+            self.changed_units = set( unit_key for unit_key, unit_hash in self.unit_hashes.items()
+                                      if previous_hashes.get( unit_key ) != unit_hash )
+
+        sst_common.add_run_stat( 'incremental_regenerated', len(self.changed_units) )
+        sst_common.add_run_stat( 'incremental_unchanged', len(self.unit_pages) - len(self.changed_units) )
+
+    def is_whole_report(self) -> bool:
+        return len(self.changed_units) == len(self.unit_pages)
+
+    def is_last_unit_changed(self) -> bool:
+        return self.last_unit_key in self.changed_units
+
+    def get_page_spans(self) -> list:
+        """ The (start, end) byte spans of the pages of the changed units, in report order """
+
+        return [ ( page.start, page.end ) for unit_key, pages in self.unit_pages.items() if unit_key in self.changed_units for page in pages ]
+
+    def merge_parsed_pages(self, parsed_pages: list) -> list:
+        """ The pages parsed by this run with the pages kept for the units not parsed again, in report order """
+
+        if self.is_whole_report():
+            return parsed_pages
+
+        unit_order = { unit_key: unit_num for unit_num, unit_key in enumerate( self.unit_pages ) }
+        kept_pages = [ parsed_page for parsed_page in ( self.previous_run.parsed_pages if self.previous_run is not None else [] )
+                       if get_parsed_page_unit( parsed_page[0], parsed_page[1], self.last_unit_key ) in unit_order.keys() - self.changed_units ]
+        return sorted( kept_pages + parsed_pages,
+                       key=lambda parsed_page: unit_order.get( get_parsed_page_unit( parsed_page[0], parsed_page[1], self.last_unit_key ), len(unit_order) ) )
+
+    def record(self, files_written):
+        """ Save the page hashes once the files of the changed units are written """
+
+        outputs = set( os.path.abspath( output_filename ) for output_filename in files_written )
+        if not self.is_whole_report():
+            outputs.update( self.previous_outputs )
+        self.page_state.record( self.report_filename, self.report_kind,
+                                { "options": self.options_sha256, "units": self.unit_hashes, "outputs": sorted( outputs ) } )
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ J O U R N A L                          ##########
+##########                                                                 ##########
+##########    Record every report the watcher ingests with a snapshot of   ##########
+##########    its content, and the outcome of every run, so a meet can be  ##########
+##########    replayed later (replay_mm_reports.py) and the regenerations  ##########
+##########    checked for latency, drops and duplicates                    ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+## Journal directory layout:
+##   journal.jsonl                  one JSON entry per line
+##   snapshots/<sha256>.txt         report content, stored once per distinct content
+##
+## Entries:
+##   { "event": "ingest", "time": detected, "ingested": settled and queued, "report": full path,
+##     "route": name, "kind": report kind, "sha256": hash, "size": bytes }
+##   { "event": "done", "time": finished, "report": full path, "sha256": hash of the version run,
+##     "status": completed|failed|cancelled|skipped }
+journal_filename = "journal.jsonl"
+snapshot_dirname = "snapshots"
+
+
+def get_snapshot_filename( journal_dir: str, sha256: str ) -> str:
+    return os.path.join( journal_dir, snapshot_dirname, f"{sha256}.txt" )
+
+
+#####################################################################################
+## ReportJournal
+## Written by the watcher's handler and worker threads
+#####################################################################################
+class ReportJournal:
+    def __init__(self, journal_dir: str):
+        self.journal_dir = journal_dir
+        self.lock = threading.Lock()
+        os.makedirs( os.path.join( journal_dir, snapshot_dirname ), exist_ok=True )
+        self.journal_file = open( os.path.join( journal_dir, journal_filename ), "a" )
+
+    def write_entry(self, entry: dict):
+        with self.lock:
+            self.journal_file.write( json.dumps( entry ) + "\n" )
+            self.journal_file.flush()
+
+    def record_ingest(self, job) -> bool:
+        """ Snapshot the report and save its hash on the job.  False if the report is gone """
+
+        try:
+            with open( job.filepath, "rb" ) as report_file:
+                content = report_file.read()
+        except FileNotFoundError:
+            return False
+
+        job.sha256 = hashlib.sha256( content ).hexdigest()
+        snapshot_filename = get_snapshot_filename( self.journal_dir, job.sha256 )
+        if not os.path.exists( snapshot_filename ):
+            try:
+                with open( snapshot_filename, "wb" ) as snapshot_file:
+                    snapshot_file.write( content )
+            except OSError as error:
+                logging.error(f"Journal snapshot of {job.filepath} not saved: {error}")
+
+        self.write_entry( { "event": "ingest",
+                            "time": job.detected_time,
+                            "ingested": time.time(),
+                            "report": os.path.abspath( job.filepath ),
+                            "route": job.route.name,
+                            "kind": job.report_kind,
+                            "sha256": job.sha256,
+                            "size": len(content) } )
+        return True
+
+    def record_done(self, job):
+        self.write_entry( { "event": "done",
+                            "time": time.time(),
+                            "report": os.path.abspath( job.filepath ),
+                            "sha256": getattr( job, 'sha256', None ),
+                            "status": job.status } )
+
+
+def read_journal( journal_dir: str ) -> list:
+    """ All entries in the journal, oldest first.  Skips a partly written last line """
+
+    entries = []
+    try:
+        with open( os.path.join( journal_dir, journal_filename ), "r" ) as journal_file:
+            for line in journal_file:
+                try:
+                    entries.append( json.loads( line ) )
+                except ValueError:
+                    pass
+    except FileNotFoundError:
+        pass
+
+    return entries
@@ -0,0 +1,54 @@
+import re
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ L I N E _ C L A S S I F I E R          ##########
+##########                                                                 ##########
+##########    Decides what kind of report line this is with one match,     ##########
+##########    so the parsers don't run each line through a chain of        ##########
+##########    regex and startswith tests before getting to the fields      ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+## Line kinds.  Lines are stripped before they are classified
+LINE_LICENSE = 'license'                    ## Seton School      HY-TEK's MEET MANAGER 8.0 - ...  (starts every page)
+LINE_EVENT = 'event'                        ## Event  8   Girls 50 Yard Freestyle
+LINE_EVENT_CONTINUED = 'event_continued'    ## (Event 8   Girls 50 Yard Freestyle)  (a second page of results)
+LINE_HEAT = 'heat'                          ## Heat   1 of 2   Timed Finals  (or Flight)
+LINE_COLUMN_HEADER = 'column_header'        ## Name     Yr School     Seed Time  Finals Time   Points  (Lane Name/Team ... in a program)
+LINE_LANE = 'lane'                          ## 2   Robison, Ryan  JR  Bishop O'Connell-PV  X2:22.35  (lane, place or score rank)
+LINE_UNPLACED = 'unplaced'                  ## --- Salter, Jonathan ...  DQ  (a result without a place)
+LINE_RELAY_NAMES = 'relay_names'            ## 1) LastName1, All2) LastName2, Ashley3) ...
+LINE_OTHER = 'other'
+
+
+#####################################################################################
+## LineClassifier
+## One per report, for its license name (escaped, a name like "St. Paul" is literal)
+#####################################################################################
+class LineClassifier:
+    def __init__(self, mm_license_name: str):
+        self.mm_license_name = mm_license_name
+
+        ## Alternatives are tried in order, the first kind that matches wins
+        self.re_line_kind = re.compile( rf'(?P<{LINE_LICENSE}>{re.escape(mm_license_name)})'
+                                        rf'|(?P<{LINE_EVENT}>(?i:event))'
+                                        rf'|(?P<{LINE_EVENT_CONTINUED}>\((?i:event))'
+                                        rf'|(?P<{LINE_HEAT}>(?i:heat|flight))'
+                                        rf'|(?P<{LINE_COLUMN_HEADER}>(?:Lane +)?(?:Name +(?:Yr|Year) +School|Team +Relay))'
+                                        rf'|(?P<{LINE_LANE}>[*]?\d{{1,2}} )'
+                                        rf'|(?P<{LINE_UNPLACED}>--- )'
+                                        rf'|(?P<{LINE_RELAY_NAMES}>1\))' )
+
+    def classify(self, line: str) -> str:
+        """ The LINE_ kind of a stripped report line """
+
+        match = self.re_line_kind.match( line )
+        return match.lastgroup if match else LINE_OTHER
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ M A N I F E S T                        ##########
+##########                                                                 ##########
+##########    Remembers the content hash of every report the watcher       ##########
+##########    processed and the output files it wrote, so a restarted      ##########
+##########    watcher only regenerates the reports that are out of date    ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+def compute_file_sha256( filename: str ) -> str:
+    """ sha256 hex digest of the file contents """
+
+    sha = hashlib.sha256()
+    with open( filename, "rb" ) as report_file:
+        for block in iter( lambda: report_file.read( 1024 * 1024 ), b"" ):
+            sha.update( block )
+    return sha.hexdigest()
+
+
+#####################################################################################
+## ReportManifest
+## Saved as JSON:
+##  { report full path: { "sha256": hash of the report processed,
+##                        "outputs": { output full path: mtime when written } } }
+#####################################################################################
+class ReportManifest:
+    def __init__(self, manifest_filename: str):
+        self.manifest_filename = manifest_filename
+        self.lock = threading.Lock()
+        self.reports = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open( self.manifest_filename, "r" ) as manifest_file:
+                self.reports = json.load( manifest_file )
+        except FileNotFoundError:
+            self.reports = {}
+        except (ValueError, OSError) as error:
+            logging.warning(f"Ignoring unreadable report manifest {self.manifest_filename}: {error}")
+            self.reports = {}
+
+    def save(self):
+        """ Write to a temp file and rename so a crash never leaves a half written manifest """
+
+        temp_filename = f"{self.manifest_filename}.tmp"
+        with open( temp_filename, "w" ) as manifest_file:
+            json.dump( self.reports, manifest_file, indent=1, sort_keys=True )
+        os.replace( temp_filename, self.manifest_filename )
+
+    def record( self, report_filename: str, report_sha256: str, output_filenames ):
+        """ Save the outputs written for this version of the report """
+
+        outputs = {}
+        for output_filename in output_filenames:
+            try:
+                outputs[os.path.abspath(output_filename)] = os.stat( output_filename ).st_mtime
+            except FileNotFoundError:
+                pass
+
+        with self.lock:
+            self.reports[os.path.abspath(report_filename)] = { "sha256": report_sha256, "outputs": outputs }
+            self.save()
+
+    def get_stale_reason( self, report_filename: str ) -> str:
+        """ Why this report needs to be regenerated.  Empty string if its outputs are up to date """
+
+        with self.lock:
+            entry = self.reports.get( os.path.abspath(report_filename) )
+
+        if entry is None:
+            return "not in manifest"
+        if not entry["outputs"]:
+            return "no outputs recorded"
+
+        report_mtime = os.stat( report_filename ).st_mtime
+        report_changed = None
+        for output_filename in entry["outputs"]:
+            try:
+                output_mtime = os.stat( output_filename ).st_mtime
+            except FileNotFoundError:
+                return f"output missing: {os.path.basename(output_filename)}"
+
+            ## An output older than the report is only stale if the report content changed.
+            ## Meet Manager re-saving the same report doesn't need a regeneration
+            if output_mtime < report_mtime:
+                if report_changed is None:
+                    report_changed = compute_file_sha256( report_filename ) != entry["sha256"]
+                if report_changed:
+                    return f"output older than report: {os.path.basename(output_filename)}"
+
+        if report_changed is None and compute_file_sha256( report_filename ) != entry["sha256"]:
+            return "report content changed"
+
+        return ""
@@ -0,0 +1,183 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ M E T R I C S                          ##########
+##########                                                                 ##########
+##########    Counters, gauges and histograms for the watcher daemon,      ##########
+##########    served in the Prometheus text format on a local /metrics     ##########
+##########    endpoint.  No external service or package needed             ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+## Seconds.  Most reports take well under a second, a big program a few seconds
+default_buckets = ( 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0 )
+
+
+def format_labels( label_names: tuple, label_values: tuple, extra: str = "" ) -> str:
+    labels = [ f'{name}="{value}"' for name, value in zip( label_names, label_values ) ]
+    if extra:
+        labels.append( extra )
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+
+def format_value( value: float ) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+#####################################################################################
+## Metric base.  Values are kept per tuple of label values, or set_function() gives
+## a function called at scrape time for a value another class already keeps
+## (like the scheduler's queue depth)
+#####################################################################################
+class Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.lock = threading.Lock()
+        self.values = {}
+        self.value_function = None
+
+    def set_function(self, value_function):
+        self.value_function = value_function
+
+    def render(self) -> list:
+        lines = [ f"# HELP {self.name} {self.help_text}",
+                  f"# TYPE {self.name} {self.metric_type}" ]
+        with self.lock:
+            lines.extend( self.render_values() )
+        return lines
+
+    def render_values(self) -> list:
+        if self.value_function is not None:
+            return [ f"{self.name} {format_value(self.value_function())}" ]
+        return [ f"{self.name}{format_labels(self.label_names, label_values)} {format_value(value)}"
+                 for label_values, value in sorted( self.values.items() ) ]
+
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def inc(self, *label_values, amount: float = 1):
+        with self.lock:
+            self.values[label_values] = self.values.get( label_values, 0 ) + amount
+
+
+class Gauge(Metric):
+    metric_type = "gauge"
+
+    def set(self, value: float, *label_values):
+        with self.lock:
+            self.values[label_values] = value
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple = (), buckets: tuple = default_buckets):
+        super().__init__( name, help_text, label_names )
+        self.buckets = tuple(sorted(buckets)) + ( float('inf'), )
+
+    def observe(self, value: float, *label_values):
+        with self.lock:
+            bucket_counts, total = self.values.get( label_values, ( [0] * len(self.buckets), 0.0 ) )
+            for bucket_num, upper_bound in enumerate( self.buckets ):
+                if value <= upper_bound:
+                    bucket_counts[bucket_num] += 1
+            self.values[label_values] = ( bucket_counts, total + value )
+
+    def render_values(self) -> list:
+        lines = []
+        for label_values, (bucket_counts, total) in sorted( self.values.items() ):
+            for upper_bound, count in zip( self.buckets, bucket_counts ):
+                le_label = f'le="{format_value(upper_bound)}"'
+                lines.append( f"{self.name}_bucket{format_labels(self.label_names, label_values, le_label)} {count}" )
+            labels = format_labels( self.label_names, label_values )
+            lines.append( f"{self.name}_sum{labels} {format_value(total)}" )
+            lines.append( f"{self.name}_count{labels} {bucket_counts[-1]}" )
+        return lines
+
+
+#####################################################################################
+## Registry.  Metrics are created through the registry so they are all served
+#####################################################################################
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+
+    def register(self, metric: Metric) -> Metric:
+        with self.lock:
+            self.metrics.append( metric )
+        return metric
+
+    def counter(self, name: str, help_text: str, label_names: tuple = ()) -> Counter:
+        return self.register( Counter( name, help_text, label_names ) )
+
+    def gauge(self, name: str, help_text: str, label_names: tuple = ()) -> Gauge:
+        return self.register( Gauge( name, help_text, label_names ) )
+
+    def histogram(self, name: str, help_text: str, label_names: tuple = (), buckets: tuple = default_buckets) -> Histogram:
+        return self.register( Histogram( name, help_text, label_names, buckets ) )
+
+    def render(self) -> str:
+        lines = []
+        with self.lock:
+            metrics = list( self.metrics )
+        for metric in metrics:
+            lines.extend( metric.render() )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+#####################################################################################
+## HTTP endpoint.  GET /metrics returns the registry in the Prometheus text format
+#####################################################################################
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error( 404 )
+            return
+
+        body = self.server.registry.render().encode( "utf-8" )
+        self.send_response( 200 )
+        self.send_header( "Content-Type", "text/plain; version=0.0.4; charset=utf-8" )
+        self.send_header( "Content-Length", str(len(body)) )
+        self.end_headers()
+        self.wfile.write( body )
+
+    ## Don't log every scrape
+    def log_message(self, format, *args):
+        logging.debug( "metrics: " + format % args )
+
+
+def start_metrics_server( port: int, host: str = "127.0.0.1", metrics_registry: Registry = registry ):
+    """ Serve /metrics on a background thread. Returns the server, or None if the port can't be used """
+
+    try:
+        server = ThreadingHTTPServer( (host, port), MetricsRequestHandler )
+    except OSError as error:
+        logging.error(f"Metrics endpoint not started on {host}:{port}: {error}")
+        return None
+
+    server.daemon_threads = True
+    server.registry = metrics_registry
+    thread = threading.Thread( target=server.serve_forever, name="metrics-server", daemon=True )
+    thread.start()
+    return server
@@ -0,0 +1,167 @@
+import io
+import mmap
+import re
+
+import sst_module_common as sst_common
+import sst_module_pipeline as sst_pipeline
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ P A G E _ I N D E X                    ##########
+##########                                                                 ##########
+##########    Byte offsets of every page of a Meet Manager report and the  ##########
+##########    event/heat on it, found in one scan of the memory mapped     ##########
+##########    file.  The report parsers can then be given just the pages   ##########
+##########    they need, in any order, and skip the rest                   ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+#####################################################################################
+## ReportPage
+## A page starts at its license name header line and ends where the next page starts.
+## event_num/heat_num are from the first Event and Heat (or Flight) lines on the page,
+## or carried over from the page before when the page has none (0 before the first)
+#####################################################################################
+class ReportPage:
+    def __init__(self, page_num: int, start: int, event_num: int, heat_num: int):
+        self.page_num = page_num
+        self.start = start
+        self.end = start
+        self.event_num = event_num
+        self.heat_num = heat_num
+
+    def __repr__(self):
+        return f"ReportPage({self.page_num}, bytes {self.start}-{self.end}, event {self.event_num}, heat {self.heat_num})"
+
+
+#####################################################################################
+## The parsers strip each line before matching, so a header line may start with spaces
+## or the form feed between pages.  Lines end in \r\n, \n or only \r
+#####################################################################################
+line_start_bytes = b" \t\x0b\x0c"
+line_end_bytes = b"\r\n"
+utf8_bom = b"\xef\xbb\xbf"
+
+re_page_event = re.compile( rb'[\r\n][ \t\x0b\x0c]*(?i:event)\s+(\d+)' )
+re_page_heat = re.compile( rb'[\r\n][ \t\x0b\x0c]*(?i:heat|flight)\s+(\d+)' )
+
+
+#####################################################################################
+## PageIndex
+## Built once per report.  Keeps the mapping open until close() for get_page_lines().
+## The encoding is worked out from the report the same way sst_pipeline.read_lines
+## does, so a parser sees exactly the lines it would from the whole file
+#####################################################################################
+class PageIndex:
+    def __init__(self, meet_report_filename: str, mm_license_name: str, encoding: str = "auto"):
+        self.pages = []
+        self.report_file = open( meet_report_filename, "rb" )
+        try:
+            self.mm = mmap.mmap( self.report_file.fileno(), 0, access=mmap.ACCESS_READ )
+        except ValueError:
+            ## Empty report.  Nothing to map
+            self.mm = b""
+        self.size = len( self.mm )
+        if encoding == "auto":
+            encoding = sst_pipeline.detect_encoding( self.mm[:sst_pipeline.encoding_sniff_bytes] )
+        self.encoding = encoding
+        ## The byte order mark is only at the start of the file, not in front of the license name
+        license_encoding = "utf-8" if encoding == "utf-8-sig" else encoding
+        self.build( mm_license_name.encode( license_encoding, errors="replace" ) )
+
+    def get_line_start(self, pos: int) -> int:
+        """ Start of the line if only spaces/form feeds are in front of pos on it, else -1 """
+
+        while pos > 0 and self.mm[pos-1] in line_start_bytes:
+            pos -= 1
+        if pos == 0 or self.mm[pos-1] in line_end_bytes:
+            return pos
+        if pos == len(utf8_bom) and self.mm[:pos] == utf8_bom:
+            return 0
+        return -1
+
+    def build(self, license_bytes: bytes):
+        ## The license name is found with a plain byte search (no regex over the whole
+        ## report), then only the top of each page is searched for its event and heat
+        page_starts = []
+        pos = self.mm.find( license_bytes ) if license_bytes else -1
+        while pos >= 0:
+            line_start = self.get_line_start( pos )
+            if line_start >= 0:
+                page_starts.append( line_start )
+            pos = self.mm.find( license_bytes, pos + len(license_bytes) )
+
+        event_num = 0
+        heat_num = 0
+        for page_num, page_start in enumerate( page_starts ):
+            page_end = page_starts[page_num+1] if page_num + 1 < len(page_starts) else self.size
+
+            ## Start the search on the line end in front of the page, so its first line can match
+            search_start = max( page_start - 1, 0 )
+            event_match = re_page_event.search( self.mm, search_start, page_end )
+            if event_match:
+                event_num = int( event_match.group(1) )
+            heat_match = re_page_heat.search( self.mm, search_start, page_end )
+            if heat_match:
+                heat_num = int( heat_match.group(1) )
+
+            page = ReportPage( page_num, page_start, event_num, heat_num )
+            page.end = page_end
+            self.pages.append( page )
+
+    def close(self):
+        if isinstance( self.mm, mmap.mmap ):
+            self.mm.close()
+        self.report_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_pages(self, event_nums = None) -> list:
+        """ All pages, or the pages for the events in event_nums, in report order """
+
+        if event_nums is None:
+            return list( self.pages )
+        return [ page for page in self.pages if page.event_num in event_nums ]
+
+    def get_event_nums(self) -> list:
+        return sorted( set( page.event_num for page in self.pages if page.event_num ) )
+
+    def get_page_lines(self, pages: list) -> list:
+        """ The lines of the pages, as open().readlines() would read them """
+
+        report_lines = []
+        for page in pages:
+            report_lines.extend( decode_page_lines( self.mm[page.start:page.end], self.encoding ) )
+        return report_lines
+
+
+#####################################################################################
+## The lines of a page's bytes, as sst_pipeline.read_lines would read them
+#####################################################################################
+def decode_page_lines( page_bytes: bytes, encoding: str ) -> list:
+    page_text = io.TextIOWrapper( io.BytesIO( page_bytes ), encoding=encoding, errors="replace" )
+    return [ sst_common.remove_accents( line ) for line in page_text ]
+
+
+#####################################################################################
+## read_page_spans
+## The lines of each (start, end) byte span of the report, one list per span, read as
+## they are asked for.  For a process that is given the spans (and encoding) of a
+## PageIndex built by another one, without building it again
+#####################################################################################
+def read_page_spans( meet_report_filename: str, page_spans: list, encoding: str ):
+    with open( meet_report_filename, "rb" ) as report_file:
+        for start, end in page_spans:
+            report_file.seek( start )
+            yield decode_page_lines( report_file.read( end - start ), encoding )
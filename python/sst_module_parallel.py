@@ -0,0 +1,168 @@
+import concurrent.futures
+import logging
+
+import sst_module_common as sst_common
+import sst_module_page_index as sst_page_index
+import sst_module_parse_coverage as sst_parse_coverage
+import sst_module_program as sst_program
+import sst_module_results as sst_results
+import sst_module_schools as sst_module_schools
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ P A R A L L E L                        ##########
+##########                                                                 ##########
+##########    -j/--jobs.  Each page of a report is one event or heat, so   ##########
+##########    the report is split at event boundaries (from its page       ##########
+##########    index) and the runs of events are parsed and written in a    ##########
+##########    process pool.  The counts and run state of the runs are      ##########
+##########    merged in report order, so the result is the same however    ##########
+##########    the runs finish                                              ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+## Runs of events per process.  Smaller runs even out events of different sizes,
+## but each one has to be sent to a process and its results sent back
+chunks_per_job = 4
+
+
+#####################################################################################
+## get_page_chunks
+## Split the pages into up to num_chunks runs of whole events, about the same number
+## of bytes each.  Returns the (start, end) byte spans of each run's pages, in report order.
+## The pages of an event (continued pages) always stay in the same run
+#####################################################################################
+def get_page_chunks( pages: list, num_chunks: int ) -> list:
+
+    event_pages = []
+    for page in pages:
+        if event_pages and event_pages[-1][0].event_num == page.event_num:
+            event_pages[-1].append( page )
+        else:
+            event_pages.append( [ page ] )
+
+    chunk_bytes = sum( page.end - page.start for page in pages ) / max( num_chunks, 1 )
+    chunks = []
+    chunk = []
+    num_bytes = 0
+    for pages_of_event in event_pages:
+        chunk.extend( ( page.start, page.end ) for page in pages_of_event )
+        num_bytes += sum( page.end - page.start for page in pages_of_event )
+        if num_bytes >= chunk_bytes * ( len(chunks) + 1 ):
+            chunks.append( chunk )
+            chunk = []
+
+    if chunk:
+        chunks.append( chunk )
+    return chunks
+
+
+#####################################################################################
+## Worker process.  The pool's processes set up logging the way generate_wirecast_files
+## did, and then each run of events is parsed and written like a report of its own
+#####################################################################################
+def start_worker( loglevel: int ):
+    logging.basicConfig( format='%(message)s', level=loglevel )
+
+
+def process_chunk( report_kind: str,
+                   inputfile: str,
+                   schoolsfile: str,
+                   output_dir: str,
+                   mm_license_name: str,
+                   args,
+                   page_spans: list,
+                   encoding: str,
+                   parse_scores: bool ) -> tuple:
+    """ Parse and write the pages.  Returns the number of files and the run state to merge """
+
+    sst_common.start_run()
+    if args.parsecoverage:
+        sst_parse_coverage.start_coverage()
+    sst_common.setEvents( args.meettype )
+    sst_module_schools.load_schools_report( schoolsfile )
+
+    report_pages = sst_page_index.read_page_spans( inputfile, page_spans, encoding )
+
+    if report_kind == 'program':
+        num_files = sst_program.process_program( report_pages,
+                                                 output_dir,
+                                                 mm_license_name,
+                                                 args.shortschoolrelay,
+                                                 not args.longschoolindividual,
+                                                 args.splitrelays,
+                                                 True,
+                                                 args.displayRelayNames,
+                                                 args.namesfirstlast,
+                                                 args.quote,
+                                                 args.relayformat )
+    else:
+        num_files = sst_results.process_result( report_pages,
+                                                output_dir,
+                                                mm_license_name,
+                                                args.shortschoolrelay,
+                                                not args.longschoolindividual,
+                                                args.displayRelayNames,
+                                                args.displayRelayNames,
+                                                args.namesfirstlast,
+                                                args.quote,
+                                                args.numresults,
+                                                args.championshipmeet,
+                                                args.awards,
+                                                args.awardsRelayNames,
+                                                parse_scores )
+
+    run_state = sst_common.run_state
+    return num_files, run_state.files_written, run_state.stats, run_state.unmatched_schools, run_state.coverage
+
+
+#####################################################################################
+## process_report_parallel
+## The program or results report ('program'/'results') in args.jobs processes.
+## args are generate_wirecast_files's, after it has set the ones it works out.
+## The team scores at the end of a results report are parsed with the last run of events
+#####################################################################################
+def process_report_parallel( report_kind: str,
+                             inputfile: str,
+                             schoolsfile: str,
+                             output_dir: str,
+                             mm_license_name: str,
+                             args,
+                             loglevel: int ) -> int:
+
+    with sst_page_index.PageIndex( inputfile, mm_license_name, args.encoding ) as page_index:
+        encoding = page_index.encoding
+        pages = page_index.get_pages( args.events )
+        if args.events and not pages:
+            logging.warning(f"No pages found for events {args.events}. Events in the report: {page_index.get_event_nums()}")
+
+    chunks = get_page_chunks( pages, args.jobs * chunks_per_job )
+    logging.info(f"{report_kind}: {len(pages)} pages in {len(chunks)} runs of events, {args.jobs} processes")
+
+    num_files = 0
+    with concurrent.futures.ProcessPoolExecutor( max_workers=args.jobs, initializer=start_worker, initargs=( loglevel, ) ) as executor:
+        futures = [ executor.submit( process_chunk, report_kind, inputfile, schoolsfile, output_dir, mm_license_name, args, page_spans, encoding,
+                                     report_kind == 'results' and not args.events and chunk_num == len(chunks) - 1 )
+                    for chunk_num, page_spans in enumerate( chunks ) ]
+        try:
+            ## Taken in report order, not as they finish
+            for future in futures:
+                chunk_num_files, files_written, stats, unmatched_schools, coverage = future.result()
+                sst_common.merge_run_state( files_written, stats, unmatched_schools )
+                sst_parse_coverage.merge_coverage( coverage )
+                num_files += chunk_num_files
+                sst_common.check_run_cancelled()
+        except BaseException:
+            ## Don't start the runs still waiting
+            for future in futures:
+                future.cancel()
+            raise
+
+    return num_files
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+
+import sst_module_common as sst_common
+import sst_module_manifest as sst_manifest
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ P A R S E _ C A C H E                  ##########
+##########                                                                 ##########
+##########    -K/--cachedir.  The pages parsed from a program or results   ##########
+##########    report, kept on disk by the content of the report and the    ##########
+##########    schools file and the options that change how it is parsed.   ##########
+##########    Running the report again with only the render options        ##########
+##########    changed writes its files from the cache, without parsing     ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+## Part of every key.  Change it when the records or the page tuples change, so pages
+## pickled by an older version are never loaded
+cache_format = 1
+cache_file_suffix = ".pages"
+
+## Eviction looks at the whole directory, one thread at a time
+cache_lock = threading.Lock()
+
+
+#####################################################################################
+## get_cache_key
+## sha256 of the report, the schools file, the report kind ('program'/'results') and
+## the values of the parse options, in order
+#####################################################################################
+def get_cache_key( report_filename: str, schools_filename: str, report_kind: str, parse_option_values: list ) -> str:
+
+    sha = hashlib.sha256()
+    for key_part in ( cache_format, sst_manifest.compute_file_sha256( report_filename ),
+                      sst_manifest.compute_file_sha256( schools_filename ), report_kind, parse_option_values ):
+        sha.update( repr( key_part ).encode() + b"\0" )
+    return sha.hexdigest()
+
+
+#####################################################################################
+## ParseCache
+## One file per key: the pickled list of (page_type, page_key, page), as
+## sst_common.run_state.parsed_pages keeps them.  Loading a page touches its file, and
+## when the directory is over max_bytes the least recently used files are removed.
+## The pages are pickled, so only point the cache at a directory this program owns
+#####################################################################################
+class ParseCache:
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs( self.cache_dir, exist_ok=True )
+
+    def get_filename(self, cache_key: str) -> str:
+        return os.path.join( self.cache_dir, f"{cache_key}{cache_file_suffix}" )
+
+    def load(self, cache_key: str):
+        """ The parsed pages for the key, or None.  Counted as a cache hit or miss """
+
+        cache_filename = self.get_filename( cache_key )
+        try:
+            with open( cache_filename, "rb" ) as cache_file:
+                parsed_pages = pickle.load( cache_file )
+            os.utime( cache_filename )
+        except FileNotFoundError:
+            parsed_pages = None
+        except Exception as error:
+            ## A file from a crash or another version.  Parse the report again
+            logging.warning(f"Ignoring unreadable parse cache file {cache_filename}: {error}")
+            self.remove( cache_filename )
+            parsed_pages = None
+
+        sst_common.add_run_stat( 'parse_cache_hits' if parsed_pages is not None else 'parse_cache_misses' )
+        return parsed_pages
+
+    def save(self, cache_key: str, parsed_pages: list):
+        """ Write to a temp file and rename so a crash never leaves a half written file """
+
+        cache_filename = self.get_filename( cache_key )
+        temp_filename = f"{cache_filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open( temp_filename, "wb" ) as cache_file:
+                pickle.dump( parsed_pages, cache_file, protocol=pickle.HIGHEST_PROTOCOL )
+            os.replace( temp_filename, cache_filename )
+        except OSError as error:
+            logging.warning(f"Parsed pages not saved to the parse cache: {error}")
+            self.remove( temp_filename )
+            return
+
+        self.evict()
+
+    def remove(self, cache_filename: str) -> bool:
+        try:
+            os.remove( cache_filename )
+            return True
+        except OSError:
+            return False
+
+    def evict(self):
+        """ Remove the least recently used files until the cache fits in max_bytes """
+
+        with cache_lock:
+            cache_files = []
+            for dir_entry in os.scandir( self.cache_dir ):
+                if dir_entry.name.endswith( cache_file_suffix ):
+                    try:
+                        file_stat = dir_entry.stat()
+                    except OSError:
+                        continue
+                    cache_files.append( ( file_stat.st_mtime, file_stat.st_size, dir_entry.path ) )
+
+            cache_bytes = sum( file_size for mtime, file_size, cache_filename in cache_files )
+            for mtime, file_size, cache_filename in sorted( cache_files ):
+                if cache_bytes <= self.max_bytes:
+                    break
+                if self.remove( cache_filename ):
+                    cache_bytes -= file_size
+                    sst_common.add_run_stat( 'parse_cache_evictions' )
@@ -0,0 +1,254 @@
+import json
+import os
+import time
+
+import sst_module_common as sst_common
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ P A R S E _ C O V E R A G E            ##########
+##########                                                                 ##########
+##########    --parsecoverage.  How many lines of each kind each parser    ##########
+##########    read, couldn't read or skipped, and the time spent in each   ##########
+##########    regex.  When a report format drifts, lane lines stop         ##########
+##########    matching and swimmers go missing from the output; this       ##########
+##########    shows which lines and which pattern.                         ##########
+##########    Off, the parsers use the patterns and functions as they are: ##########
+##########    the wrappers are only swapped in when a run turns it on      ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+## What happened to a line:
+##   matched     a pattern (or the column parser) read its fields
+##   unmatched   patterns were tried and none matched.  A lane line here is a swimmer missing from the output
+##   skipped     nothing was tried on it: blank lines, header lines 2-3, lanes of events not in the meet
+## Page, event, heat and column header lines are matched when the line classifier found them
+LINE_MATCHED = 'matched'
+LINE_UNMATCHED = 'unmatched'
+LINE_SKIPPED = 'skipped'
+line_outcomes = ( LINE_MATCHED, LINE_UNMATCHED, LINE_SKIPPED )
+
+## Line kind of the lines that are never classified
+LINE_BLANK = 'blank'
+
+## Line kinds (sst_line_classifier) that are read by being classified
+classified_line_kinds = ( 'license', 'event', 'event_continued', 'heat', 'column_header' )
+
+
+#####################################################################################
+## ParseCoverage
+## The counts of one run, kept in sst_common.run_state.coverage.
+##   lines      parser -> line kind -> { matched, unmatched, skipped }
+##   patterns   pattern name -> { calls, matches, secs }
+## The line being parsed is followed by the wrappers below: get_counted_lines starts
+## each line, the classifier sets its kind, and the patterns tried on it set whether
+## it was read.  A line is counted when the next one starts
+#####################################################################################
+class ParseCoverage:
+    def __init__(self):
+        self.lines = {}
+        self.patterns = {}
+        self.parser_name = None
+        self.line_kind = None
+        self.line_tried = False
+        self.line_matched = False
+
+    def start_line(self, parser_name: str):
+        self.end_line()
+        self.parser_name = parser_name
+
+    def end_line(self):
+        if self.parser_name is None:
+            return
+        if self.line_matched:
+            outcome = LINE_MATCHED
+        elif self.line_tried:
+            outcome = LINE_UNMATCHED
+        elif self.line_kind in classified_line_kinds:
+            outcome = LINE_MATCHED
+        else:
+            outcome = LINE_SKIPPED
+        self.add_lines( self.parser_name, self.line_kind or LINE_BLANK, outcome )
+        self.parser_name = None
+        self.line_kind = None
+        self.line_tried = False
+        self.line_matched = False
+
+    def add_lines(self, parser_name: str, line_kind: str, outcome: str, amount: int = 1):
+        line_counts = self.lines.setdefault( parser_name, {} ).setdefault( line_kind, dict.fromkeys( line_outcomes, 0 ) )
+        line_counts[outcome] += amount
+
+    def add_pattern(self, pattern_name: str, matched: bool, secs: float, calls: int = 1):
+        pattern_counts = self.patterns.setdefault( pattern_name, { 'calls': 0, 'matches': 0, 'secs': 0.0 } )
+        pattern_counts['calls'] += calls
+        pattern_counts['matches'] += matched
+        pattern_counts['secs'] += secs
+
+    def count_pattern(self, pattern_name: str, matched: bool, secs: float, parses: bool):
+        """ One call of a pattern.  parses: its match means the fields of the line were read """
+
+        self.add_pattern( pattern_name, matched, secs )
+        if parses:
+            self.line_tried = True
+            self.line_matched = self.line_matched or matched
+
+    def merge(self, coverage):
+        """ Add the counts of part of the report done by another process (-j/--jobs) """
+
+        for parser_name, line_kinds in coverage.lines.items():
+            for line_kind, line_counts in line_kinds.items():
+                for outcome, amount in line_counts.items():
+                    self.add_lines( parser_name, line_kind, outcome, amount )
+        for pattern_name, pattern_counts in coverage.patterns.items():
+            self.add_pattern( pattern_name, pattern_counts['matches'], pattern_counts['secs'], pattern_counts['calls'] )
+
+    def get_line_totals(self) -> dict:
+        """ line kind -> { matched, unmatched, skipped } over all the parsers """
+
+        line_totals = {}
+        for line_kinds in self.lines.values():
+            for line_kind, line_counts in line_kinds.items():
+                totals = line_totals.setdefault( line_kind, dict.fromkeys( line_outcomes, 0 ) )
+                for outcome, amount in line_counts.items():
+                    totals[outcome] += amount
+        return line_totals
+
+    def write_report(self, coverage_filename: str, report_filename: str, report_kind: str):
+        """ The counts as JSON.  Written to a temp file and renamed, for a watcher reading it """
+
+        coverage_report = {
+            'report': os.path.abspath( report_filename ),
+            'report_kind': report_kind,
+            'lines': self.lines,
+            'patterns': { pattern_name: dict( pattern_counts, secs=round( pattern_counts['secs'], 6 ) )
+                          for pattern_name, pattern_counts in self.patterns.items() },
+        }
+        temp_filename = f"{coverage_filename}.tmp"
+        with open( temp_filename, "w" ) as coverage_file:
+            json.dump( coverage_report, coverage_file, indent=1, sort_keys=True )
+        os.replace( temp_filename, coverage_filename )
+
+
+#####################################################################################
+## TimedPattern
+## A compiled pattern that counts its calls, matches and time.  Only the methods the
+## parsers use
+#####################################################################################
+class TimedPattern:
+    def __init__(self, pattern, pattern_name: str, coverage: ParseCoverage, parses: bool):
+        self.pattern = pattern
+        self.pattern_name = pattern_name
+        self.coverage = coverage
+        self.parses = parses
+
+    def match(self, string: str):
+        start_time = time.perf_counter()
+        match = self.pattern.match( string )
+        self.coverage.count_pattern( self.pattern_name, match is not None, time.perf_counter() - start_time, self.parses )
+        return match
+
+    def findall(self, string: str):
+        start_time = time.perf_counter()
+        found = self.pattern.findall( string )
+        self.coverage.count_pattern( self.pattern_name, bool( found ), time.perf_counter() - start_time, self.parses )
+        return found
+
+    def sub(self, repl, string: str):
+        start_time = time.perf_counter()
+        new_string, num_subs = self.pattern.subn( repl, string )
+        self.coverage.count_pattern( self.pattern_name, num_subs > 0, time.perf_counter() - start_time, False )
+        ## A line read whole (relay swimmer names) is read when it is cleaned up
+        if self.parses:
+            self.coverage.line_tried = True
+            self.coverage.line_matched = True
+        return new_string
+
+
+#####################################################################################
+## TimedLineClassifier
+## sst_line_classifier.LineClassifier that also sets the kind of the line being parsed
+#####################################################################################
+class TimedLineClassifier:
+    def __init__(self, line_classifier, pattern_name: str, coverage: ParseCoverage):
+        self.line_classifier = line_classifier
+        self.pattern_name = pattern_name
+        self.coverage = coverage
+
+    def classify(self, line: str) -> str:
+        start_time = time.perf_counter()
+        line_kind = self.line_classifier.classify( line )
+        self.coverage.add_pattern( self.pattern_name, True, time.perf_counter() - start_time )
+        self.coverage.line_kind = line_kind
+        return line_kind
+
+
+#####################################################################################
+## Turning it on, and the wrappers the parsers set up with.  Each one gives back what
+## it was passed when coverage is off for this run
+#####################################################################################
+def start_coverage() -> ParseCoverage:
+    """ Count this run.  After sst_common.start_run(), which turns it off """
+
+    sst_common.run_state.coverage = ParseCoverage()
+    return sst_common.run_state.coverage
+
+def get_coverage():
+    """ This run's ParseCoverage, None when off """
+    return getattr( sst_common.run_state, 'coverage', None )
+
+def get_timed_pattern( pattern, pattern_name: str, parses: bool = True ):
+    """ pattern, timed and counted as pattern_name.  parses False for the patterns that
+        only clean up a line (its match isn't the line being read) """
+
+    coverage = get_coverage()
+    if coverage is None:
+        return pattern
+    return TimedPattern( pattern, pattern_name, coverage, parses )
+
+def get_timed_function( fields_fn, pattern_name: str ):
+    """ fields_fn(line, ...) -> fields or None (the sst_columns column parsers), timed
+        and counted as pattern_name """
+
+    coverage = get_coverage()
+    if coverage is None:
+        return fields_fn
+
+    def timed_fields_fn( *args ):
+        start_time = time.perf_counter()
+        fields = fields_fn( *args )
+        coverage.count_pattern( pattern_name, fields is not None, time.perf_counter() - start_time, True )
+        return fields
+    return timed_fields_fn
+
+def get_timed_classifier( line_classifier, pattern_name: str ):
+    coverage = get_coverage()
+    if coverage is None:
+        return line_classifier
+    return TimedLineClassifier( line_classifier, pattern_name, coverage )
+
+def get_counted_lines( report_lines, parser_name: str ):
+    """ report_lines, each one counted for parser_name once the parser is done with it """
+
+    coverage = get_coverage()
+    if coverage is None:
+        return report_lines
+    return count_lines( report_lines, parser_name, coverage )
+
+def count_lines( report_lines, parser_name: str, coverage: ParseCoverage ):
+    for line in report_lines:
+        coverage.start_line( parser_name )
+        yield line
+    coverage.end_line()
+
+def merge_coverage( coverage: ParseCoverage ):
+    """ Add the counts from another process to this run's """
+
+    if coverage is not None and get_coverage() is not None:
+        get_coverage().merge( coverage )
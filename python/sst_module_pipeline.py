@@ -0,0 +1,100 @@
+import codecs
+
+import sst_module_common as sst_common
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ P I P E L I N E                        ##########
+##########                                                                 ##########
+##########    A report goes through the same stages, each a generator     ##########
+##########    that takes the one before it, so only a page is in memory   ##########
+##########    at a time no matter how big the report is:                  ##########
+##########                                                                 ##########
+##########      read_lines       line source (decoded, accents removed)    ##########
+##########      split_pages      page splitter                             ##########
+##########      parse_*_pages    record extractor (program/results module) ##########
+##########      render_*_page    renderer, (file name, text) pairs         ##########
+##########      write_files      writer                                    ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+#####################################################################################
+## Report encoding
+## Meet Manager writes reports in the Windows code page (cp1252).  A report saved as
+## UTF-8 is read as UTF-8: one with a byte order mark, or one whose first
+## encoding_sniff_bytes have non ASCII characters that are all valid UTF-8.
+## 'auto' detects it, any other value is the encoding to use (-c/--encoding).
+## Bytes that aren't valid in the encoding are replaced, never an error
+#####################################################################################
+default_encoding = "cp1252"
+encoding_sniff_bytes = 64 * 1024
+
+def detect_encoding( report_head: bytes ) -> str:
+    if report_head.startswith( codecs.BOM_UTF8 ):
+        return "utf-8-sig"
+    if not report_head.isascii():
+        try:
+            ## Not final, so a character cut off at the end of the sample isn't an error
+            codecs.getincrementaldecoder( "utf-8" )().decode( report_head, final=False )
+            return "utf-8"
+        except UnicodeDecodeError:
+            pass
+    return default_encoding
+
+
+def get_report_encoding( meet_report_filename: str, encoding: str = "auto" ) -> str:
+    if encoding != "auto":
+        return encoding
+    with open( meet_report_filename, "rb" ) as meet_report_file:
+        return detect_encoding( meet_report_file.read( encoding_sniff_bytes ) )
+
+
+#####################################################################################
+## Line source
+## The report's lines, read as they are asked for.  The file is decoded once, as it
+## is read, and the accents are removed from the lines that aren't plain ASCII, so
+## every parser gets the same lines.  The file is closed when the last line is read,
+## or when the generator is closed/dropped
+#####################################################################################
+def read_lines( meet_report_filename: str, encoding: str = "auto" ):
+    encoding = get_report_encoding( meet_report_filename, encoding )
+    with open( meet_report_filename, "r", encoding=encoding, errors="replace" ) as meet_report_file:
+        for line in meet_report_file:
+            yield sst_common.remove_accents( line )
+
+
+#####################################################################################
+## Page splitter
+## Group the lines into pages.  A page starts at its license name header line (after
+## any spaces/form feed), lines before the first one are a page of their own.
+## The parsers still see every line in order, so splitting never changes what they parse
+#####################################################################################
+def split_pages( report_lines, mm_license_name: str ):
+    page_lines = []
+    for line in report_lines:
+        if page_lines and line.lstrip().startswith( mm_license_name ):
+            yield page_lines
+            page_lines = []
+        page_lines.append( line )
+
+    if page_lines:
+        yield page_lines
+
+
+#####################################################################################
+## Writer
+## Write the (file name, text) pairs of a renderer.  Returns the number of files
+#####################################################################################
+def write_files( output_dir: str, rendered_files ) -> int:
+    num_files = 0
+    for output_file_name, output_str in rendered_files:
+        sst_common.write_output_file( output_dir, output_file_name, output_str )
+        num_files += 1
+    return num_files
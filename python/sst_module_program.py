@@ -1,11 +1,36 @@
+import itertools
 import logging
 import re
 
 import sst_module_common as sst_common
+import sst_module_line_classifier as sst_line_classifier
+import sst_module_columns as sst_columns
+import sst_module_records as sst_records
+import sst_module_pipeline as sst_pipeline
+import sst_module_parse_coverage as sst_parse_coverage
 
 file_name_prefix = "event_"
 file_name_suffix = "program"
 
+## Column header lines of the program files, and the width of the school names in
+## the report for each kind of event.  The SDIF reader uses them too.
+## NOTE: Do not align up these headers with the TXT output.
+##  Wirecast will center all lines and it will be in proper position then
+program_header_len_dict = {
+    'individual_long': 25,
+    'diving_long': 25,
+    'relay_long': 28,
+}
+
+program_header_dict = {
+    'individual_long':   "\nLane  Name                    Year School      Seed Time",
+    'individual_short':  "\n  Lane  Name                   Yr Sch  Seed Time",
+    'diving_long':       "\nbLane  Name                 Year School      Seed Points",
+    'diving_short':      "\n  Lane  Name                     Yr Sch  Seed Points",
+    'relay_long':        "\nLane    Team                  Relay Seed Time" ,        
+    'relay_short':       "\nLane  Team Relay Seed Time",    
+}
+
 #####################################################################################
 #####################################################################################
 #####################################################################################
@@ -22,10 +47,10 @@ file_name_suffix = "program"
 #####################################################################################
 
 ####################################################################################
-## Parse the report file and generate an output array
+## Parse the report pages and generate the output files, one heat page at a time
 #####################################################################################
 
-def process_program( meet_report_filename: str, 
+def process_program( report_pages, 
                      output_dir: str, 
                      mm_license_name: str, 
                      shorten_school_names_relays: bool, 
@@ -38,6 +63,33 @@ def process_program( meet_report_filename: str,
                      relayformat:int  ) -> int:
     """ Given the input file formatted in a specific manner,
         generate indiviual Event/Heat files for use in Wirecast displays """
+
+    num_files_generated = 0
+    for heat_page in parse_program_pages( report_pages, 
+                                          mm_license_name, 
+                                          shorten_school_names_relays, 
+                                          shorten_school_names_individual, 
+                                          namesfirstlast, 
+                                          quote_output ):
+        num_files_generated += create_output_file_program( output_dir, heat_page, display_relay_swimmer_names, split_relays_to_multiple_files, relayformat )
+
+    #####################################################################################
+    ## PROGRAM: All done. Return counts of files created
+    #####################################################################################
+    return num_files_generated
+
+
+####################################################################################
+## Record extractor for a meet program.  Yields a HeatPage for each event/heat,
+## when the next page starts.  report_pages are lists of report lines
+## (sst_pipeline.split_pages), the heat carries on from one page to the next
+#####################################################################################
+def parse_program_pages( report_pages, 
+                         mm_license_name: str, 
+                         shorten_school_names_relays: bool, 
+                         shorten_school_names_individual: bool, 
+                         namesfirstlast: bool, 
+                         quote_output: bool ):
     
     #####################################################################################
     ## The names are what appear in the report, and may be abbreviated, 
@@ -45,34 +97,17 @@ def process_program( meet_report_filename: str,
     ## Multiple version of a school may be listed here for clean output
     #####################################################################################
 
-    ## NOTE: Do not align up these headers with the TXT output.  
-    ##  Wirecast will center all lines and it will be in proper position then
-
-    program_header_len_dict = {
-        'individual_long': 25,
-        'diving_long': 25,
-        'relay_long': 28,
-    }
-
-    program_header_dict = {
-        'individual_long':   "\nLane  Name                    Year School      Seed Time",
-        'individual_short':  "\n  Lane  Name                   Yr Sch  Seed Time",
-        'diving_long':       "\nbLane  Name                 Year School      Seed Points",
-        'diving_short':      "\n  Lane  Name                     Yr Sch  Seed Points",
-        'relay_long':        "\nLane    Team                  Relay Seed Time" ,        
-        'relay_short':       "\nLane  Team Relay Seed Time",    
-    }
-
     ## Define local variables
     event_num = 0
     heat_num = 0
-    num_files_generated = 0
     num_header_lines = 3
     found_header_line = 0
-    output_list = []
+    ## Where the columns are on this page, from its column header line
+    column_layout = None
 
     ## Define the regular expression to pase the meet program
-    re_program_lane = re.compile('^[*]?\d{1,2} ')
+    ## Lane lines (^[*]?\d{1,2} ) and relay swimmer name lines (1)) are found by the line classifier
+    line_classifier = sst_line_classifier.LineClassifier( mm_license_name )
     re_program_lane_ind = re.compile('^(\d{1,2})\s+([A-z\' \.]+, [A-z ]+?) ([A-Z0-9]{1,2})\s+([A-Z \'.].*)\s+([X]?[0-9:.]+|NT|XNT|NP|XNP)*')
     re_program_lane_relay = re.compile('^(\d{1,2})\s+([A-Z \'.].*)\s+([A-Z])\s+([X]?[0-9:.]+|NT|XNT)*')
 
@@ -86,251 +121,295 @@ def process_program( meet_report_filename: str,
 
     ## For relays add a space between the persons name and next swimmer number
     re_program_space_relay_name = re.compile(r'(\S)([2-4]\))')
-    re_program_check_relay_name_line = re.compile('1\)')
+
+    ## --parsecoverage times and counts the patterns and the column parser (sst_parse_coverage).
+    ## Otherwise these are the same patterns and functions
+    line_classifier = sst_parse_coverage.get_timed_classifier( line_classifier, 'program.line_classifier' )
+    re_program_lane_ind = sst_parse_coverage.get_timed_pattern( re_program_lane_ind, 'program.re_program_lane_ind' )
+    re_program_lane_relay = sst_parse_coverage.get_timed_pattern( re_program_lane_relay, 'program.re_program_lane_relay' )
+    re_program_sch_cleanup1 = sst_parse_coverage.get_timed_pattern( re_program_sch_cleanup1, 'program.re_program_sch_cleanup1', parses=False )
+    re_program_sch_cleanup2 = sst_parse_coverage.get_timed_pattern( re_program_sch_cleanup2, 'program.re_program_sch_cleanup2', parses=False )
+    re_program_space_team_seed = sst_parse_coverage.get_timed_pattern( re_program_space_team_seed, 'program.re_program_space_team_seed', parses=False )
+    re_program_space_relay_name = sst_parse_coverage.get_timed_pattern( re_program_space_relay_name, 'program.re_program_space_relay_name' )
+    get_program_fields_individual = sst_parse_coverage.get_timed_function( sst_columns.get_program_fields_individual, 'program.columns_individual' )
+    get_program_fields_relay = sst_parse_coverage.get_timed_function( sst_columns.get_program_fields_relay, 'program.columns_relay' )
     
     ## Quote output for debugging
     q = "'" if quote_output else ""
 
+    heat_page = sst_records.HeatPage( shorten_school_names_relays, shorten_school_names_individual, q )
+
     #####################################################################################
     ## PROGRAM: Loop through each line of the input file
     #####################################################################################
-    with open(meet_report_filename, "r") as meet_report_file:
-        for line in meet_report_file:
-
-            #####################################################################################
-            ## PROGRAM: Remove the extra newline at end of line
-            #####################################################################################
-            line = line.strip()
-
-            #####################################################################################
-            ## PROGRAM: Ignore all the blank lines             
-            #####################################################################################
-            if line == '\n' or line == '':
-                continue
-
-            #####################################################################################
-            ## Meet Manager license name
-            ## We have one event/heat per page, so this starts the next event/heat
-            #####################################################################################
-            if re.search("^%s" % mm_license_name, line):
-                found_header_line = 1
+    for line in sst_parse_coverage.get_counted_lines( itertools.chain.from_iterable( report_pages ), 'program' ):
+
+        ## The column parser needs the line as it is in the report
+        report_line = line
+
+        #####################################################################################
+        ## PROGRAM: Remove the extra newline at end of line
+        #####################################################################################
+        line = line.strip()
+
+        #####################################################################################
+        ## PROGRAM: Ignore all the blank lines             
+        #####################################################################################
+        if line == '\n' or line == '':
+            continue
+
+        line_kind = line_classifier.classify( line )
+
+        #####################################################################################
+        ## Meet Manager license name
+        ## We have one event/heat per page, so this starts the next event/heat
+        #####################################################################################
+        if line_kind == sst_line_classifier.LINE_LICENSE:
+            found_header_line = 1
+            column_layout = None
                 
-                num_files = create_output_file_program( output_dir, event_num, heat_num, output_list, display_relay_swimmer_names, split_relays_to_multiple_files, relayformat )
-                
-                num_files_generated += num_files
-
-                ## Reset and start processing the next event/heat
-                output_list = []
-                output_list.append( ('H1', line ))
-                continue
-
-            #####################################################################################
-            ## if the previous line was the first header (found_header_line=1)
-            ## then save  the next two lines which are also part of the header and got to next line
-            #####################################################################################
-            if 0 < found_header_line < num_header_lines:
-                found_header_line += 1
-                if found_header_line == 2:
-                    output_list.append( ('H2', line ))
-                elif found_header_line == 3:
-                    output_list.append( ('H3', line ))
-                continue
-
-            #####################################################################################
-            ## PROGRAM: Start with Event line.  
-            ##  Get the Event Number from the report
-            ##  Clean it up
-            #####################################################################################
-            if line.lower().startswith(("event")):
-                event_num, event_str = sst_common.get_event_num_from_eventline( line )
-                ## H4 is the Event number/name line
-                output_list.append(('H4', f"{line}" ))
-
-            #####################################################################################
-            ## PROGRAM: Remove "Timed Finals" from Heat (and flight) line
-            #####################################################################################
-            if line.lower().startswith(("heat", "flight")):
-                line = line.replace("Timed Finals", "")
-                ## Remove all those extra spaces in the line
-                heat_num = sst_common.get_heat_num_from_heatline(line)
-
-                ## H6 is the Heat info, save it in case we want to output it later
-                output_list.append(('H5', f"{line}" ))
-
-                #####################################################################################
-                ## PROGRAM: Set name_list_header to be displayed above the list of swimmers
-                ##          This is only set once per Event/Heat so moving this is probablimetic
-                #####################################################################################
-                # Determin heading based on short or full school name
-                name_list_header = sst_common.get_header_line( event_num, shorten_school_names_relays, shorten_school_names_individual, program_header_dict ) 
-                if name_list_header != "":
-                    output_list.append(('H6', name_list_header))
+            heat_page.event_num = event_num
+            heat_page.heat_num = heat_num
+            yield heat_page
+
+            ## Reset and start processing the next event/heat
+            heat_page = sst_records.HeatPage( shorten_school_names_relays, shorten_school_names_individual, q )
+            heat_page.add_header( 'H1', line )
+            continue
+
+        #####################################################################################
+        ## if the previous line was the first header (found_header_line=1)
+        ## then save  the next two lines which are also part of the header and got to next line
+        #####################################################################################
+        if 0 < found_header_line < num_header_lines:
+            found_header_line += 1
+            if found_header_line == 2:
+                heat_page.add_header( 'H2', line )
+            elif found_header_line == 3:
+                heat_page.add_header( 'H3', line )
+            continue
+
+        #####################################################################################
+        ## PROGRAM: Start with Event line.  
+        ##  Get the Event Number from the report
+        ##  Clean it up
+        #####################################################################################
+        if line_kind == sst_line_classifier.LINE_EVENT:
+            event_num, event_str = sst_common.get_event_num_from_eventline( line )
+            ## H4 is the Event number/name line
+            heat_page.add_header( 'H4', f"{line}" )
+
+        #####################################################################################
+        ## PROGRAM: Remove "Timed Finals" from Heat (and flight) line
+        #####################################################################################
+        if line_kind == sst_line_classifier.LINE_HEAT:
+            line = line.replace("Timed Finals", "")
+            ## Remove all those extra spaces in the line
+            heat_num = sst_common.get_heat_num_from_heatline(line)
+
+            ## H6 is the Heat info, save it in case we want to output it later
+            heat_page.add_header( 'H5', f"{line}" )
 
             #####################################################################################
-            ## PROGRAM: INDIVIDUAL Extract the individual Entry Line
-            ## i.e. 2   Robison, Ryan            JR  Bishop O'Connell-PV      X2:22.35                        
+            ## PROGRAM: Set name_list_header to be displayed above the list of swimmers
+            ##          This is only set once per Event/Heat so moving this is probablimetic
             #####################################################################################
-            if (event_num in sst_common.event_num_individual or event_num in sst_common.event_num_diving) and re_program_lane.search(line):
+            # Determin heading based on short or full school name
+            name_list_header = sst_common.get_header_line( event_num, shorten_school_names_relays, shorten_school_names_individual, program_header_dict ) 
+            if name_list_header != "":
+                heat_page.add_header( 'H6', name_list_header )
+
+        if line_kind == sst_line_classifier.LINE_COLUMN_HEADER:
+            column_layout = sst_columns.ColumnLayout( report_line )
+
+        #####################################################################################
+        ## PROGRAM: INDIVIDUAL Extract the individual Entry Line
+        ## i.e. 2   Robison, Ryan            JR  Bishop O'Connell-PV      X2:22.35                        
+        #####################################################################################
+        if (event_num in sst_common.meet_state.event_num_individual or event_num in sst_common.meet_state.event_num_diving) and line_kind == sst_line_classifier.LINE_LANE:
+            ## The length of the school name in the MM report varies by event type
+            school_name_len = program_header_len_dict['diving_long'] if event_num in sst_common.meet_state.event_num_diving else program_header_len_dict['individual_long']
+
+            ## Cut the line at the header's columns.  The regex is for lines that don't line up
+            entry_fields = get_program_fields_individual( report_line, column_layout, school_name_len ) if column_layout else None
+            if entry_fields:
+                entry_line_list = [ entry_fields ]
+                sst_common.add_run_stat( 'lines_fixed_width' )
+            else:
                 ## Fix for case where School Name butts up to the X in seed time
                 line = re_program_space_team_seed.sub(r'\1 \2', line )
 
                 entry_line_list = re_program_lane_ind.findall(line)
-                #                                  LANE     LAST, FIRST        GR          SCHOOL             SEEDTIME 
                 if entry_line_list:
-                    entry_lane            = str(entry_line_list[0][0]).strip()
-                    entry_name_last_first = str(entry_line_list[0][1]).strip()
-                    entry_grade           = str(entry_line_list[0][2]).strip()
-                    entry_sch_long        = str(entry_line_list[0][3]).strip()
-                    entry_seedtime        = str(entry_line_list[0][4]).strip()
+                    sst_common.add_run_stat( 'lines_regex' )
+            #                                  LANE     LAST, FIRST        GR          SCHOOL             SEEDTIME 
+            if entry_line_list:
+                entry_lane            = str(entry_line_list[0][0]).strip()
+                entry_name_last_first = str(entry_line_list[0][1]).strip()
+                entry_grade           = str(entry_line_list[0][2]).strip()
+                entry_sch_long        = str(entry_line_list[0][3]).strip()
+                entry_seedtime        = str(entry_line_list[0][4]).strip()
                     
-                    ## In case we want to use Shortened School Names, run the lookup
-                    ## The length of the school name in the MM report varies by event type
-                    school_name_len = program_header_len_dict['diving_long'] if event_num in sst_common.event_num_diving else program_header_len_dict['individual_long']
-                    #WPD entry_sch_short = sst_common.short_school_name_lookup( entry_sch_long, school_name_len )
-                    entry_sch_short = sst_common.short_school_abbr_lookup( entry_sch_long, school_name_len )
+                ## In case we want to use Shortened School Names, run the lookup
+                #WPD entry_sch_short = sst_common.short_school_name_lookup( entry_sch_long, school_name_len )
+                entry_sch_short = sst_common.short_school_abbr_lookup( entry_sch_long, school_name_len )
 
-                    ## We can display name as given (Last, First) or change it to First Last with cli parameter
-                    entry_name = sst_common.reverse_lastname_firstname( entry_name_last_first ) if namesfirstlast else entry_name_last_first
+                ## We can display name as given (Last, First) or change it to First Last with cli parameter
+                entry_name = sst_common.reverse_lastname_firstname( entry_name_last_first ) if namesfirstlast else entry_name_last_first
 
-                    ## Still issues with School names ending in - or -VA
-                    entry_sch_long = re_program_sch_cleanup1.sub(r'\1', entry_sch_long)
-                    entry_sch_long = re_program_sch_cleanup2.sub(r'\1', entry_sch_long)
+                ## Still issues with School names ending in - or -VA
+                entry_sch_long = re_program_sch_cleanup1.sub(r'\1', entry_sch_long)
+                entry_sch_long = re_program_sch_cleanup2.sub(r'\1', entry_sch_long)
 
-                    ## Format the output lines with either long (per meet program) or short school names
-                    output_str = f" {q}{entry_lane:>2}{q} {q}{entry_name:<25}{q} {q}{entry_grade:>2}{q} {q}{entry_sch_long:<25}{q} {q}{entry_seedtime:>8}{q}"
-                    
-                    if shorten_school_names_individual:
-                        output_str = f" {q}{entry_lane:>2}{q} {q}{entry_name:<25}{q} {q}{entry_grade:>2}{q} {q}{entry_sch_short:<4}{q} {q}{entry_seedtime:>8}{q}"
-                    
-                    output_list.append(('LANE', output_str))
+                ## Keep either long (per meet program) or short school names.  The line is formatted when it is written
+                entry_school = entry_sch_short if shorten_school_names_individual else entry_sch_long
+
+                heat_page.rows.append( sst_records.ProgramEntry( entry_lane, entry_name, entry_grade, entry_school, None, entry_seedtime ) )
+            else:
+                ## Looks like a lane line but the columns didn't match. This swimmer is missing from the output
+                sst_common.add_run_stat( 'lines_unparsed' )
                     
             
-            #####################################################################################
-            ## PROGRAM: RELAY Find the replay line with LANE, SCHOOL, RELAY TEAM SEEDTIME
-            ## 1 Seton Swim            A                    1:46.82      1:40.65        32
-            #####################################################################################
-            if event_num in sst_common.event_num_relay and re_program_lane.search(line):
+        #####################################################################################
+        ## PROGRAM: RELAY Find the replay line with LANE, SCHOOL, RELAY TEAM SEEDTIME
+        ## 1 Seton Swim            A                    1:46.82      1:40.65        32
+        #####################################################################################
+        if event_num in sst_common.meet_state.event_num_relay and line_kind == sst_line_classifier.LINE_LANE:
+            entry_fields = get_program_fields_relay( report_line, column_layout ) if column_layout else None
+            if entry_fields:
+                entry_line_list = [ entry_fields ]
+                sst_common.add_run_stat( 'lines_fixed_width' )
+            else:
                 entry_line_list = re_program_lane_relay.findall(line)
-                #  REGEX Positions                 LANE   SCHOOL    RELAY     SEEDTIME
                 if entry_line_list:
-                    entryline_lane      = str(entry_line_list[0][0]).strip()
-                    entryline_sch_long  = str(entry_line_list[0][1]).strip()
-                    entryline_relay     = str(entry_line_list[0][2]).strip()
-                    entryline_seedtime  = str(entry_line_list[0][3]).strip()
-
-                    #####################################################################################
-                    ## PROGRAM: Replace long school name with short name for RELAY events
-                    #####################################################################################
-                    #WPD entryline_sch_short = sst_common.short_school_name_lookup( entryline_sch_long, len(entryline_sch_long) )
-                    entryline_sch_short = sst_common.short_school_abbr_lookup( entryline_sch_long, len(entryline_sch_long) )
+                    sst_common.add_run_stat( 'lines_regex' )
+            #  REGEX Positions                 LANE   SCHOOL    RELAY     SEEDTIME
+            if entry_line_list:
+                entryline_lane      = str(entry_line_list[0][0]).strip()
+                entryline_sch_long  = str(entry_line_list[0][1]).strip()
+                entryline_relay     = str(entry_line_list[0][2]).strip()
+                entryline_seedtime  = str(entry_line_list[0][3]).strip()
+
+                #####################################################################################
+                ## PROGRAM: Replace long school name with short name for RELAY events
+                #####################################################################################
+                #WPD entryline_sch_short = sst_common.short_school_name_lookup( entryline_sch_long, len(entryline_sch_long) )
+                entryline_sch_short = sst_common.short_school_abbr_lookup( entryline_sch_long, len(entryline_sch_long) )
                     
-                    ## Still issues with School names ending in - or -VA
-                    entryline_sch_long = re_program_sch_cleanup2.sub(r'\1', entryline_sch_long)
+                ## Still issues with School names ending in - or -VA
+                entryline_sch_long = re_program_sch_cleanup2.sub(r'\1', entryline_sch_long)
                     
-                    full_team_name = entryline_sch_long
-                    if shorten_school_names_relays:
-                        full_team_name = entryline_sch_short
-                        output_str = f"{q}{entryline_lane:>2}{q} {q}{entryline_sch_short:<4}{q} {q}{entryline_relay:1}{q} {q}{entryline_seedtime:>8}{q}"
-                    else:
-                        full_team_name = sst_common.find_short_team_name( entryline_sch_long )
-                        output_str = f"{q}{entryline_lane:>2}{q} {q}{full_team_name[:28]:<28}{q} {q}{entryline_relay:1}{q} {q}{entryline_seedtime:>8}{q}"
-
-                    output_list.append(( "LANE", output_str ))
-
-            #####################################################################################
-            ## PROGRAM: RELAY Add the swimmers name to the list. It may or may not be use for output
-            #####################################################################################
-            ## If this is a relay, add a space between the last swimmer name and the next swimmer number
-            ## This line  1) LastName1, All2) LastName2, Ashley3) LastName3, All4) LastName4, Eri
-            ## becomes    1) LastName1, All 2) LastName2, Ashley 3) LastName3, All 4) LastName4, Eri
-            if event_num in sst_common.event_num_relay and re_program_check_relay_name_line.search(line):
-                output_str = re_program_space_relay_name.sub( r'\1 \2',line )
-                output_list.append(( "NAME", output_str ))
+                full_team_name = entryline_sch_long
+                if shorten_school_names_relays:
+                    full_team_name = entryline_sch_short
+                else:
+                    full_team_name = sst_common.find_short_team_name( entryline_sch_long )[:28]
+
+                heat_page.rows.append( sst_records.ProgramEntry( entryline_lane, "", "", full_team_name, entryline_relay, entryline_seedtime ) )
+            else:
+                sst_common.add_run_stat( 'lines_unparsed' )
+
+        #####################################################################################
+        ## PROGRAM: RELAY Add the swimmers name to the list. It may or may not be use for output
+        #####################################################################################
+        ## If this is a relay, add a space between the last swimmer name and the next swimmer number
+        ## This line  1) LastName1, All2) LastName2, Ashley3) LastName3, All4) LastName4, Eri
+        ## becomes    1) LastName1, All 2) LastName2, Ashley 3) LastName3, All 4) LastName4, Eri
+        if event_num in sst_common.meet_state.event_num_relay and line_kind == sst_line_classifier.LINE_RELAY_NAMES:
+            output_str = re_program_space_relay_name.sub( r'\1 \2',line )
+            heat_page.rows.append( sst_records.RelayLegs( output_str ) )
 
     #####################################################################################
     ## Reached end of file
     ## Write out last event
     #####################################################################################
-
-    num_files = create_output_file_program( output_dir, event_num, heat_num, output_list, display_relay_swimmer_names, split_relays_to_multiple_files, relayformat )
-    num_files_generated += num_files
-
-    #####################################################################################
-    ## PROGRAM: All done. Return counts of files created
-    #####################################################################################
-    return num_files_generated
+    heat_page.event_num = event_num
+    heat_page.heat_num = heat_num
+    yield heat_page
 
 
 ####################################################################################
-## Determine type of output file to generate
+## Write the output file(s) for one heat
 #####################################################################################
+@sst_common.render_timer
 def create_output_file_program( output_dir_root: str, 
-                                event_num: int, 
-                                heat_num: int,
-                                output_list: list, 
+                                heat_page: sst_records.HeatPage, 
                                 display_relay_swimmer_names: bool,
                                 split_relays_to_multiple_files: bool,
                                 relayformat: int ) -> int:
 
-    num_files_created = 0
+    sst_common.save_parsed_page( 'program', (heat_page.event_num, heat_page.heat_num), heat_page )
+
+    return sst_pipeline.write_files( f"{output_dir_root}/", 
+                                     render_heat_page( heat_page, display_relay_swimmer_names, split_relays_to_multiple_files, relayformat ) )
+
+
+####################################################################################
+## Renderer.  Determine type of output file to generate, and yield the
+## (file name, text) of each file for the heat without writing them
+#####################################################################################
+def render_heat_page( heat_page: sst_records.HeatPage, 
+                      display_relay_swimmer_names: bool,
+                      split_relays_to_multiple_files: bool,
+                      relayformat: int ):
 
     ## Puts Short Team, Relay and swimmers on same line
     ##  6 SST  A 1) Garvey, L       2) Flynn, E        3) Condon, C       4) Pennefather, M 
-    if event_num in sst_common.event_num_relay and relayformat == 2:
-        num_files_created = create_output_file_program_format2( output_dir_root, 
-                                event_num, 
-                                heat_num,
-                                output_list, 
-                                display_relay_swimmer_names,
-                                split_relays_to_multiple_files )
-
-
-    else:
-        ## Standard format for individual
-        ## For relays, lists team name/relay/seed time and optional swimmers on second line (but usually requires splitting into two files)
-        num_files_created = create_output_file_program_format1( output_dir_root, 
-                                event_num, 
-                                heat_num,
-                                output_list, 
-                                display_relay_swimmer_names,
-                                split_relays_to_multiple_files )
-    
-    return num_files_created
+    if heat_page.event_num in sst_common.meet_state.event_num_relay and relayformat == 2:
+        return render_program_format2( heat_page, 
+                                       display_relay_swimmer_names,
+                                       split_relays_to_multiple_files )
+
+    ## Standard format for individual
+    ## For relays, lists team name/relay/seed time and optional swimmers on second line (but usually requires splitting into two files)
+    return render_program_format1( heat_page, 
+                                   display_relay_swimmer_names,
+                                   split_relays_to_multiple_files )
+
 
+####################################################################################
+## Format one lane line of a heat page, in the layout its event and the page's
+## short/long school options call for
+##  2 Robison, Ryan             JR Bishop O'Connell          X2:22.35
+#####################################################################################
+def get_lane_text( heat_page: sst_records.HeatPage, program_entry: sst_records.ProgramEntry ) -> str:
+    q = heat_page.quote
+
+    if program_entry.relay is None:
+        if heat_page.shorten_school_names_individual:
+            return f" {q}{program_entry.lane:>2}{q} {q}{program_entry.name:<25}{q} {q}{program_entry.grade:>2}{q} {q}{program_entry.school:<4}{q} {q}{program_entry.seed:>8}{q}"
+        return f" {q}{program_entry.lane:>2}{q} {q}{program_entry.name:<25}{q} {q}{program_entry.grade:>2}{q} {q}{program_entry.school:<25}{q} {q}{program_entry.seed:>8}{q}"
+
+    if heat_page.shorten_school_names_relays:
+        return f"{q}{program_entry.lane:>2}{q} {q}{program_entry.school:<4}{q} {q}{program_entry.relay:1}{q} {q}{program_entry.seed:>8}{q}"
+    return f"{q}{program_entry.lane:>2}{q} {q}{program_entry.school:<28}{q} {q}{program_entry.relay:1}{q} {q}{program_entry.seed:>8}{q}"
 
 
 ####################################################################################
 ## Given an array of PROGRAM lines PER HEAT, generate the output file
 #####################################################################################
-def create_output_file_program_format1( output_dir_root: str, 
-                                event_num: int, 
-                                heat_num: int,
-                                output_list: list, 
-                                display_relay_swimmer_names: bool,
-                                split_relays_to_multiple_files: bool ) -> int:
-    """ Generate the filename and open the next file """
+def render_program_format1( heat_page: sst_records.HeatPage, 
+                            display_relay_swimmer_names: bool,
+                            split_relays_to_multiple_files: bool ):
+    """ Generate the filename and text of the next file """
    
-    global event_num_relay
-    num_files_created = 0
+    event_num = heat_page.event_num
+    heat_num = heat_page.heat_num
     split_num = 1
     output_str = ""
     
     ## Ignore the case where we get event0 heat0
     if event_num == 0:
-        return 0
-
-    output_dir = f"{output_dir_root}/"
+        return
     
     ## For non relay events
     output_file_name = f"{file_name_prefix}{event_num:0>2}_{file_name_suffix}_heat_{heat_num:0>2}.txt"
 
     ## Count the number of lanes in the RELAY
     num_relay_lane = 0
-    if event_num in sst_common.event_num_relay:
-        for output_tuple in output_list:
-            row_type = output_tuple[0]
-            
-            if row_type == 'LANE':
+    if event_num in sst_common.meet_state.event_num_relay:
+        for row in heat_page.rows:
+            if row.row_type == 'LANE':
                 num_relay_lane += 1
 
     header_list = ['H4', 'H5', 'H6']
@@ -338,20 +417,19 @@ def create_output_file_program_format1( output_dir_root: str,
     ## Loop through list in reverse order
     #for num in range( num_events-1, -1, -1):
     count =0 
-    for output_tuple in output_list:
-        row_type = output_tuple[0]
-        row_text = output_tuple[1]
+    for row in heat_page.rows:
+        row_type = row.row_type
 
-        logging.debug(f"PROGRAM: e: {event_num} h: {event_num} id: {row_type} t: {row_text}")
+        logging.debug(f"PROGRAM: e: {event_num} h: {event_num} id: {row_type} t: {row}")
 
         ## Save off the meet name, which somes at the end of the procesing as we are looping in reverse order
         if row_type in header_list:
-            output_str += row_text + '\n'
-            header_str += row_text + '\n'
+            output_str += row.line + '\n'
+            header_str += row.line + '\n'
         elif row_type == 'LANE':
-            output_str += row_text + '\n'
+            output_str += get_lane_text( heat_page, row ) + '\n'
         elif row_type == 'NAME' and display_relay_swimmer_names:
-            output_str += row_text + '\n'
+            output_str += row.line + '\n'
             ## If split, space it out for readability
             if split_relays_to_multiple_files:
                 output_str += '\n'
@@ -361,20 +439,16 @@ def create_output_file_program_format1( output_dir_root: str,
             count = -99
             output_file_name = f"{file_name_prefix}{event_num:0>2}_{file_name_suffix}_heat_{heat_num:0>2}_split{split_num:0>2}.txt"
             
-            sst_common.write_output_file(output_dir, output_file_name, output_str)
+            yield ( output_file_name, output_str )
             output_str = header_str
             ## Regenerate the header?  Need a better way to do this
-            num_files_created += 1
             split_num += 1
             output_file_name = f"{file_name_prefix}{event_num:0>2}_{file_name_suffix}_heat_{heat_num:0>2}_split{split_num:0>2}.txt"
 
         if row_type == 'LANE':
             count += 1
     
-    sst_common.write_output_file(output_dir, output_file_name, output_str)
-    num_files_created += 1
-
-    return num_files_created
+    yield ( output_file_name, output_str )
 
 
 ####################################################################################
@@ -382,16 +456,13 @@ def create_output_file_program_format1( output_dir_root: str,
 ## For relays, put names on same line
 ##  1. SST  1) swimmer,one 2) swimmer, two 3) swimmer, three 4) swimmer, four
 #####################################################################################
-def create_output_file_program_format2( output_dir_root: str, 
-                                event_num: int, 
-                                heat_num: int,
-                                output_list: list, 
-                                display_relay_swimmer_names: bool,
-                                split_relays_to_multiple_files: bool ) -> int:
-    """ Generate the filename and open the next file """
+def render_program_format2( heat_page: sst_records.HeatPage, 
+                            display_relay_swimmer_names: bool,
+                            split_relays_to_multiple_files: bool ):
+    """ Generate the filename and text of the next file """
    
-    global event_num_relay
-    num_files_created = 0
+    event_num = heat_page.event_num
+    heat_num = heat_page.heat_num
     split_num = 1
     output_str = ""
     lane_str = ""
@@ -399,29 +470,24 @@ def create_output_file_program_format2( output_dir_root: str,
 
     ## Ignore the case where we get event0 heat0
     if event_num == 0:
-        return 0
-
-    output_dir = f"{output_dir_root}/"
+        return
     lane_str_without_names = ""
     ## For non relay events
     output_file_name = f"{file_name_prefix}{event_num:0>2}_{file_name_suffix}_heat_{heat_num:0>2}.txt"
     
-    re_relay_lane_line = re.compile('^\s*(\d{1,2})\s+(\S+)\s+(\S)')
-
     #header_list = ['H4', 'H5', 'H6']
     header_list = ['H4', 'H5']
-    for output_tuple in output_list:
-        row_type = output_tuple[0]
-        row_text = output_tuple[1]
+    for row in heat_page.rows:
+        row_type = row.row_type
 
-        logging.debug(f"PROGRAM: e: {event_num} h: {event_num} id: {row_type} t: {row_text}")
+        logging.debug(f"PROGRAM: e: {event_num} h: {event_num} id: {row_type} t: {row}")
 
         ## Save off the meet name, which somes at the end of the procesing as we are looping in reverse order
         #if row_type in header_list:
         if row_type == 'H4':
-            output_str += f"{row_text.rjust(55)}" + '\n'
+            output_str += f"{row.line.rjust(55)}" + '\n'
         elif row_type == 'H5':
-            output_str += f"{row_text.rjust(45)}" + '\n'
+            output_str += f"{row.line.rjust(45)}" + '\n'
         elif row_type == 'H6':
             output_str += '\n' + "  Ln Team     Swimmers" + '\n'
         elif row_type == 'LANE':
@@ -432,21 +498,18 @@ def create_output_file_program_format2( output_dir_root: str,
                output_str += lane_str_without_names 
             
             missing_name_for_this_lane = True
-            lane_str = row_text
             #  1 SST  D X2:37.00
-            relay_lane_line = re_relay_lane_line.findall(row_text)
-            if relay_lane_line:
-                relay_lane = str(relay_lane_line[0][0]).strip()
-                relay_sch  = str(relay_lane_line[0][1]).strip()
-                relay_name = str(relay_lane_line[0][2]).strip()
-                lane_str = f"{relay_lane:>4} {relay_sch:<4} {relay_name}"
-                lane_str_without_names = f"{lane_str:<2}\n"
+            ## Only the first word of a long team name fits
+            relay_sch_words = row.school.split()
+            relay_sch = relay_sch_words[0] if relay_sch_words else ""
+            lane_str = f"{row.lane:>4} {relay_sch:<4} {row.relay}"
+            lane_str_without_names = f"{lane_str:<2}\n"
 
             #output_str += row_text + '\n'
         elif row_type == 'NAME':
             missing_name_for_this_lane = False
 
-            name_str = reformat_relay_swimmers_names( row_text )
+            name_str = reformat_relay_swimmers_names( row )
             #output_str += row_text + '\n'
             output_str += f"{lane_str:<2} {name_str:<68}\n"
             ## If split, space it out for readability
@@ -455,10 +518,7 @@ def create_output_file_program_format2( output_dir_root: str,
 
     
     logging.debug(f"RELAY: {output_str}")
-    sst_common.write_output_file(output_dir, output_file_name, output_str)
-    num_files_created += 1
-
-    return num_files_created
+    yield ( output_file_name, output_str )
 
 
 ## Parse out the last name and first name of the given string, given delimeter
@@ -478,9 +538,10 @@ def split_lastname_firstname_from_string(fullname: str, delim=','):
 #1) Herrick, J 2) Rutherford, L 3) Sypal, C 4) Vogler, K
 
 ####################################################################################
-def reformat_relay_swimmers_names( name_line_in:str ) -> str:
+def reformat_relay_swimmers_names( relay_legs: sst_records.RelayLegs ) -> str:
 
-    new_name_str = name_line_in
+    new_name_str = relay_legs.line
+    relay_leg_names = relay_legs.get_legs()
     #re_name_line = re.compile('^1\)([A-z0-9\'\-, ]+?)2\)([A-z0-9\'\-, ]+?)3\)([A-z0-9\'\-, ]+?)4\)([A-z0-9\'\-, ]+?)$')
 
     ## WPD Ran into issue with a hyphenated name.  For now remove the hyphen
@@ -489,18 +550,8 @@ def reformat_relay_swimmers_names( name_line_in:str ) -> str:
     # if not ',' in name_line_in:
     #     name_line_in = f"{name_line_in},"
 
-    re_name_line = re.compile('^1\)(.*?)2\)(.*?)3\)(.*?)4\)(.*?)$')
-    re_program_space_relay_name = re.compile(r'(\S)([2-4]\))')
-
-    ## Fix the swimmers named to put a space prior to the position number (i.e.  "NameFirst2)"" to "NameFirst 2)")
-    name_line = re_program_space_relay_name.sub( r'\1 \2',name_line_in )
-    re_name_list = re_name_line.findall(name_line)
-
-    if re_name_list:
-        s1_fullname = str(re_name_list[0][0]).strip()
-        s2_fullname = str(re_name_list[0][1]).strip()
-        s3_fullname = str(re_name_list[0][2]).strip()
-        s4_fullname = str(re_name_list[0][3]).strip()
+    if relay_leg_names:
+        s1_fullname, s2_fullname, s3_fullname, s4_fullname = relay_leg_names
  
         ## Split name string "Last, First" into separate fields
         s1_lname, s1_fname = split_lastname_firstname_from_string( s1_fullname )
@@ -0,0 +1,162 @@
+import re
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ R E C O R D S                          ##########
+##########                                                                 ##########
+##########    What the program and results parsers pull out of a report.   ##########
+##########    The fields are kept as read (after the school lookups), and  ##########
+##########    the output files format them, so the renderers never have    ##########
+##########    to parse text back out of an already formatted line          ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+#####################################################################################
+## Values that repeat on every page (places, lanes, grades, schools, points) are kept
+## once here and shared by all the rows.  Unlike sys.intern the copy stays when the
+## pages using it are dropped, so a report read a page at a time doesn't add and
+## remove the same strings from the interpreter's intern table on every page
+#####################################################################################
+shared_values = {}
+
+def get_shared( value: str ) -> str:
+    return shared_values.setdefault( value, value )
+
+
+#####################################################################################
+## Every row of a page has a row_type.  It is a class attribute on the entry records
+## (not a slot), so it costs nothing per row:
+##   H1..H6  PageHeader      report/event/heat/column header lines
+##   PLACE   ResultRow       a results place line
+##   LANE    ProgramEntry    a program lane line
+##   NAME    RelayLegs       the relay swimmer names under a PLACE or LANE
+#####################################################################################
+class PageHeader:
+    __slots__ = ( 'row_type', 'line' )
+
+    def __init__(self, row_type: str, line: str):
+        self.row_type = row_type
+        self.line = line
+
+    def __repr__(self):
+        return f"PageHeader({self.row_type}, {self.line!r})"
+
+
+#####################################################################################
+## ResultRow
+## One place line of a results report.  relay is the relay letter, None for an
+## individual or diving entry.  The change from seed to final is worked out when the
+## row is written, not for every row parsed.
+## The places, grades, schools and points are shared values (get_shared)
+#####################################################################################
+class ResultRow:
+    row_type = 'PLACE'
+    __slots__ = ( 'place', 'name', 'grade', 'school', 'relay', 'seed', 'final', 'points', 'diving' )
+
+    def __init__(self, place: str, name: str, grade: str, school: str, relay, seed: str, final: str, points: str, diving: bool = False):
+        self.place = get_shared( place )
+        self.name = name
+        self.grade = get_shared( grade )
+        self.school = get_shared( school )
+        self.relay = relay
+        self.seed = seed
+        self.final = final
+        self.points = get_shared( points )
+        self.diving = diving
+
+    def __repr__(self):
+        return f"ResultRow({self.place!r}, {self.name!r}, {self.school!r}, relay {self.relay!r}, {self.seed!r} -> {self.final!r}, points {self.points!r})"
+
+
+#####################################################################################
+## ProgramEntry
+## One lane line of a meet program.  relay is the relay letter, None for an
+## individual or diving entry
+#####################################################################################
+class ProgramEntry:
+    row_type = 'LANE'
+    __slots__ = ( 'lane', 'name', 'grade', 'school', 'relay', 'seed' )
+
+    def __init__(self, lane: str, name: str, grade: str, school: str, relay, seed: str):
+        self.lane = get_shared( lane )
+        self.name = name
+        self.grade = get_shared( grade )
+        self.school = get_shared( school )
+        self.relay = relay
+        self.seed = seed
+
+    def __repr__(self):
+        return f"ProgramEntry({self.lane!r}, {self.name!r}, {self.school!r}, relay {self.relay!r}, {self.seed!r})"
+
+
+#####################################################################################
+## RelayLegs
+## The relay swimmer names line, as printed (with a space put back in front of
+## each 2) 3) 4)).  Most files print the line as is, so the four swimmers are only
+## split out of it for the files that list them one by one
+#####################################################################################
+re_relay_legs = re.compile(r'^1\)(.*?)2\)(.*?)3\)(.*?)4\)(.*?)$')
+
+class RelayLegs:
+    row_type = 'NAME'
+    __slots__ = ( 'line', )
+
+    def __init__(self, line: str):
+        self.line = line
+
+    def get_legs(self):
+        """ The four "Last, First" names, or None if the line doesn't have all four """
+
+        relay_legs = re_relay_legs.match( self.line )
+        return tuple( leg.strip() for leg in relay_legs.groups() ) if relay_legs else None
+
+    def __repr__(self):
+        return f"RelayLegs({self.line!r})"
+
+
+#####################################################################################
+## EventPage / HeatPage
+## The rows of one results event or one program heat, in report order, with the
+## options that decide how the rows are laid out.  school on the rows is already the
+## short or long name those options asked for
+#####################################################################################
+class EventPage:
+    __slots__ = ( 'event_num', 'rows', 'shorten_school_names_relays', 'shorten_school_names_individual', 'quote' )
+
+    def __init__(self, shorten_school_names_relays: bool, shorten_school_names_individual: bool, quote: str):
+        self.event_num = 0
+        self.rows = []
+        self.shorten_school_names_relays = shorten_school_names_relays
+        self.shorten_school_names_individual = shorten_school_names_individual
+        self.quote = quote
+
+    def add_header(self, row_type: str, line: str):
+        self.rows.append( PageHeader( row_type, line ) )
+
+    def __repr__(self):
+        return f"EventPage(event {self.event_num}, {len(self.rows)} rows)"
+
+
+class HeatPage:
+    __slots__ = ( 'event_num', 'heat_num', 'rows', 'shorten_school_names_relays', 'shorten_school_names_individual', 'quote' )
+
+    def __init__(self, shorten_school_names_relays: bool, shorten_school_names_individual: bool, quote: str):
+        self.event_num = 0
+        self.heat_num = 0
+        self.rows = []
+        self.shorten_school_names_relays = shorten_school_names_relays
+        self.shorten_school_names_individual = shorten_school_names_individual
+        self.quote = quote
+
+    def add_header(self, row_type: str, line: str):
+        self.rows.append( PageHeader( row_type, line ) )
+
+    def __repr__(self):
+        return f"HeatPage(event {self.event_num}, heat {self.heat_num}, {len(self.rows)} rows)"
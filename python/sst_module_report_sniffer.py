@@ -0,0 +1,247 @@
+import io
+import os
+import re
+
+import sst_module_common as sst_common
+import sst_module_pipeline as sst_pipeline
+import sst_module_sdif as sst_sdif
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ R E P O R T _ S N I F F E R            ##########
+##########                                                                 ##########
+##########    What kind of report a file is, from one read of its first    ##########
+##########    bytes.  The header lines and the first lines of the body     ##########
+##########    are scored against what each kind of report looks like, so   ##########
+##########    a report type line worded differently (another MM version)   ##########
+##########    is still found.  The bytes read are the start of the line    ##########
+##########    source, the report is not opened a second time               ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+## The encoding is detected from the same bytes (sst_pipeline.encoding_sniff_bytes), and
+## most reports fit in them.  Only the first lines are scored
+sniff_bytes = sst_pipeline.encoding_sniff_bytes
+sniff_lines = 60
+
+## Report kinds, and the -T/--reporttype names for them
+report_kind_program = 'program'
+report_kind_results = 'results'
+report_kind_team_rankings = 'teamrankings'
+report_kind_dual_meet_scores = 'dualmeetscores'
+report_kind_sdif = 'sdif'
+report_kinds = ( report_kind_program, report_kind_results, report_kind_team_rankings, report_kind_dual_meet_scores )
+
+## The report type line (line 3 of the header, before any " - meet name") of each kind
+## as Meet Manager 8 writes it
+report_type_names = {
+    report_kind_program:            'Meet Program',
+    report_kind_results:            'Results',
+    report_kind_team_rankings:      'Team Rankings',
+    report_kind_dual_meet_scores:   'Dual Meet Scores',
+}
+
+#####################################################################################
+## Signatures: (kind, where, regex, points).  where is 'type' for the report type line
+## or 'body' for the lines after the header.  Each signature counts once.
+## The exact report type is worth the most, the words in it next, then the lines a
+## report of that kind has near its start
+#####################################################################################
+report_signatures = [
+    ( report_kind_program,          'type', re.compile( r'^Meet Program$' ),                                    10 ),
+    ( report_kind_program,          'type', re.compile( r'\bProgram\b', re.I ),                                  5 ),
+    ( report_kind_program,          'body', re.compile( r'^\s*Heat\s+\d+\s+of\s+\d+', re.I ),                    4 ),
+    ( report_kind_program,          'body', re.compile( r'^\s*Lane\s+(Name|Team)\b', re.I ),                     3 ),
+
+    ( report_kind_results,          'type', re.compile( r'^Results$' ),                                         10 ),
+    ( report_kind_results,          'type', re.compile( r'\bResults?\b', re.I ),                                 5 ),
+    ( report_kind_results,          'body', re.compile( r'\b(Finals?|Prelims?)\s+(Time|Score)\b', re.I ),        4 ),
+    ( report_kind_results,          'body', re.compile( r'^\s*(\d+|---)\s+\S.*\s(X?\d*:?\d+\.\d\d|DQ|NS|DFS)\s', re.I ), 1 ),
+
+    ( report_kind_team_rankings,    'type', re.compile( r'^Team Rankings$' ),                                   10 ),
+    ( report_kind_team_rankings,    'type', re.compile( r'\bRankings?\b', re.I ),                                5 ),
+    ( report_kind_team_rankings,    'body', re.compile( r'^(\d{1,2})\s+([A-z\' \.]{27})\s+([A-z\' \.]{27})\s+(\d+)\s*(\d*)' ), 4 ),
+
+    ( report_kind_dual_meet_scores, 'type', re.compile( r'^Dual Meet Scores$' ),                                10 ),
+    ( report_kind_dual_meet_scores, 'type', re.compile( r'\bDual\b.*\bScores?\b', re.I ),                       5 ),
+    ( report_kind_dual_meet_scores, 'body', re.compile( r'^\s*([A-z\' \.]+?)\s+(\d{1,3}\.\d{2})\s+(\d{1,3}\.\d{2})\s+([A-z\' \.]+?)$' ), 4 ),
+    ( report_kind_dual_meet_scores, 'body', re.compile( r'^\s*(Men|Women)\s*$' ),                               1 ),
+]
+
+## Fewer points than this is not a match.  A body line alone isn't enough
+min_report_score = 5
+
+re_header_license = re.compile( r'^.*?([A-z0-9 \'-]+?)\s+HY-TEK' )
+re_header_mm_version = re.compile( r'HY-TEK\'?s?\s+MEET\s+MANAGER\s*([\d.]*)', re.I )
+re_header_meet = re.compile( r'^(.*?) - (\d+/\d+/\d+)' )
+
+
+#####################################################################################
+## get_header_info
+## From the first 3 lines of a report:
+##
+## Seton School                             HY-TEK's MEET MANAGER 8.0 - 10:02 AM  11/19/2020
+##               2020 NoVa Catholic Invitational Championship - 1/11/2020
+##                                     Meet Program
+##
+## (meet_name, meet_date, license_name, report_type, report_type_meet_name), "" for the
+## parts not found
+#####################################################################################
+def get_header_info( header_lines: list ) -> tuple:
+
+    line1_header, line2_header, line3_header = ( [ line.strip() for line in header_lines[:3] ] + [ "", "", "" ] )[:3]
+
+    ## There can be some garbage on the first line before the license name. Ignore that
+    license_match = re_header_license.match( line1_header )
+    license_name = license_match.group(1).strip() if license_match else ""
+
+    meet_match = re_header_meet.match( line2_header )
+    meet_name = meet_match.group(1).strip() if meet_match else ""
+    meet_date = meet_match.group(2).strip() if meet_match else ""
+
+    report_type = line3_header
+    report_type_meet_name = ""
+    if '-' in line3_header:
+        report_type, report_type_meet_name = line3_header.split('-', 1)
+        report_type = report_type.strip()
+        report_type_meet_name = report_type_meet_name.strip()
+
+    return meet_name, meet_date, license_name, report_type, report_type_meet_name
+
+
+#####################################################################################
+## HeadStream
+## The bytes already read, then the rest of the still open file
+#####################################################################################
+class HeadStream( io.RawIOBase ):
+    def __init__(self, head: bytes, report_file):
+        self.head = memoryview( head )
+        self.report_file = report_file
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.head:
+            num_bytes = min( len(buffer), len(self.head) )
+            buffer[:num_bytes] = self.head[:num_bytes]
+            self.head = self.head[num_bytes:]
+            return num_bytes
+        return self.report_file.readinto( buffer ) if self.report_file is not None else 0
+
+    def close(self):
+        if self.report_file is not None:
+            self.report_file.close()
+        super().close()
+
+
+#####################################################################################
+## ReportSniff
+## A report after one read of its first sniff_bytes.  The file stays open for
+## read_lines() until it has been read or close() is called (or use it with 'with').
+##   report_kind     one of report_kinds, report_kind_sdif, or None when nothing matched
+##   scores          the points of each kind
+##   mm_version      the Meet Manager version on the first line, "" if not found
+##   diagnosis       why the report wasn't recognized
+#####################################################################################
+class ReportSniff:
+    def __init__(self, meet_report_filename: str, encoding: str = "auto"):
+        self.filename = meet_report_filename
+        self.report_file = open( meet_report_filename, "rb", buffering=0 )
+        self.line_source = None
+        self.head = self.report_file.read( sniff_bytes )
+        self.complete = len( self.head ) < sniff_bytes
+        if self.complete:
+            self.close()
+        self.encoding = sst_pipeline.detect_encoding( self.head ) if encoding == "auto" else encoding
+
+        ## Whole lines only, the last one may be cut off at the end of the bytes read
+        head_text = self.head.decode( self.encoding, errors="replace" )
+        self.first_lines = [ sst_common.remove_accents( line ) for line in io.StringIO( head_text, newline=None ).readlines()[:sniff_lines + 1] ]
+        if not self.complete:
+            self.first_lines = self.first_lines[:sniff_lines]
+
+        self.header_info = get_header_info( self.first_lines )
+        mm_version = re_header_mm_version.search( self.first_lines[0] if self.first_lines else "" )
+        self.mm_version = mm_version.group(1) if mm_version else ""
+        self.scores = {}
+        self.report_kind = None
+        self.diagnosis = ""
+        self.classify()
+
+    def classify(self):
+        if sst_sdif.is_sdif_head( self.head ) or os.path.splitext( self.filename )[1].lower() in sst_sdif.sdif_file_extensions:
+            self.report_kind = report_kind_sdif
+            return
+
+        report_type = self.header_info[3]
+        body_lines = [ line.rstrip( "\r\n" ) for line in self.first_lines[3:] ]
+        self.scores = dict.fromkeys( report_kinds, 0 )
+        for report_kind, where, signature, points in report_signatures:
+            if where == 'type':
+                found = signature.search( report_type ) is not None
+            else:
+                found = any( signature.search( line ) for line in body_lines )
+            if found:
+                self.scores[report_kind] += points
+
+        if not self.first_lines or 'HY-TEK' not in self.first_lines[0].upper():
+            self.diagnosis = "the first line has no HY-TEK's MEET MANAGER header.  Save the report from Meet Manager as a text file"
+            return
+
+        best_kind, best_score = max( self.scores.items(), key=lambda kind_score: kind_score[1] )
+        tied_kinds = [ report_kind for report_kind, score in self.scores.items() if score == best_score ]
+        if best_score < min_report_score:
+            self.diagnosis = f"report type '{report_type}' is not a {', '.join( report_type_names.values() )} report"
+        elif len( tied_kinds ) > 1:
+            self.diagnosis = f"report type '{report_type}' could be any of {', '.join( tied_kinds )}.  Set it with -T"
+        else:
+            self.report_kind = best_kind
+
+    def get_diagnosis(self) -> str:
+        """ What was read and how it scored, for the error when the report isn't recognized """
+
+        scores = "  ".join( f"{report_kind} {score}" for report_kind, score in self.scores.items() )
+        first_lines = "".join( f"\t| {line.rstrip()}\n" for line in self.first_lines[:5] )
+        return f"{os.path.basename(self.filename)} not recognized: {self.diagnosis}\n" + \
+               f"\tMeet Manager {self.mm_version or 'version not found'}, {len(self.head)} bytes read, encoding {self.encoding}\n" + \
+               f"\tScores (need {min_report_score}): {scores}\n" + \
+               f"\tFirst lines:\n{first_lines}"
+
+    def read_lines(self):
+        """ The report's lines like sst_pipeline.read_lines: the bytes already read, then
+            the rest of the file.  Only once, the file is closed at the end or by close() """
+
+        self.line_source = self.get_lines()
+        return self.line_source
+
+    def get_lines(self):
+        report_file, self.report_file = self.report_file, None
+        with io.TextIOWrapper( io.BufferedReader( HeadStream( self.head, report_file ) ), encoding=self.encoding, errors="replace" ) as report_stream:
+            for line in report_stream:
+                yield sst_common.remove_accents( line )
+
+    def close(self):
+        ## Lines not all read (an error or a cancelled run) still have the file open
+        if self.line_source is not None:
+            self.line_source.close()
+        if self.report_file is not None:
+            self.report_file.close()
+            self.report_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def sniff_report( meet_report_filename: str, encoding: str = "auto" ) -> ReportSniff:
+    return ReportSniff( meet_report_filename, encoding )
@@ -1,6 +1,13 @@
+import itertools
 import logging
 import re
 import sst_module_common as sst_common
+import sst_module_results_scores as sst_result_scores
+import sst_module_line_classifier as sst_line_classifier
+import sst_module_columns as sst_columns
+import sst_module_records as sst_records
+import sst_module_pipeline as sst_pipeline
+import sst_module_parse_coverage as sst_parse_coverage
 import datetime
 
 g_unofficial_results = "    ** UNOFFICIAL RESULTS **"
@@ -10,6 +17,41 @@ g_file_name_prefix = "event_"
 g_file_name_suffix = "RESULTS"
 g_file_name_awards = "AWARDS"
 
+## Column header lines of the results files, and the width of the school names in
+## the report for each kind of event.  The SDIF reader uses them too
+result_header_len_dict = {
+    'individual_long': 25,
+    'diving_long': 25,
+    'relay_long': 22,
+}
+
+## NOTE: Do not align up these headers with the TXT output.  
+##  Wirecast will center all lines and it will be in proper position then
+champsionship_result_header_dict = {
+    'individual_long':   "Name                    Yr School               Final Time     Change      Points",
+    'individual_short':  "        Name                 School Yr   Final   Change   Pts",
+    'diving_long':       "Name                    Yr School                           Finals Score      Points",
+    'diving_short':      "        Name                 School Yr  Final    Change  Pts",
+    'relay_long':         "           Team               Relay  Final   Change  Pts",        
+    'relay_short':       "   Team Relay Final    Change   Pts",    
+}
+# result_header_dict = {
+#     'individual_long':   "Name                    Yr School                 Seed Time  Finals Time            ",
+#     'individual_short':  "        Name                  Sch  Yr    Seed    Finals      ",
+#     'diving_long':       "Name                    Yr School                           Finals Score           ",
+#     'diving_short':      "        Name                 School Yr   Seed     Final     ",
+#     'relay_long':         "           Team                  Relay  Seed   Finals     ",        
+#     'relay_short':       "   Team       Relay Seed Time  Finals Time       ",    
+# }
+result_header_dict = {
+    'individual_long':   "Name                    Yr School                 Finals Time   Change   ",
+    'individual_short':  "        Name                  Sch  Yr   Time    Change    ",
+    'diving_long':       "Name                    Yr School                         Time Score      ",
+    'diving_short':      "        Name                 School Yr      Final     ",
+    'relay_long':         "           Team              Relay  Time    Change  ",        
+    'relay_short':       "   Team       Relay Seed Time  Finals Time  Change",    
+}
+
 #####################################################################################
 ### If we can display colors on wirecast
 ### this will define our color pallet
@@ -50,9 +92,10 @@ class bcolors:
 #####################################################################################
 
 ####################################################################################
-## Parse the report file and generate an output array
+## Parse the report lines and generate the output files: RESULTS/AWARDS for each
+## event and the team scores from the end of the report
 #####################################################################################
-def process_result( meet_report_filename: str, 
+def process_result( report_pages, 
                     output_dir: str, 
                     mm_license_name: str, 
                     shorten_school_names_relays: bool, 
@@ -64,54 +107,68 @@ def process_result( meet_report_filename: str,
                     num_results_to_display: int,
                     championshipmeet: bool,
                     awards:bool,
-                    awardsRelayNames: bool ) -> int:
+                    awardsRelayNames: bool,
+                    parse_scores: bool = True ) -> int:
     """ Given the MeetManager results file file formatted in a specific manner,
-        generate indiviual result files for use in Wirecast displays """
-
-
-    result_header_len_dict = {
-        'individual_long': 25,
-        'diving_long': 25,
-        'relay_long': 22,
-    }
-
-    ## NOTE: Do not align up these headers with the TXT output.  
-    ##  Wirecast will center all lines and it will be in proper position then
-    champsionship_result_header_dict = {
-        'individual_long':   "Name                    Yr School               Final Time     Change      Points",
-        'individual_short':  "        Name                 School Yr   Final   Change   Pts",
-        'diving_long':       "Name                    Yr School                           Finals Score      Points",
-        'diving_short':      "        Name                 School Yr  Final    Change  Pts",
-        'relay_long':         "           Team               Relay  Final   Change  Pts",        
-        'relay_short':       "   Team Relay Final    Change   Pts",    
-    }
-    # result_header_dict = {
-    #     'individual_long':   "Name                    Yr School                 Seed Time  Finals Time            ",
-    #     'individual_short':  "        Name                  Sch  Yr    Seed    Finals      ",
-    #     'diving_long':       "Name                    Yr School                           Finals Score           ",
-    #     'diving_short':      "        Name                 School Yr   Seed     Final     ",
-    #     'relay_long':         "           Team                  Relay  Seed   Finals     ",        
-    #     'relay_short':       "   Team       Relay Seed Time  Finals Time       ",    
-    # }
-    result_header_dict = {
-        'individual_long':   "Name                    Yr School                 Finals Time   Change   ",
-        'individual_short':  "        Name                  Sch  Yr   Time    Change    ",
-        'diving_long':       "Name                    Yr School                         Time Score      ",
-        'diving_short':      "        Name                 School Yr      Final     ",
-        'relay_long':         "           Team              Relay  Time    Change  ",        
-        'relay_short':       "   Team       Relay Seed Time  Finals Time  Change",    
-    }
+        generate indiviual result files for use in Wirecast displays.
+        parse_scores False skips the team scores, for only some pages of the report """
+
+    num_files_generated = 0
+    for page_type, page_key, page in parse_result_pages( report_pages, 
+                                                         mm_license_name, 
+                                                         shorten_school_names_relays, 
+                                                         shorten_school_names_individual, 
+                                                         namesfirstlast, 
+                                                         quote_output, 
+                                                         championshipmeet,
+                                                         parse_scores ):
+        if page_type == 'results':
+            num_files_generated += create_output_file( output_dir, page_key, page, display_relay_swimmer_names, num_results_to_display, awards, awardsRelayNames )
+        elif page_type == 'results_scores':
+            num_files_generated += sst_result_scores.create_output_result_scores_champ( output_dir, page, num_results_to_display )
+
+    #####################################################################################
+    ## RESULTS: All done. Return counts of files created
+    #####################################################################################
+    return num_files_generated
+
+
+####################################################################################
+## One pass over the results report pages (sst_pipeline.split_pages).  Yields the
+## pages as they are parsed:
+##   ('results', event_num, EventPage) for each event, when the next event starts
+##   ('results_scores', None, output_list) with the team scores, at the end
+## The scores parser is fed the same lines, so the report is read, stripped and
+## split into pages once for the results, awards and scores files
+#####################################################################################
+def parse_result_pages( report_pages, 
+                        mm_license_name: str, 
+                        shorten_school_names_relays: bool, 
+                        shorten_school_names_individual: bool, 
+                        namesfirstlast: bool, 
+                        quote_output: bool,
+                        championshipmeet: bool,
+                        parse_scores: bool = True ):
+
+
+    ## Quote output for debuggin
+    q = "'" if quote_output else ""
+
     ## Define local variables
     event_num = 0
-    num_files_generated = 0
     num_header_lines = 3
     found_header_line = 0
-    output_list = []
+    event_page = sst_records.EventPage( shorten_school_names_relays, shorten_school_names_individual, q )
     continue_processing_current_event = True
+    ## Where the columns are on this page, from its column header line
+    column_layout = None
 
     # re_results_lane = re.compile('^[*]?\d{1,2} ')
     # re_results_lane = re.compile('^--- ')
-    re_results_lane = re.compile('^([*]?\d{1,2} )|(--- )')
+    # re_results_lane = re.compile('^([*]?\d{1,2} )|(--- )')
+    ## Place lines (and --- for no place) are found by the line classifier
+    line_classifier = sst_line_classifier.LineClassifier( mm_license_name )
+    re_results_place_1_9 = re.compile('^([1-9]) ')
 
 
     # #                                 TIE? PLACE       LAST          FIRST     GR           SCHOOL           SEEDTIME|NT|NP    [xX]FINALTIME      POINTS
@@ -128,231 +185,253 @@ def process_result( meet_report_filename: str,
     re_results_lane_relay = re.compile('^([*]?\d{1,2}|---)\s+([A-Z \'.].*)\s+([A-Z])\s+([0-9:.]+|NT)\s+([X]DQ|[xX0-9:.]+)\s*([0-9]*)')
 
     re_results_space_relay_name = re.compile(r'(\S)([2-4]\))')
-    re_results_check_relay_name_line = re.compile('1\)')
 
-    ## Quote output for debuggin
-    q = "'" if quote_output else ""
+    scores_parser = sst_result_scores.ResultsScoresParser( mm_license_name ) if parse_scores else None
+
+    ## --parsecoverage times and counts the patterns and the column parser (sst_parse_coverage).
+    ## Otherwise these are the same patterns and functions
+    line_classifier = sst_parse_coverage.get_timed_classifier( line_classifier, 'results.line_classifier' )
+    re_results_place_1_9 = sst_parse_coverage.get_timed_pattern( re_results_place_1_9, 'results.re_results_place_1_9', parses=False )
+    re_results_lane_ind = sst_parse_coverage.get_timed_pattern( re_results_lane_ind, 'results.re_results_lane_ind' )
+    re_results_lane_relay = sst_parse_coverage.get_timed_pattern( re_results_lane_relay, 'results.re_results_lane_relay' )
+    re_results_space_relay_name = sst_parse_coverage.get_timed_pattern( re_results_space_relay_name, 'results.re_results_space_relay_name' )
+    get_result_fields_individual = sst_parse_coverage.get_timed_function( sst_columns.get_result_fields_individual, 'results.columns_individual' )
+    get_result_fields_relay = sst_parse_coverage.get_timed_function( sst_columns.get_result_fields_relay, 'results.columns_relay' )
 
     #####################################################################################
     ## RESULTS: Loop through each line of the input file
     #####################################################################################
-    with open(meet_report_filename, "r") as meet_report_file:
-        for in_line in meet_report_file:
-
-            line = sst_common.remove_accents( in_line) 
-
-            #####################################################################################
-            ## RESULTS: Remove the extra newline at end of line
-            #####################################################################################
-            line = line.strip()
-
-            #####################################################################################
-            ## RESULTS: Ignore all the blank lines             
-            #####################################################################################
-            if line == '\n' or line == '':
-                continue
-
-            #####################################################################################
-            ## Meet Manager license name
-            ## We have one event per page, so this starts the next event
-            #####################################################################################
-            if re.search("^%s" % mm_license_name, line):
-                found_header_line = 1
-                
-                ## The start of the next event finished off the last event. Go write out the last event
-                if continue_processing_current_event:
-                    num_files = create_output_file( output_dir, event_num, output_list, display_relay_swimmer_names, num_results_to_display, awards, awardsRelayNames )
-                    num_files_generated += num_files
-
-                ## Reset and start processing the next event
-                output_list = []
-                output_list.append( ('H1', line ))
-                continue
-
-            #####################################################################################
-            ## if the previous line was the first header (found_header_line=1)
-            ## then ignore the next two lines which are also part of the header
-            #####################################################################################
-            if 0 < found_header_line < num_header_lines:
-                found_header_line += 1
-                if found_header_line == 2:
-                    output_list.append( ('H2', line ))
-                elif found_header_line == 3:
-                    output_list.append( ('H3', line ))
-                continue
-
-                       
-            #####################################################################################
-            ## RESULTS: Start with Event line.  
-            ##  Get the Event Number from the report
-            ##  Clean it up
-            #####################################################################################
-            if line.lower().startswith(("event")):
-                logging.info(f"RESULTS: EVENT LINE: {line}")
-                continue_processing_current_event = True
-
-                event_num, event_str = sst_common.get_event_num_from_eventline( line )
-
-                ## H4 is the Event number/name line
-                # output_list.append(('H4', f"{line} {g_unofficial_results}" ))
-                output_list.append(('H4', f"{line}" ))
-
-                #####################################################################################
-                ## RESULTS: Set name_list_header to be displayed above the list of swimmers
-                #####################################################################################
-                header_dict = champsionship_result_header_dict if championshipmeet else result_header_dict
-                name_list_header = sst_common.get_header_line( event_num, shorten_school_names_relays, shorten_school_names_individual, header_dict ) 
-
-                if name_list_header != "":
-                    output_list.append(('H6', name_list_header))
-
-            #####################################################################################
-            ## RESULTS: Looks for a second page of results 
-            ##  Stop processing when this occurs.  We can't display even a single full page
-            #####################################################################################
-            if line.lower().startswith(("(event")):
-                continue_processing_current_event = False
-
-                num_files = create_output_file( output_dir, event_num, output_list, display_relay_swimmer_names, num_results_to_display, awards, awardsRelayNames )
-                num_files_generated += num_files
-
+    for line in sst_parse_coverage.get_counted_lines( itertools.chain.from_iterable( report_pages ), 'results' ):
+
+        ## The column parser needs the line as it is in the report
+        ## (sst_pipeline.read_lines has already removed the accents)
+        report_line = line
+
+        #####################################################################################
+        ## RESULTS: Remove the extra newline at end of line
+        #####################################################################################
+        line = line.strip()
+
+        #####################################################################################
+        ## RESULTS: Ignore all the blank lines             
+        #####################################################################################
+        if line == '\n' or line == '':
+            continue
+
+        line_kind = line_classifier.classify( line )
+        is_place_line = line_kind in (sst_line_classifier.LINE_LANE, sst_line_classifier.LINE_UNPLACED)
+
+        #####################################################################################
+        ## Meet Manager license name
+        ## We have one event per page, so this starts the next event
+        #####################################################################################
+        if line_kind == sst_line_classifier.LINE_LICENSE:
+            found_header_line = 1
+            column_layout = None
+            if scores_parser is not None:
+                scores_parser.start_page( line )
+            
+            ## The start of the next event finished off the last event. Go write out the last event
+            if continue_processing_current_event:
+                event_page.event_num = event_num
+                yield ( 'results', event_num, event_page )
+
+            ## Reset and start processing the next event
+            event_page = sst_records.EventPage( shorten_school_names_relays, shorten_school_names_individual, q )
+            event_page.add_header( 'H1', line )
+            continue
+
+        #####################################################################################
+        ## if the previous line was the first header (found_header_line=1)
+        ## then ignore the next two lines which are also part of the header
+        #####################################################################################
+        if 0 < found_header_line < num_header_lines:
+            found_header_line += 1
+            if scores_parser is not None:
+                scores_parser.header_line( found_header_line, line )
+            if found_header_line == 2:
+                event_page.add_header( 'H2', line )
+            elif found_header_line == 3:
+                event_page.add_header( 'H3', line )
+            continue
+
+        ## The team scores follow the last event
+        if scores_parser is not None:
+            scores_parser.score_line( line )
+                   
+        #####################################################################################
+        ## RESULTS: Start with Event line.  
+        ##  Get the Event Number from the report
+        ##  Clean it up
+        #####################################################################################
+        if line_kind == sst_line_classifier.LINE_EVENT:
+            logging.info(f"RESULTS: EVENT LINE: {line}")
+            continue_processing_current_event = True
+
+            event_num, event_str = sst_common.get_event_num_from_eventline( line )
+            if scores_parser is not None:
+                scores_parser.event_line( event_num )
+
+            ## H4 is the Event number/name line
+            # output_list.append(('H4', f"{line} {g_unofficial_results}" ))
+            event_page.add_header( 'H4', f"{line}" )
 
             #####################################################################################
-            ## RESULTS: For place winner results, add a space after top 1-9 swimmers 
-            ##          so names line up with 10-12 place
-            #####################################################################################
-            if re.search("^[1-9] ", line):
-                line = re.sub('^([1-9]) ', r'\1  ', line )
-    
-            #####################################################################################
-            ## RESULTS: INDIVIDUAL Find the Place Winner line, place, name, school, time, points, etc
-            ## i.e. 1 Last, First           SR SCH   5:31.55      5:23.86        16
-            ## Note: For ties an asterick is placed before the place number and the points could have a decimal
+            ## RESULTS: Set name_list_header to be displayed above the list of swimmers
             #####################################################################################
-            if (event_num in sst_common.event_num_individual or event_num in sst_common.event_num_diving) and re_results_lane.search(line):
+            header_dict = champsionship_result_header_dict if championshipmeet else result_header_dict
+            name_list_header = sst_common.get_header_line( event_num, shorten_school_names_relays, shorten_school_names_individual, header_dict ) 
+
+            if name_list_header != "":
+                event_page.add_header( 'H6', name_list_header )
+
+        #####################################################################################
+        ## RESULTS: Looks for a second page of results 
+        ##  Stop processing when this occurs.  We can't display even a single full page
+        #####################################################################################
+        if line_kind == sst_line_classifier.LINE_EVENT_CONTINUED:
+            continue_processing_current_event = False
+
+            event_page.event_num = event_num
+            yield ( 'results', event_num, event_page )
+
+
+        #####################################################################################
+        ## RESULTS: For place winner results, add a space after top 1-9 swimmers 
+        ##          so names line up with 10-12 place
+        #####################################################################################
+        if is_place_line:
+            line = re_results_place_1_9.sub( r'\1  ', line )
+
+        #####################################################################################
+        ## RESULTS: INDIVIDUAL Find the Place Winner line, place, name, school, time, points, etc
+        ## i.e. 1 Last, First           SR SCH   5:31.55      5:23.86        16
+        ## Note: For ties an asterick is placed before the place number and the points could have a decimal
+        #####################################################################################
+        if line_kind == sst_line_classifier.LINE_COLUMN_HEADER:
+            column_layout = sst_columns.ColumnLayout( report_line )
+
+        if (event_num in sst_common.meet_state.event_num_individual or event_num in sst_common.meet_state.event_num_diving) and is_place_line:
+            ## The length of the school name in the MM report varies by event type
+            school_name_len = result_header_len_dict['individual_long']  if event_num in sst_common.meet_state.event_num_individual else result_header_len_dict['diving_long']
+
+            ## Cut the line at the header's columns.  The regex is for lines that don't line up
+            place_fields = get_result_fields_individual( report_line, column_layout, school_name_len ) if column_layout else None
+            if place_fields:
+                place_line_list = [ place_fields ]
+                sst_common.add_run_stat( 'lines_fixed_width' )
+            else:
                 place_line_list = re_results_lane_ind.findall(line)
-                logging.debug(f"PARSING:  {line=}")
-
                 if place_line_list:
-                    placeline_place       = str(place_line_list[0][0]).strip()
-                    placeline_name_last_first = str(place_line_list[0][1]).strip()
-                    placeline_grade       = str(place_line_list[0][2]).strip()
-                    placeline_school_raw= str(place_line_list[0][3]).strip()
-                    placeline_seedtime    = str(place_line_list[0][4]).strip()
-                    placeline_finaltime   = str(place_line_list[0][5]).strip()
-                    placeline_points      = str(place_line_list[0][6]).strip()        
-
-                    if placeline_points == "":
-                        placeline_points = "-"
-
-                    ## Wierd case where a DQ results has part of finaltime in points column
-                    if 'DQ' in placeline_finaltime:
-                        placeline_points = "-"
-
-                    ## Get formatted string of positive/negative chanage in tie
-                    if event_num in sst_common.event_num_individual:
-                        changeInTime = computeSeedFinalTimeDiff( placeline_seedtime, placeline_finaltime )
-                    elif event_num in sst_common.event_num_diving:
-                        changeInTime = computeDivingSeedFinalTimeDiff( placeline_seedtime, placeline_finaltime )
-                    else:
-                        changeInTime = "------"
-
-                    logging.debug(f"RESULTS: place {placeline_place}: name {placeline_name_last_first}: grade {placeline_grade}: sch {placeline_school_raw}: seed {placeline_seedtime}: final {placeline_finaltime}: points {placeline_points}:")
-                    ## If we want to use Shortened School Names, run the lookup
-                    ## The length of the school name in the MM report varies by event type
-                    school_name_len = result_header_len_dict['individual_long']  if event_num in sst_common.event_num_individual else result_header_len_dict['diving_long']
-                    ## Normalize the long school name to clean it up to the "short full name" we want to display
-                    placeline_school_long =  sst_common.short_school_name_lookup(placeline_school_raw, school_name_len)
-                    placeline_school_short = sst_common.short_school_abbr_lookup( placeline_school_raw, school_name_len )
-
-                    ## We can display name as given (Last, First) or change it to First Last with cli parameter
-                    result_name = sst_common.reverse_lastname_firstname( placeline_name_last_first ) if namesfirstlast else placeline_name_last_first
-
-                    ## Format the output lines with either long (per meet program) or short school names
-                    # with points
-                    
-                    #full_team_name = placeline_school_long
-                    full_team_name = sst_common.find_short_team_name( placeline_school_long )
-
-                    # output_str = f"{q}{placeline_place:>3}{q} {q}{result_name:<25}{q} {q}{placeline_grade:>2}{q} {q}{placeline_school_long:<25}{q} {q}{placeline_seedtime:>8}{q} {q}{placeline_finaltime:>8}{q} {q}{placeline_points:>2}{q}"
-
-                    points_str = f"{q}{placeline_points:>4}{q}" if champsionship_result_header_dict else ""
-                    #output_str = f"{q}{placeline_place:>3}{q} {q}{result_name:<25}{q} {q}{placeline_grade:>2}{q} {q}{full_team_name:<25}{q} {q}{placeline_seedtime:>8}{q} {q}{placeline_finaltime:>8}{q} {points_str}"
-                    #output_str = f"{q}{placeline_place:>3}{q} {q}{result_name:<25}{q} {q}{placeline_grade:>2}{q} {q}{full_team_name:<25}{q} {q}{placeline_seedtime:>8}{q} {q}{placeline_finaltime:>8}{q} {q}{changeInTime:>8}{q} {points_str}" 
-                    output_str = f"{q}{placeline_place:>3}{q} {q}{result_name:<25}{q} {q}{placeline_grade:>2}{q} {q}{full_team_name:<25}{q} {q}{placeline_finaltime:>8}{q} {q}{changeInTime:>8}{q} {points_str}" 
-                    
-                    if shorten_school_names_individual:
-                        #output_str = f"{q}{placeline_place:>3}{q} {q}{result_name:<25}{q} {q}{placeline_school_short:<4}{q} {q}{placeline_grade:>2}{q} {q}{placeline_seedtime:>8}{q} {q}{placeline_finaltime:>8}{q} {q}{placeline_points:>2}{q}"
-                        #output_str = f"{q}{placeline_place:>3}{q} {q}{result_name:<25}{q} {q}{placeline_school_short:<4}{q} {q}{placeline_grade:>2}{q} {q}{placeline_seedtime:>8}{q} {q}{placeline_finaltime:>8}{q}{points_str}"
-                        #output_str = f"{q}{placeline_place:>3}{q} {q}{result_name:<25}{q} {q}{placeline_school_short:<4}{q} {q}{placeline_grade:>2}{q} {q}{placeline_seedtime:>8}{q} {q}{placeline_finaltime:>8}{q} {q}{changeInTime:>8}{q} {points_str}"
-                        output_str = f"{q}{placeline_place:>3}{q} {q}{result_name:<25}{q} {q}{placeline_school_short:<4}{q} {q}{placeline_grade:>2}{q} {q}{placeline_finaltime:>8}{q} {q}{changeInTime:>8}{q} {points_str}"
-                    
-                    output_list.append(('PLACE', output_str))
+                    sst_common.add_run_stat( 'lines_regex' )
+            logging.debug(f"PARSING:  {line=}")
 
-            #####################################################################################
-            ## RESULTS: RELAY Find the Place Winner line, place, name, school, time, points, etc
-            ## 1 SST            A                    1:46.82      1:40.65        32
-            ## Note: For ties an asterick is placed before the place number and the points could have a decimal
-            #####################################################################################
-            # if event_num in sst_common.event_num_relay and re_results_lane.search(line):
-            if event_num in sst_common.event_num_relay:
+            if place_line_list:
+                placeline_place       = str(place_line_list[0][0]).strip()
+                placeline_name_last_first = str(place_line_list[0][1]).strip()
+                placeline_grade       = str(place_line_list[0][2]).strip()
+                placeline_school_raw= str(place_line_list[0][3]).strip()
+                placeline_seedtime    = str(place_line_list[0][4]).strip()
+                placeline_finaltime   = str(place_line_list[0][5]).strip()
+                placeline_points      = str(place_line_list[0][6]).strip()        
+
+                if placeline_points == "":
+                    placeline_points = "-"
+
+                ## Wierd case where a DQ results has part of finaltime in points column
+                if 'DQ' in placeline_finaltime:
+                    placeline_points = "-"
+
+                logging.debug(f"RESULTS: place {placeline_place}: name {placeline_name_last_first}: grade {placeline_grade}: sch {placeline_school_raw}: seed {placeline_seedtime}: final {placeline_finaltime}: points {placeline_points}:")
+                ## If we want to use Shortened School Names, run the lookup
+                ## Normalize the long school name to clean it up to the "short full name" we want to display
+                placeline_school_long =  sst_common.short_school_name_lookup(placeline_school_raw, school_name_len)
+                placeline_school_short = sst_common.short_school_abbr_lookup( placeline_school_raw, school_name_len )
+
+                ## We can display name as given (Last, First) or change it to First Last with cli parameter
+                result_name = sst_common.reverse_lastname_firstname( placeline_name_last_first ) if namesfirstlast else placeline_name_last_first
+
+                ## Keep either long (per meet program) or short school names.  The line is formatted when it is written
+                if shorten_school_names_individual:
+                    result_school = placeline_school_short
+                else:
+                    result_school = sst_common.find_short_team_name( placeline_school_long )
+
+                result_row = sst_records.ResultRow( placeline_place, result_name, placeline_grade, result_school, None,
+                                                    placeline_seedtime, placeline_finaltime, placeline_points,
+                                                    diving = event_num in sst_common.meet_state.event_num_diving )
+                event_page.rows.append( result_row )
+            else:
+                ## Looks like a place line but the columns didn't match. This swimmer is missing from the output
+                sst_common.add_run_stat( 'lines_unparsed' )
+
+        #####################################################################################
+        ## RESULTS: RELAY Find the Place Winner line, place, name, school, time, points, etc
+        ## 1 SST            A                    1:46.82      1:40.65        32
+        ## Note: For ties an asterick is placed before the place number and the points could have a decimal
+        #####################################################################################
+        if event_num in sst_common.meet_state.event_num_relay and is_place_line:
+            place_fields = get_result_fields_relay( report_line, column_layout ) if column_layout else None
+            if place_fields:
+                place_line_list = [ place_fields ]
+                sst_common.add_run_stat( 'lines_fixed_width' )
+            else:
                 place_line_list = re_results_lane_relay.findall(line)
-
                 if place_line_list:
-                    placeline_place     = str(place_line_list[0][0])
-                    placeline_sch_long  = str(place_line_list[0][1])
-                    placeline_relay     = str(place_line_list[0][2])
-                    placeline_seedtime  = str(place_line_list[0][3])
-                    placeline_finaltime = str(place_line_list[0][4])
-                    placeline_points    = str(place_line_list[0][5])
+                    sst_common.add_run_stat( 'lines_regex' )
 
-                    if placeline_points == "":
-                        placeline_points = "-"
-                    if 'DQ' in placeline_finaltime:
-                        placeline_points = "-"
-
-                    ## Get formatted string of positive/negative chanage in tie
-                    changeInTime = computeSeedFinalTimeDiff( placeline_seedtime, placeline_finaltime )
-
-                    #####################################################################################
-                    ## RESULTS: Replace long school name with short name for RELAY events
-                    #####################################################################################
-                    placeline_sch_short = sst_common.short_school_name_lookup( placeline_sch_long, result_header_len_dict['relay_long'] )
-
-                    ## Relay results are strange.  They give you 30 characters but truncate school to 22 characters
-                    ## Remove remaing spaces
-                    placeline_sch_short = placeline_sch_short.strip()
-
-                    points_str = f"{q}{placeline_points:>4}{q}" if champsionship_result_header_dict else ""
-
-                    if shorten_school_names_relays:                        
-                        output_str = f" {q}{placeline_place:>3}{q} {q}{placeline_sch_short:<25}{q} {q}{placeline_relay}{q} {q}{placeline_seedtime:>8}{q} {q}{placeline_finaltime:>8}{q} {q}{changeInTime:>8}{q} {points_str}"
-                    else:
-                        #full_team_name = placeline_sch_long
-                        full_team_name = sst_common.find_full_team_name( placeline_sch_long )
+            if place_line_list:
+                placeline_place     = str(place_line_list[0][0])
+                placeline_sch_long  = str(place_line_list[0][1])
+                placeline_relay     = str(place_line_list[0][2])
+                placeline_seedtime  = str(place_line_list[0][3])
+                placeline_finaltime = str(place_line_list[0][4])
+                placeline_points    = str(place_line_list[0][5])
+
+                if placeline_points == "":
+                    placeline_points = "-"
+                if 'DQ' in placeline_finaltime:
+                    placeline_points = "-"
 
-                        output_str = f" {q}{placeline_place:>3}{q} {q}{full_team_name[:25]:<25}{q} {q}{placeline_relay}{q} {q}{placeline_finaltime:>8}{q} {q}{changeInTime:>8}{q} {points_str}"
-                    output_list.append(( "PLACE", output_str ))
+                #####################################################################################
+                ## RESULTS: Replace long school name with short name for RELAY events
+                #####################################################################################
+                placeline_sch_short = sst_common.short_school_name_lookup( placeline_sch_long, result_header_len_dict['relay_long'] )
+
+                ## Relay results are strange.  They give you 30 characters but truncate school to 22 characters
+                ## Remove remaing spaces
+                placeline_sch_short = placeline_sch_short.strip()
+
+                if shorten_school_names_relays:                        
+                    result_school = placeline_sch_short
+                else:
+                    #full_team_name = placeline_sch_long
+                    full_team_name = sst_common.find_full_team_name( placeline_sch_long )
+                    result_school = full_team_name[:25]
+
+                result_row = sst_records.ResultRow( placeline_place, "", "", result_school, placeline_relay,
+                                                    placeline_seedtime, placeline_finaltime, placeline_points )
+                event_page.rows.append( result_row )
+            else:
+                sst_common.add_run_stat( 'lines_unparsed' )
 
-            #####################################################################################
-            ## RESULTS: For results on relays and the swimmers name as well to the list
-            ##          Its up to the output function to determine to display them or not
-            #####################################################################################
-            if event_num in sst_common.event_num_relay and re_results_check_relay_name_line.search(line):
-                line = re_results_space_relay_name.sub( r'\1 \2',line )
-                output_list.append(( "NAME", line ))  
+        #####################################################################################
+        ## RESULTS: For results on relays and the swimmers name as well to the list
+        ##          Its up to the output function to determine to display them or not
+        #####################################################################################
+        if event_num in sst_common.meet_state.event_num_relay and line_kind == sst_line_classifier.LINE_RELAY_NAMES:
+            line = re_results_space_relay_name.sub( r'\1 \2',line )
+            event_page.rows.append( sst_records.RelayLegs( line ) )
 
     #####################################################################################
     ## Reached end of file
-    ## Write out last event
-    #####################################################################################
-    create_output_file( output_dir, event_num, output_list, display_relay_swimmer_names, num_results_to_display, awards, awardsRelayNames )
-    num_files_generated += 1
-        
+    ## Write out last event, then the scores
     #####################################################################################
-    ## RESULTS: All done. Return counts of files created
-    #####################################################################################
-    return num_files_generated
+    event_page.event_num = event_num
+    yield ( 'results', event_num, event_page )
+
+    if scores_parser is not None:
+        yield ( 'results_scores', None, scores_parser.output_list )
 
 
 
@@ -360,98 +439,101 @@ def process_result( meet_report_filename: str,
 ## Given an array of RESULTS lines PER EVENT, generate the output file for this event
 ## Wrapper function
 #####################################################################################
+@sst_common.render_timer
 def create_output_file( output_dir: str, 
                                 event_num: int, 
-                                output_list: list, 
+                                event_page: sst_records.EventPage, 
                                 display_relay_swimmer_names: bool,
                                 num_results_to_display: int,
                                 awards: bool,
                                 awardsRelayNames: bool  ) -> int:
 
-    num_results_files_generated = 0
-    num_awards_files_generated = 0
+    sst_common.save_parsed_page( 'results', event_num, event_page )
+
+    return sst_pipeline.write_files( output_dir, 
+                                     render_event_page( event_page, 
+                                                        display_relay_swimmer_names,
+                                                        num_results_to_display,
+                                                        awards,
+                                                        awardsRelayNames ) )
+
+
+#####################################################################################
+## Renderer.  Yield the (file name, text) of the RESULTS file and the AWARDS file
+## for an event page, without writing them
+#####################################################################################
+def render_event_page( event_page: sst_records.EventPage, 
+                       display_relay_swimmer_names: bool,
+                       num_results_to_display: int,
+                       awards: bool,
+                       awardsRelayNames: bool ):
+
     ## Generate Standard results file
-    num_awards_files_generated = \
-        create_output_file_results( output_dir, 
-                                    event_num, 
-                                    output_list, 
-                                    display_relay_swimmer_names,
-                                    num_results_to_display ) 
+    yield from render_results( event_page, 
+                               display_relay_swimmer_names,
+                               num_results_to_display ) 
 
     ## Generate Awards file
     if awards:
-        num_results_files_generated = \
-            create_output_file_awards(  output_dir, 
-                                        event_num, 
-                                        output_list, 
-                                        awardsRelayNames,
-                                        3 ) 
-
-    return num_results_files_generated + num_awards_files_generated
+        yield from render_awards( event_page, 
+                                  awardsRelayNames,
+                                  3 ) 
 
 
 #####################################################################################
 ## Given an array of RESULTS lines PER EVENT, generate the output file for this event
 #####################################################################################
-def create_output_file_results( output_dir: str, 
-                                event_num: int, 
-                                output_list: list, 
-                                display_relay_swimmer_names: bool,
-                                num_results_to_display: int ) -> int:
-    """ Generate the filename and open the next file """
+def render_results( event_page: sst_records.EventPage, 
+                    display_relay_swimmer_names: bool,
+                    num_results_to_display: int ):
+    """ Generate the filename and text of the file """
     
-    num_files_generated = 0
+    event_num = event_page.event_num
     num_results_generated = 0
     output_str = ""
 
     ## Ignore the case where we get event0 heat0
     if event_num == 0:
-        return 0
+        return
     
-    logging.info(f"RESULTS: e: {event_num} create_output_file_results")
+    logging.info(f"RESULTS: e: {event_num} render_results")
 
     ## Loop through list in reverse order
     #for num in range( num_events-1, -1, -1):
-    for output_tuple in output_list:
-        row_type = output_tuple[0]
-        row_text = output_tuple[1]
+    for row in event_page.rows:
+        row_type = row.row_type
 
-        logging.info(f"RESULTS: e: {event_num} id: {row_type} t: {row_text}")
+        logging.info(f"RESULTS: e: {event_num} id: {row_type} t: {row}")
 
         ## Save off the meet name, which somes at the end of the procesing as we are looping in reverse order
         if row_type == 'H4':
-            output_str += row_text + '\n'
+            output_str += row.line + '\n'
             #output_str += '\n'
         elif row_type == 'H6':
             output_str += g_unofficial_results + '\n'
-            output_str += row_text + '\n'
+            output_str += row.line + '\n'
         elif row_type == 'PLACE':
-            output_str += row_text + '\n'
+            output_str += get_place_text( event_page, row ) + '\n'
             num_results_generated += 1
         elif row_type == 'NAME' and display_relay_swimmer_names:
-            output_str += row_text + '\n'
+            output_str += row.line + '\n'
 
         if num_results_generated >= num_results_to_display:
             break;
 
     output_file_name =  f"{g_file_name_prefix}{event_num:0>2}_{g_file_name_suffix}.txt"
-    sst_common.write_output_file( output_dir, output_file_name, output_str )
-    num_files_generated += 1
-
-    return num_files_generated
+    yield ( output_file_name, output_str )
 
 #####################################################################################
 ## Given an array of RESULTS lines PER EVENT, generate the output file for this event
 ## for AWARDS. Only top three and display relay names
 #####################################################################################
-def create_output_file_awards(  output_dir: str, 
-                                event_num: int, 
-                                output_list: list, 
-                                display_relay_swimmer_names: bool,
-                                num_results_to_display: int  ) -> int:
-    """ Generate the filename and open the next file """
+def render_awards( event_page: sst_records.EventPage, 
+                    display_relay_swimmer_names: bool,
+                    num_results_to_display: int ):
+    """ Generate the filename and text of the file """
     
-    num_files_generated = 0
+    event_num = event_page.event_num
     num_results_generated = 0
     output_str = ""
 
@@ -459,67 +541,82 @@ def create_output_file_awards(  output_dir: str,
 
     ## Ignore the case where we get event0 heat0
     if event_num == 0:
-        return 0
+        return
     
-    logging.info(f"AWARDS: e: {event_num} create_output_file_awards")
+    logging.info(f"AWARDS: e: {event_num} render_awards")
 
     ## Loop through list in reverse order
     #for num in range( num_events-1, -1, -1):
-    for output_tuple in output_list:
-        row_type = output_tuple[0]
-        row_text = output_tuple[1]
+    for row in event_page.rows:
+        row_type = row.row_type
 
-        logging.info(f"AWARDS: e: {event_num} id: {row_type} t: {row_text}")
+        logging.info(f"AWARDS: e: {event_num} id: {row_type} t: {row}")
 
         ## Save off the meet name, which somes at the end of the procesing as we are looping in reverse order
         if row_type == 'H4':
             ## Awards are top justified. Start text below logo
             # output_str += '\n' + '\n'
-            output_str += row_text + '\n'
+            output_str += row.line + '\n'
         elif row_type == 'H6':
-            place_header_list = re_results_header.findall(row_text)
+            place_header_list = re_results_header.findall(row.line)
             if place_header_list:
                # placeline_header   = str(place_header_list[0][0]).strip()
                 placeline_header   = str(place_header_list[0][0])
                 output_str += placeline_header + '\n'
             else:
-                output_str += row_text + '\n'
+                output_str += row.line + '\n'
 
         elif row_type == 'PLACE':
             
             ## Ignore non-scoring entries (i.e. only two non-exhibition relays in event)
-            if row_text.startswith(" --- "):
+            if row.relay is not None and row.place == '---':
                 break;
             ## Stop if we hit our top three winners, plus RELAY names
             if num_results_generated >= num_results_to_display:
                 break;
 
-            ## Lets try to remvoe the POINTS of the PLACE since its always the first XX place winners
-            re_results_place = re.compile('^(.*) (\d){1,2}$')
-            place_line_list = re_results_place.findall(row_text)
-
-            if place_line_list:
-                #placeline_place   = str(place_line_list[0][0]).strip()
-                #placeline_points  = str(place_line_list[0][1]).strip()
-                placeline_place   = str(place_line_list[0][0])
-                placeline_points  = str(place_line_list[0][1])
-                logging.debug(f"PLACE: 1: {placeline_place} 2: {placeline_points}")
-                output_str += placeline_place + '\n'
-            else:
-                output_str += row_text + '\n'
+            ## Leave off the POINTS of the PLACE since its always the first XX place winners
+            output_str += get_place_text( event_page, row, with_points=False ) + '\n'
             num_results_generated += 1
        # elif row_type == 'NAME':
        #     output_str += row_text + '\n'
         elif row_type == 'NAME' and display_relay_swimmer_names:
-            output_str += row_text + '\n'
+            output_str += row.line + '\n'
 
     ## One more blank line to keep last line off bottom of screen
     output_str += '\n'
     output_file_name =  f"{g_file_name_prefix}{event_num:0>2}_{g_file_name_awards}.txt"
-    sst_common.write_output_file( output_dir, output_file_name, output_str )
-    num_files_generated += 1
+    yield ( output_file_name, output_str )
 
-    return num_files_generated
+
+#####################################################################################
+## Format one place line of an event page, in the layout its event and the page's
+## short/long school options call for.  The change in time is only worked out here,
+## for the lines that are written
+## 1  Last, First               SR Seton                        1:02.35   -00.41   16
+#####################################################################################
+def get_place_text( event_page: sst_records.EventPage, result_row: sst_records.ResultRow, with_points: bool = True ) -> str:
+    q = event_page.quote
+
+    if result_row.diving:
+        changeInTime = computeDivingSeedFinalTimeDiff( result_row.seed, result_row.final )
+    else:
+        changeInTime = computeSeedFinalTimeDiff( result_row.seed, result_row.final )
+
+    if with_points or not ( result_row.points.isdigit() and len(result_row.points) <= 2 ):
+        points_str = f"{q}{result_row.points:>4}{q}"
+    else:
+        ## Awards leave off the points (the first places always score), but not the spaces in front of them
+        points_str = " " * ( 3 - len(result_row.points) )
+
+    if result_row.relay is None:
+        if event_page.shorten_school_names_individual:
+            return f"{q}{result_row.place:>3}{q} {q}{result_row.name:<25}{q} {q}{result_row.school:<4}{q} {q}{result_row.grade:>2}{q} {q}{result_row.final:>8}{q} {q}{changeInTime:>8}{q} {points_str}"
+        return f"{q}{result_row.place:>3}{q} {q}{result_row.name:<25}{q} {q}{result_row.grade:>2}{q} {q}{result_row.school:<25}{q} {q}{result_row.final:>8}{q} {q}{changeInTime:>8}{q} {points_str}"
+
+    if event_page.shorten_school_names_relays:
+        return f" {q}{result_row.place:>3}{q} {q}{result_row.school:<25}{q} {q}{result_row.relay}{q} {q}{result_row.seed:>8}{q} {q}{result_row.final:>8}{q} {q}{changeInTime:>8}{q} {points_str}"
+    return f" {q}{result_row.place:>3}{q} {q}{result_row.school:<25}{q} {q}{result_row.relay}{q} {q}{result_row.final:>8}{q} {q}{changeInTime:>8}{q} {points_str}"
 
 
 def get_ordinal( num: int) -> str:
@@ -552,9 +649,9 @@ def generate_empty_results( output_dir:str, awards: bool ) -> int:
     num_empty_files_created = 0
     ## Allow for commenting out any type of event quickly during a meet
     empty_event_list = []
-    empty_event_list += sst_common.event_num_individual
-    empty_event_list += sst_common.event_num_relay   
-    empty_event_list += sst_common.event_num_diving 
+    empty_event_list += sst_common.meet_state.event_num_individual
+    empty_event_list += sst_common.meet_state.event_num_relay   
+    empty_event_list += sst_common.meet_state.event_num_diving 
 
     suffix = g_file_name_awards if awards else g_file_name_suffix
 
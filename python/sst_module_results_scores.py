@@ -2,6 +2,9 @@ import logging
 import re
 
 import sst_module_common as sst_common
+import sst_module_line_classifier as sst_line_classifier
+import sst_module_pipeline as sst_pipeline
+import sst_module_parse_coverage as sst_parse_coverage
 
 
 #####################################################################################
@@ -33,124 +36,159 @@ def process_champsionship_results_score( meet_report_filename: str,
                                         quote_output: bool,
                                         numresults: int ):
 
-
-    num_header_lines = 3
-    found_header_line = 0
-    output_list = []
     num_files_generated = 0
-    ## Quote output for debuggin
-    q = "'" if quote_output else ""
-    gender = ""
-    score_header = "Place   School                   Points"
-    high_event_num = 0
-    start_scoring = False
-    need_header_h5 = True
-
-    #1. St. Paul VI Catholic HS          419       2. Seton Swimming                  384.5
-    #3. Seton Swimming                 199.5       4. Bishop Ireton Swim and Dive       145
-    #5. Saint John Paul the Great        133       6. Benedictine College Prep        123.5
-    #1. Bishop O'Connell              410.25       2. St. Paul VI High School        361.25
-
-    #re_score_result  = re.compile('^(\d{1,2})\.\s+([A-z\' \.\-]{32})\s+(\d+)\s*(\d{1,2})?\.?\s*([A-z\' \.\-]{32})?\s*(\d+)?')
-    re_score_result  = re.compile('^(\d{1,2})\.\s*([A-z\' \.\-]{32})\s*([0-9.]+)?\s*(\d{1,2})?\.\s*([A-z\' \.\-]{32})?\s*([0-9.]+)?')
+    scores_parser = ResultsScoresParser( mm_license_name )
 
     #####################################################################################
     ## RESULTS_SCORES_CHAMP: Loop through each line of the input file
     #####################################################################################
-    with open(meet_report_filename, "r") as meet_report_file:
-        for line in meet_report_file:
-
-            #####################################################################################
-            ## RESULTS_SCORES_CHAMP: Remove the extra newline at end of line
-            #####################################################################################
-            line = line.strip()
-
-            #####################################################################################
-            ## RESULTS_SCORES_CHAMP: Ignore all the blank lines             
-            #####################################################################################
-            if line == '\n' or line == '':
-                continue
-
-            #####################################################################################
-            ## Meet Manager license name
-            ## We have one event per page, so this starts the next event
-            #####################################################################################
-            if re.search("^%s" % mm_license_name, line):
-                found_header_line = 1
-                
-                ## Reset and start processing the next event
-                output_list = []
-                output_list.append( ('H1', line ))
-                continue
-
-            #####################################################################################
-            ## if the previous line was the first header (found_header_line=1)
-            ## then ignore the next two lines which are also part of the header
-            #####################################################################################
-            if 0 < found_header_line < num_header_lines:
-                found_header_line += 1
-                if found_header_line == 2:
-                    line2_list = re.findall('^(.*?) - (\d+/\d+/\d+)',line )
-                    meet_name = line2_list[0][0].strip()
-                    meet_date = line2_list[0][1].strip()
-                    output_list.append( ('H2', meet_name ))
-                elif found_header_line == 3:
-                    output_list.append( ('H3', line ))
-
-                continue
-
-            if line.lower().startswith(("event")):
-
-                event_num, event_str = sst_common.get_event_num_from_eventline( line )
-                if event_num < 100:
-                    high_event_num = event_num
-
-            if line.startswith("Scores - "):
-                if not start_scoring:
-                    output_list.append( ('H5', f"Scores Through Event {high_event_num}" ))
-
-                start_scoring = True
-                score_line_list = line.split('-')
-                gender = score_line_list[1].strip()
-
-                ## Add the header above the indivial team scores
-                ## Gender. Make sure its upper case so it stands out
-                output_list.append( ('H4', gender.upper() ))
-
-            if start_scoring:
-                score_line = re_score_result.findall(line)
-                if score_line:
-                    place1 = score_line[0][0].strip()
-                    team1  = score_line[0][1].strip()
-                    pnts1  = score_line[0][2].strip()
-                    place2 = score_line[0][3].strip()
-                    team2  = score_line[0][4].strip()
-                    pnts2  = score_line[0][5].strip()
-
-                    if score_line:
-                        output_str = f"{place1:>2}. {team1:<30} {pnts1:>6}"
-                        output_list.append( (f"SCORE_{gender}", output_str ))
-
-                        if len(place2) > 0:
-                            output_str = f"{place2:>2}. {team2:<30} {pnts2:>6}"
-                            output_list.append( (f"SCORE_{gender}", output_str ))
-
-                            logging.debug(f"RE MATCH: {place2} {team2} {pnts2}")
-
-    create_output_result_scores_champ( output_dir, output_list, numresults )
+    for line in sst_parse_coverage.get_counted_lines( sst_pipeline.read_lines( meet_report_filename ), 'results_scores' ):
+
+        #####################################################################################
+        ## RESULTS_SCORES_CHAMP: Remove the extra newline at end of line
+        #####################################################################################
+        line = line.strip()
+
+        #####################################################################################
+        ## RESULTS_SCORES_CHAMP: Ignore all the blank lines             
+        #####################################################################################
+        if line == '\n' or line == '':
+            continue
+
+        scores_parser.parse_line( line )
+
+    create_output_result_scores_champ( output_dir, scores_parser.output_list, numresults )
     return num_files_generated
 
 
+#####################################################################################
+## RESULTS_SCORES_CHAMP: Parser for the scores on a results report, one stripped
+## non blank line at a time.  The results parser feeds it the lines of its own
+## pass over the report, already split into page starts, header lines, event lines
+## and the rest, so the report is only read and scanned once.
+## output_list holds the scores page when the report is done
+#####################################################################################
+
+#1. St. Paul VI Catholic HS          419       2. Seton Swimming                  384.5
+#3. Seton Swimming                 199.5       4. Bishop Ireton Swim and Dive       145
+#5. Saint John Paul the Great        133       6. Benedictine College Prep        123.5
+#1. Bishop O'Connell              410.25       2. St. Paul VI High School        361.25
+
+#re_score_result  = re.compile('^(\d{1,2})\.\s+([A-z\' \.\-]{32})\s+(\d+)\s*(\d{1,2})?\.?\s*([A-z\' \.\-]{32})?\s*(\d+)?')
+re_score_result  = re.compile('^(\d{1,2})\.\s*([A-z\' \.\-]{32})\s*([0-9.]+)?\s*(\d{1,2})?\.\s*([A-z\' \.\-]{32})?\s*([0-9.]+)?')
+
+class ResultsScoresParser:
+    num_header_lines = 3
+
+    def __init__(self, mm_license_name: str):
+        self.mm_license_name = mm_license_name
+        self.line_classifier = sst_parse_coverage.get_timed_classifier( sst_line_classifier.LineClassifier( mm_license_name ), 'results_scores.line_classifier' )
+        ## --parsecoverage times and counts the pattern (sst_parse_coverage)
+        self.re_score_result = sst_parse_coverage.get_timed_pattern( re_score_result, 'results_scores.re_score_result' )
+        self.found_header_line = 0
+        self.output_list = []
+        self.gender = ""
+        self.high_event_num = 0
+        self.start_scoring = False
+
+    #####################################################################################
+    ## Any line.  Used when reading the report on its own
+    #####################################################################################
+    def parse_line(self, line: str):
+
+        line_kind = self.line_classifier.classify( line )
+
+        #####################################################################################
+        ## Meet Manager license name
+        ## We have one event per page, so this starts the next event
+        #####################################################################################
+        if line_kind == sst_line_classifier.LINE_LICENSE:
+            self.found_header_line = 1
+            self.start_page( line )
+            return
+
+        #####################################################################################
+        ## if the previous line was the first header (found_header_line=1)
+        ## then ignore the next two lines which are also part of the header
+        #####################################################################################
+        if 0 < self.found_header_line < self.num_header_lines:
+            self.found_header_line += 1
+            self.header_line( self.found_header_line, line )
+            return
+
+        if line_kind == sst_line_classifier.LINE_EVENT:
+            event_num, event_str = sst_common.get_event_num_from_eventline( line )
+            self.event_line( event_num )
+
+        self.score_line( line )
+
+    #####################################################################################
+    ## Lines the results parser has already classified
+    #####################################################################################
+    def start_page(self, line: str):
+        ## Reset and start processing the next event
+        self.output_list = []
+        self.output_list.append( ('H1', line ))
+
+    def header_line(self, header_line_num: int, line: str):
+        if header_line_num == 2:
+            line2_list = re.findall('^(.*?) - (\d+/\d+/\d+)',line )
+            meet_name = line2_list[0][0].strip()
+            meet_date = line2_list[0][1].strip()
+            self.output_list.append( ('H2', meet_name ))
+        elif header_line_num == 3:
+            self.output_list.append( ('H3', line ))
+
+    def event_line(self, event_num: int):
+        if event_num < 100:
+            self.high_event_num = event_num
+
+    def score_line(self, line: str):
+        if line.startswith("Scores - "):
+            if not self.start_scoring:
+                self.output_list.append( ('H5', f"Scores Through Event {self.high_event_num}" ))
+
+            self.start_scoring = True
+            score_line_list = line.split('-')
+            self.gender = score_line_list[1].strip()
+
+            ## Add the header above the indivial team scores
+            ## Gender. Make sure its upper case so it stands out
+            self.output_list.append( ('H4', self.gender.upper() ))
+
+        if self.start_scoring:
+            score_line = self.re_score_result.findall(line)
+            if score_line:
+                place1 = score_line[0][0].strip()
+                team1  = score_line[0][1].strip()
+                pnts1  = score_line[0][2].strip()
+                place2 = score_line[0][3].strip()
+                team2  = score_line[0][4].strip()
+                pnts2  = score_line[0][5].strip()
+
+                output_str = f"{place1:>2}. {team1:<30} {pnts1:>6}"
+                self.output_list.append( (f"SCORE_{self.gender}", output_str ))
+
+                if len(place2) > 0:
+                    output_str = f"{place2:>2}. {team2:<30} {pnts2:>6}"
+                    self.output_list.append( (f"SCORE_{self.gender}", output_str ))
+
+                    logging.debug(f"RE MATCH: {place2} {team2} {pnts2}")
+
+
 #####################################################################################
 ## SCORES_CHAMP Report
 ## Wrapper to generate mens and womens scores both on same page and on separate pages.
 ## Too many teams won't find combined on single page so generate both for the 
 ## webcast crew too choose
 #####################################################################################
+@sst_common.render_timer
 def create_output_result_scores_champ(output_dir_root: str, 
                                        output_list: list,
                                        num_results_to_display: int ) -> int:
 
+    sst_common.save_parsed_page( 'results_scores', None, output_list )
+
     ## Sepearate files for mens/womens scores
     num_by_gender = create_output_result_scores_champ_by_gender( output_dir_root, output_list, num_results_to_display )
 
@@ -1,6 +1,9 @@
 import logging
+import os
 import sys
+import threading
 import sst_module_common as sst_common
+import sst_module_pipeline as sst_pipeline
 import datetime
 
 #####################################################################################
@@ -12,65 +15,103 @@ import datetime
 
 results_full_name_report_len  = 22
 
+## The watcher daemon processes many reports in one process, so only re-read a school
+## report when it changes.  full path -> ((size, mtime), school_name_list)
+## The cached lists are never modified so worker threads can share them
+school_report_cache = {}
+school_report_cache_lock = threading.Lock()
+
+#####################################################################################
+## Load the school report only if it is not already loaded or has changed on disk
+#####################################################################################
+def load_schools_report( school_report_filename: str ) -> bool:
+    """ Returns True if the school report was (re)read, False if the cached list was used """
+
+    report_path = os.path.abspath( school_report_filename )
+    try:
+        stat = os.stat( school_report_filename )
+        report_key = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        report_key = None
+
+    with school_report_cache_lock:
+        cached = school_report_cache.get( report_path )
+
+    if report_key is not None and cached is not None and cached[0] == report_key:
+        logging.debug(f"load_schools_report: using cached school list for {school_report_filename}")
+        sst_common.meet_state.school_name_list = cached[1]
+        return False
+
+    process_schools_report( school_report_filename )
+    if report_key is not None:
+        with school_report_cache_lock:
+            school_report_cache[report_path] = (report_key, sst_common.meet_state.school_name_list)
+    return True
+
 #####################################################################################
 ## Readin in school report
 #####################################################################################
 def process_schools_report( school_report_filename: str ):
 
     line_num=0
+    school_name_list = []
     try:
-        with open(school_report_filename, "r") as school_report_file:
-            for in_line in school_report_file:
-
-                line = in_line.strip()
-
-                ## The first three lines are headers so  skip those
-                ## Ignore blank lines
-                if len(line) > 0 and line_num >= 3:
-
-                    logging.debug( f"Line {line_num}: '{line}'")
-
-                    ## The format of the schhol report is
-                    # 7    SST         Seton Swimming                              Seton
-                    #0123456789012345678901234567890123456789012345678901234567890123456789
-                    school_abbr_full = line[5:16].strip()
-                    school_name_full = line[17:60].strip()
-                    school_name_short = line[61:].strip()
-                    school_lsc = ""
-
-                    ## some schools have USA swimming region attached to it, ie.e "BW-VA".
-                    ## (Remove the -VA if it exists
-                    if len(school_abbr_full) > 3 and school_abbr_full[-3] == "-":
-                        school_lsc = school_abbr_full[-2:]
-                        school_abbr_short = school_abbr_full[:-3]
-                    else:
-                        school_abbr_short = school_abbr_full
-                        
-                    logging.debug(f"'{school_abbr_full}' '{school_abbr_short}' '{school_name_full}' '{school_name_short}'")
-
-                    ## Create a dictionary
-                    school_name_dict = { "school_abbr_full":  school_abbr_full,   # BW-PV
-                                        "school_abbr_short": school_abbr_short,   # BW
-                                        "school_name_full":  school_name_full,    # Brookewood School
-                                        "school_name_short": school_name_short,   # Brookewood 
-                                        "school_lsc": school_lsc                  # VA
-                                        }
-
-                    ## Load the school_dict array
-                    sst_common.school_name_list.append( school_name_dict )
-
-                line_num += 1
+        ## Read like the reports (sst_pipeline.read_lines): in the detected encoding, and
+        ## without accents so the names match the ones the report parsers look up
+        for in_line in sst_pipeline.read_lines( school_report_filename ):
+
+            line = in_line.strip()
+
+            ## The first three lines are headers so  skip those
+            ## Ignore blank lines
+            if len(line) > 0 and line_num >= 3:
+
+                logging.debug( f"Line {line_num}: '{line}'")
+
+                ## The format of the schhol report is
+                # 7    SST         Seton Swimming                              Seton
+                #0123456789012345678901234567890123456789012345678901234567890123456789
+                school_abbr_full = line[5:16].strip()
+                school_name_full = line[17:60].strip()
+                school_name_short = line[61:].strip()
+                school_lsc = ""
+
+                ## some schools have USA swimming region attached to it, ie.e "BW-VA".
+                ## (Remove the -VA if it exists
+                if len(school_abbr_full) > 3 and school_abbr_full[-3] == "-":
+                    school_lsc = school_abbr_full[-2:]
+                    school_abbr_short = school_abbr_full[:-3]
+                else:
+                    school_abbr_short = school_abbr_full
+                    
+                logging.debug(f"'{school_abbr_full}' '{school_abbr_short}' '{school_name_full}' '{school_name_short}'")
+
+                ## Create a dictionary
+                school_name_dict = { "school_abbr_full":  school_abbr_full,   # BW-PV
+                                    "school_abbr_short": school_abbr_short,   # BW
+                                    "school_name_full":  school_name_full,    # Brookewood School
+                                    "school_name_short": school_name_short,   # Brookewood 
+                                    "school_lsc": school_lsc                  # VA
+                                    }
+
+                ## Load the school_dict array
+                school_name_list.append( school_name_dict )
+
+            line_num += 1
     except FileNotFoundError as fnfe:
         logging.error(f"Required School Report file not found: {school_report_filename}")
         sys.exit(4)
-    logging.debug(f"process_school_reports: {sst_common.school_name_list}")
+
+    ## Replace (not extend) the list so reloading a changed report doesn't leave old schools behind
+    sst_common.meet_state.school_name_list = school_name_list
+    logging.debug(f"process_school_reports: {sst_common.meet_state.school_name_list}")
 
 #####################################################################################
 ## Return a School_Dict object matching by school_full_name
 #####################################################################################
 def get_schools_dict_by_full_name( element_name_full ) -> dict:
 
-    for school_dict in sst_common.school_name_list:
+    for school_dict in sst_common.meet_state.school_name_list:
         ## Test long school names without LSC
         school_name_full = school_dict["school_name_full"]
         if school_name_full[:results_full_name_report_len] == element_name_full[:results_full_name_report_len]:
@@ -100,7 +141,7 @@ def get_schools_dict_by_full_name( element_name_full ) -> dict:
 #####################################################################################
 def get_schools_dict_by_full_abbr( element_abbr_full ) -> dict:
 
-    for school_dict in sst_common.school_name_list:
+    for school_dict in sst_common.meet_state.school_name_list:
         if school_dict["school_abbr_full"] == element_abbr_full:
             return school_dict
 
@@ -2,6 +2,8 @@ import logging
 import re
 
 import sst_module_common as sst_common
+import sst_module_line_classifier as sst_line_classifier
+import sst_module_parse_coverage as sst_parse_coverage
 
 
 #####################################################################################
@@ -19,7 +21,7 @@ import sst_module_common as sst_common
 #####################################################################################
 #####################################################################################
 
-def process_score_dualmeet( meet_report_filename: str, 
+def process_score_dualmeet( report_lines: list, 
                                  output_dir: str, 
                                  mm_license_name: str, 
                                  quote_output: bool,
@@ -36,82 +38,84 @@ def process_score_dualmeet( meet_report_filename: str,
     score_header = ""
     scores_for_gender = "" 
 
+    line_classifier = sst_line_classifier.LineClassifier( mm_license_name )
+
+    ## Search for the actual score line.
     #                      Seton Swimming  182.00    114.00  Trinity Christian School
-    re_score_result  = re.compile('^(\d{1,2})\s+([A-z\' \.]{27})\s+([A-z\' \.]{27})\s+(\d+)\s*(\d*)')
+    re_score_dual  = re.compile('^\s*([A-z\' \.]+?)\s+(\d{1,3}\.\d{2})\s+(\d{1,3}\.\d{2})\s+([A-z\' \.]+?)$')
+    re_score_gender = re.compile('^\s*(Men|Women)\s*$')
+
+    ## --parsecoverage times and counts the patterns (sst_parse_coverage)
+    line_classifier = sst_parse_coverage.get_timed_classifier( line_classifier, 'scores_dualmeet.line_classifier' )
+    re_score_dual = sst_parse_coverage.get_timed_pattern( re_score_dual, 'scores_dualmeet.re_score_dual' )
+    re_score_gender = sst_parse_coverage.get_timed_pattern( re_score_gender, 'scores_dualmeet.re_score_gender' )
 
     #####################################################################################
     ## SCORES_DUAL: Loop through each line of the input file
     #####################################################################################
-    with open(meet_report_filename, "r") as meet_report_file:
-        for line in meet_report_file:
-
-            #####################################################################################
-            ## SCORES_DUAL: Remove the extra newline at end of line
-            #####################################################################################
-            line = line.strip()
-
-            #####################################################################################
-            ## SCORES_DUAL: Ignore all the blank lines             
-            #####################################################################################
-            if line == '\n' or line == '':
-                continue
-            logging.debug(f"LINE: {line}")
-
-            #####################################################################################
-            ## Meet Manager license name
-            ## We have one event per page, so this starts the next event
-            #####################################################################################
-            if re.search("^%s" % mm_license_name, line):
-                found_header_line = 1
-                output_list.append( ('H1', line ))
-                continue
-
-            #####################################################################################
-            ## if the previous line was the first header (found_header_line=1)
-            ## then ignore the next two lines which are also part of the header
-            #####################################################################################
-            if 0 < found_header_line < num_header_lines:
-                found_header_line += 1
-                if found_header_line == 2:
-                    line2_list = re.findall('^(.*?) - (\d+/\d+/\d+)',line )
-                    meet_name = line2_list[0][0].strip()
-                    meet_date = line2_list[0][1].strip()
-                    output_list.append( ('H2', meet_name ))
-
-                elif found_header_line == 3:
-                    output_list.append( ('H3', line ))
-
-                continue
-
-            ## Determine which gener the scores are for
-            if re.search("^\s*Men\s*$", line):
-                logging.debug(f"Found Men")
-                scores_for_gender = "Men"
-                output_list.append( ('H6Men', "Men" ))
-
-            if re.search("^\s*Women\s*$", line):
-                logging.debug(f"Found Women")
-                scores_for_gender = "Women"
-                output_list.append( ('H6Women', "Women" ))
-
-            ## Search for the actual score line.
-            ## Parse out the fields, and regenerate our own line without hyteks formatting/centering
-            re_score_dual  = re.compile('^\s*([A-z\' \.]+?)\s+(\d{1,3}\.\d{2})\s+(\d{1,3}\.\d{2})\s+([A-z\' \.]+?)$')
-            score_line = re_score_dual.findall(line)
-            if score_line:
-                score_team1  = str(score_line[0][0]).strip()
-                score_score1 = str(score_line[0][1]).strip()
-                score_score2 = str(score_line[0][2]).strip()
-                score_team2  = str(score_line[0][3]).strip()
-
-                #logging.debug(f"SCORE: t1 {score_team1}: s1 {score_score1}: s2 {score_score2}: t2: {score_team2}")
-
-                #output_str = f"{q}{score_team1:>22}{q} {q}{score_score1:>5}{q} {q}{score_score2:>5}{q} {q}{score_team2:<30}{q}"
-                output_str = f"{q}{score_team1[:30]:<31}{q} {q}{score_score1:<6}{q} {q}{score_score2:<6}{q} {q}{score_team2:<30}{q}"
-                logging.debug(f"SCORE: {output_str}")
-
-                ## Add the score to the output list
-                output_list.append( (scores_for_gender, output_str ))
+    for line in sst_parse_coverage.get_counted_lines( report_lines, 'scores_dualmeet' ):
+
+        #####################################################################################
+        ## SCORES_DUAL: Remove the extra newline at end of line
+        #####################################################################################
+        line = line.strip()
+
+        #####################################################################################
+        ## SCORES_DUAL: Ignore all the blank lines             
+        #####################################################################################
+        if line == '\n' or line == '':
+            continue
+        logging.debug(f"LINE: {line}")
+
+        #####################################################################################
+        ## Meet Manager license name
+        ## We have one event per page, so this starts the next event
+        #####################################################################################
+        if line_classifier.classify( line ) == sst_line_classifier.LINE_LICENSE:
+            found_header_line = 1
+            output_list.append( ('H1', line ))
+            continue
+
+        #####################################################################################
+        ## if the previous line was the first header (found_header_line=1)
+        ## then ignore the next two lines which are also part of the header
+        #####################################################################################
+        if 0 < found_header_line < num_header_lines:
+            found_header_line += 1
+            if found_header_line == 2:
+                line2_list = re.findall('^(.*?) - (\d+/\d+/\d+)',line )
+                meet_name = line2_list[0][0].strip()
+                meet_date = line2_list[0][1].strip()
+                output_list.append( ('H2', meet_name ))
+
+            elif found_header_line == 3:
+                output_list.append( ('H3', line ))
+
+            continue
+
+        ## Determine which gener the scores are for
+        gender_match = re_score_gender.match( line )
+        if gender_match:
+            scores_for_gender = gender_match.group(1)
+            logging.debug(f"Found {scores_for_gender}")
+            output_list.append( ('H6' + scores_for_gender, scores_for_gender ))
+
+        ## Parse out the fields, and regenerate our own line without hyteks formatting/centering
+        score_line = re_score_dual.findall(line)
+        if score_line:
+            score_team1  = str(score_line[0][0]).strip()
+            score_score1 = str(score_line[0][1]).strip()
+            score_score2 = str(score_line[0][2]).strip()
+            score_team2  = str(score_line[0][3]).strip()
+
+            #logging.debug(f"SCORE: t1 {score_team1}: s1 {score_score1}: s2 {score_score2}: t2: {score_team2}")
+
+            #output_str = f"{q}{score_team1:>22}{q} {q}{score_score1:>5}{q} {q}{score_score2:>5}{q} {q}{score_team2:<30}{q}"
+            output_str = f"{q}{score_team1[:30]:<31}{q} {q}{score_score1:<6}{q} {q}{score_score2:<6}{q} {q}{score_team2:<30}{q}"
+            logging.debug(f"SCORE: {output_str}")
+
+            ## Add the score to the output list
+            output_list.append( (scores_for_gender, output_str ))
 
     num_files_generated = create_output_file_scores_dual_combined( output_dir, output_list, numresults )
     num_files_generated = create_output_file_scores_dual_by_gender( output_dir, output_list, numresults )
@@ -121,7 +125,7 @@ def process_score_dualmeet( meet_report_filename: str,
 ## SCORES_CHAMP Report
 ## This function processes a separate scores report for a championship meeet
 #####################################################################################
-def process_score_champsionship( meet_report_filename: str, 
+def process_score_champsionship( report_lines: list, 
                                  output_dir: str, 
                                  mm_license_name: str, 
                                  quote_output: bool,
@@ -138,86 +142,93 @@ def process_score_champsionship( meet_report_filename: str,
     score_header = "Place   School                   Points"
 
 
+    line_classifier = sst_line_classifier.LineClassifier( mm_license_name )
+
     # 1   Bishop O'Connell                     Bishop O'Connell                    487
     re_score_result  = re.compile('^(\d{1,2})\s+([A-z\' \.]{27})\s+([A-z\' \.]{27})\s+(\d+)\s*(\d*)')
 
+    ## --parsecoverage times and counts the patterns (sst_parse_coverage)
+    line_classifier = sst_parse_coverage.get_timed_classifier( line_classifier, 'scores_champsionship.line_classifier' )
+    re_score_result = sst_parse_coverage.get_timed_pattern( re_score_result, 'scores_champsionship.re_score_result' )
+
     #####################################################################################
     ## SCORES_CHAMP: Loop through each line of the input file
     #####################################################################################
-    with open(meet_report_filename, "r") as meet_report_file:
-        for line in meet_report_file:
-
-            #####################################################################################
-            ## SCORES_CHAMP: Remove the extra newline at end of line
-            #####################################################################################
-            line = line.strip()
-
-            #####################################################################################
-            ## SCORES_CHAMP: Ignore all the blank lines             
-            #####################################################################################
-            if line == '\n' or line == '':
-                continue
-
-            #####################################################################################
-            ## Meet Manager license name
-            ## We have one event per page, so this starts the next event
-            #####################################################################################
-            if re.search("^%s" % mm_license_name, line):
-                found_header_line = 1
+    for line in sst_parse_coverage.get_counted_lines( report_lines, 'scores_champsionship' ):
+
+        #####################################################################################
+        ## SCORES_CHAMP: Remove the extra newline at end of line
+        #####################################################################################
+        line = line.strip()
+
+        #####################################################################################
+        ## SCORES_CHAMP: Ignore all the blank lines             
+        #####################################################################################
+        if line == '\n' or line == '':
+            continue
+
+        #####################################################################################
+        ## Meet Manager license name
+        ## We have one event per page, so this starts the next event
+        #####################################################################################
+        line_kind = line_classifier.classify( line )
+        if line_kind == sst_line_classifier.LINE_LICENSE:
+            found_header_line = 1
                 
-                ## The start of the next event finished off the last event. Go write out the last event
-                if gender != "":
-                    num_files = create_output_file_scores_champ( output_dir, output_list, gender, numresults )
-                    num_files_generated += num_files
-
-                ## Reset and start processing the next event
-                output_list = []
-                output_list.append( ('H1', line ))
-                continue
-
-            #####################################################################################
-            ## if the previous line was the first header (found_header_line=1)
-            ## then ignore the next two lines which are also part of the header
-            #####################################################################################
-            if 0 < found_header_line < num_header_lines:
-                found_header_line += 1
-                if found_header_line == 2:
-                    line2_list = re.findall('^(.*?) - (\d+/\d+/\d+)',line )
-                    meet_name = line2_list[0][0].strip()
-                    meet_date = line2_list[0][1].strip()
-                    output_list.append( ('H2', meet_name ))
-                elif found_header_line == 3:
-                    output_list.append( ('H3', line ))
-
-                continue
-
-            #logging.debug(f"SCORE: line: {line}")
-            # Look for Boys/Girls Team Scores heading
-            # Girls - Team Scores
-            if " - Team Scores" in line:
-                gender, team_score = line.split(' - ')
-
-                ## Add the header above the indivial team scores
-                output_list.append( ('H4', line ))
-                output_list.append( ('H6', score_header ))
-
-            score_line = re_score_result.findall(line)
-            if score_line:
-                scoreline_place       = str(score_line[0][0]).strip()
-                scoreline_school1     = str(score_line[0][1]).strip()
-                scoreline_school2     = str(score_line[0][2]).strip()
-                scoreline_points      = str(score_line[0][3]).strip()
-
-                ## A decimal point comes over a space.  Convert "123 50' to '123.50' if present"
-                scoreline_points2     = str(score_line[0][4]).strip()
-                if scoreline_points2:
-                    scoreline_points += "." + scoreline_points2
-
-                #logging.debug( f"*** SCORE: p: {scoreline_place} s1: {scoreline_school1} s2: {scoreline_school2} p: {scoreline_points}" )
-                output_str = f"{q}{scoreline_place:>2}{q} {q}{scoreline_school1:<27}{q} {q}{scoreline_points:>8}{q}"
-                output_list.append( ('SCORE', output_str ))
-
-                logging.debug( f"SCORE: output: {output_str}" )
+            ## The start of the next event finished off the last event. Go write out the last event
+            if gender != "":
+                num_files = create_output_file_scores_champ( output_dir, output_list, gender, numresults )
+                num_files_generated += num_files
+
+            ## Reset and start processing the next event
+            output_list = []
+            output_list.append( ('H1', line ))
+            continue
+
+        #####################################################################################
+        ## if the previous line was the first header (found_header_line=1)
+        ## then ignore the next two lines which are also part of the header
+        #####################################################################################
+        if 0 < found_header_line < num_header_lines:
+            found_header_line += 1
+            if found_header_line == 2:
+                line2_list = re.findall('^(.*?) - (\d+/\d+/\d+)',line )
+                meet_name = line2_list[0][0].strip()
+                meet_date = line2_list[0][1].strip()
+                output_list.append( ('H2', meet_name ))
+            elif found_header_line == 3:
+                output_list.append( ('H3', line ))
+
+            continue
+
+        #logging.debug(f"SCORE: line: {line}")
+        # Look for Boys/Girls Team Scores heading
+        # Girls - Team Scores
+        if " - Team Scores" in line:
+            gender, team_score = line.split(' - ')
+
+            ## Add the header above the indivial team scores
+            output_list.append( ('H4', line ))
+            output_list.append( ('H6', score_header ))
+
+        ## Score lines start with the place, like a lane line
+        score_line = re_score_result.findall(line) if line_kind == sst_line_classifier.LINE_LANE else None
+        if score_line:
+            scoreline_place       = str(score_line[0][0]).strip()
+            scoreline_school1     = str(score_line[0][1]).strip()
+            scoreline_school2     = str(score_line[0][2]).strip()
+            scoreline_points      = str(score_line[0][3]).strip()
+
+            ## A decimal point comes over a space.  Convert "123 50' to '123.50' if present"
+            scoreline_points2     = str(score_line[0][4]).strip()
+            if scoreline_points2:
+                scoreline_points += "." + scoreline_points2
+
+            #logging.debug( f"*** SCORE: p: {scoreline_place} s1: {scoreline_school1} s2: {scoreline_school2} p: {scoreline_points}" )
+            output_str = f"{q}{scoreline_place:>2}{q} {q}{scoreline_school1:<27}{q} {q}{scoreline_points:>8}{q}"
+            output_list.append( ('SCORE', output_str ))
+
+            logging.debug( f"SCORE: output: {output_str}" )
 
     create_output_file_scores_champ( output_dir, output_list, gender, numresults )
     return num_files_generated
@@ -226,6 +237,7 @@ def process_score_champsionship( meet_report_filename: str,
 ####################################################################################
 ## Given an array of DUAL meet scores, generate both boys and girls as two different files
 # #####################################################################################
+@sst_common.render_timer
 def create_output_file_scores_dual_by_gender( output_dir_root: str, 
                                     output_list: list,
                                     num_results_to_display: int ) -> int:
@@ -273,6 +285,7 @@ def create_output_file_scores_dual_by_gender( output_dir_root: str,
 ####################################################################################
 ## Given an array of DUAL meet scores, generate both boys and girls on same file
 #####################################################################################
+@sst_common.render_timer
 def create_output_file_scores_dual_combined( output_dir_root: str, 
                                     output_list: list,
                                     num_results_to_display: int ) -> int:
@@ -317,6 +330,7 @@ def create_output_file_scores_dual_combined( output_dir_root: str,
 ####################################################################################
 ## Given an array of PROGRAM lines PER HEAT, generate the output file
 #####################################################################################
+@sst_common.render_timer
 def create_output_file_scores_champ( output_dir_root: str, 
                                output_list: list,
                                gender_of_scores: str,
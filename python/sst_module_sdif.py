@@ -0,0 +1,352 @@
+import collections
+import os
+import re
+
+import sst_module_common as sst_common
+import sst_module_pipeline as sst_pipeline
+import sst_module_program as sst_program
+import sst_module_records as sst_records
+import sst_module_results as sst_results
+import sst_module_schools as sst_module_schools
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ S D I F                                ##########
+##########                                                                 ##########
+##########    Hy-Tek SDIF (.cl2) exports from Meet Manager.  Fixed width   ##########
+##########    160 column records with the full names, the team codes and   ##########
+##########    the relay swimmers one to a record, read into the same       ##########
+##########    event and heat pages the text report parsers make            ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+sdif_file_extensions = ( '.cl2', '.sd3', '.sdif' )
+sdif_record_len = 160
+
+#####################################################################################
+## The fields used, (start column, length) as numbered in the SDIF v3 specification
+##   A0 file description, B1 meet, C1 team, D0 individual swim, E0 relay swim,
+##   F0 relay swimmer (after its E0).  The other records (G0 splits, ...) are skipped
+#####################################################################################
+sdif_fields = {
+    'A0': { 'organization': (3, 1), 'version': (4, 8), 'file_code': (12, 2) },
+    'B1': { 'meet_name': (12, 30), 'meet_start': (122, 8), 'course': (150, 1) },
+    'C1': { 'team_code': (12, 6), 'team_name': (18, 30), 'team_abbr': (48, 16) },
+    'D0': { 'name': (12, 28), 'grade': (64, 2), 'event_sex': (67, 1), 'distance': (68, 4), 'stroke': (72, 1),
+            'event_num': (73, 4), 'seed': (89, 8), 'finals': (116, 8), 'finals_course': (124, 1),
+            'heat': (129, 2), 'lane': (131, 2), 'place': (136, 3), 'points': (139, 4) },
+    'E0': { 'relay': (12, 1), 'team_code': (13, 6), 'event_sex': (21, 1), 'distance': (22, 4), 'stroke': (26, 1),
+            'event_num': (27, 4), 'seed': (46, 8), 'finals': (73, 8), 'finals_course': (81, 1),
+            'heat': (86, 2), 'lane': (88, 2), 'place': (93, 3), 'points': (96, 4) },
+    'F0': { 'team_code': (16, 6), 'relay': (22, 1), 'name': (23, 28), 'grade': (72, 2), 'finals_order': (77, 1) },
+}
+
+## SDIF code tables: STROKE 012, SEX 010, COURSE 013
+stroke_names = { '1': "Freestyle", '2': "Backstroke", '3': "Breaststroke", '4': "Butterfly", '5': "IM",
+                 '6': "Freestyle Relay", '7': "Medley Relay" }
+event_sex_names = { 'M': "Boys", 'F': "Girls", 'X': "Mixed" }
+course_names = { 'Y': "Yard", '2': "Yard", 'S': "Meter", '1': "Meter", 'L': "LC Meter", '3': "LC Meter" }
+
+## A results file has A0 file code 02.  Registrations (01) are the entries of a program
+sdif_results_file_code = "02"
+
+
+def get_fields( record: str, record_code: str ) -> dict:
+    return { field_name: record[start-1:start-1+length].strip() for field_name, (start, length) in sdif_fields[record_code].items() }
+
+
+#####################################################################################
+## is_sdif_report
+## An SDIF file by its extension, or a report whose first record is an A0 record:
+## A0, the organization code (1 USA Swimming ... 9 Other) and the SDIF version
+#####################################################################################
+re_sdif_file_description = re.compile( rb'^(\xef\xbb\xbf)?A0[0-9 ]V3' )
+
+def is_sdif_head( report_head: bytes ) -> bool:
+    return re_sdif_file_description.match( report_head ) is not None
+
+
+def is_sdif_report( report_filename: str ) -> bool:
+
+    if os.path.splitext( report_filename )[1].lower() in sdif_file_extensions:
+        return True
+    with open( report_filename, "rb" ) as report_file:
+        return is_sdif_head( report_file.read( 16 ) )
+
+
+#####################################################################################
+## SdifSwim
+## A D0 (individual) or E0 (relay) record.  legs are the F0 records of a relay
+#####################################################################################
+class SdifSwim:
+    __slots__ = ( 'fields', 'team_code', 'relay', 'legs' )
+
+    def __init__(self, fields: dict, team_code: str, relay):
+        self.fields = fields
+        self.team_code = team_code
+        self.relay = relay
+        self.legs = []
+
+    def get_int(self, field_name: str) -> int:
+        value = self.fields[field_name]
+        return int( value ) if value.isdigit() else 0
+
+    def __repr__(self):
+        return f"SdifSwim(event {self.fields['event_num']}, {self.fields.get('name', self.team_code)!r}, relay {self.relay!r})"
+
+
+#####################################################################################
+## SdifMeet
+## Every record read, in file order: the meet, its teams (team code -> C1 fields)
+## and the swims of each event
+#####################################################################################
+class SdifMeet:
+    def __init__(self):
+        self.file_code = ""
+        self.meet_name = ""
+        self.meet_start = ""
+        self.course = "Y"
+        self.teams = {}
+        self.event_swims = {}
+
+    def get_report_kind(self) -> str:
+        """ 'results' when the swims have finals times or places, else 'program' """
+
+        if self.file_code == sdif_results_file_code:
+            return 'results'
+        for swims in self.event_swims.values():
+            if any( swim.fields['finals'] or swim.get_int( 'place' ) for swim in swims ):
+                return 'results'
+        return 'program'
+
+    def get_meet_date(self) -> str:
+        """ MMDDYYYY as M/D/YYYY """
+
+        meet_start = self.meet_start
+        if len( meet_start ) != 8 or not meet_start.isdigit():
+            return meet_start
+        return f"{int(meet_start[:2])}/{int(meet_start[2:4])}/{meet_start[4:]}"
+
+    def get_event_name(self, event_num: int) -> str:
+        """ Like the event line of a Meet Manager report: Boys 200 Yard Medley Relay """
+
+        fields = self.event_swims[event_num][0].fields
+        sex_name = event_sex_names.get( fields['event_sex'], fields['event_sex'] )
+        ## SDIF has no stroke for diving.  The distance is the board: Boys 1 mtr Diving
+        if event_num in sst_common.meet_state.event_num_diving or fields['stroke'] not in stroke_names:
+            return f"{sex_name} {fields['distance']} mtr Diving" if fields['distance'] else f"{sex_name} Diving"
+        course_name = course_names.get( fields['finals_course'] or self.course, "Yard" )
+        return f"{sex_name} {fields['distance']} {course_name} {stroke_names[fields['stroke']]}"
+
+
+#####################################################################################
+## read_sdif_meet
+## One pass over the records.  The lines are read like a text report's (the encoding
+## detected and the accents removed), or are the report_lines already being read
+#####################################################################################
+def read_sdif_meet( sdif_filename: str, encoding: str = "auto", report_lines = None ) -> SdifMeet:
+
+    sdif_meet = SdifMeet()
+    team_code = ""
+    relay_swim = None
+    if report_lines is None:
+        report_lines = sst_pipeline.read_lines( sdif_filename, encoding )
+    for line in report_lines:
+        record = line.rstrip( "\r\n" ).ljust( sdif_record_len )
+        record_code = record[:2]
+
+        if record_code == 'D0' or record_code == 'E0':
+            fields = get_fields( record, record_code )
+            if not fields['event_num'].isdigit():
+                continue
+            if record_code == 'D0':
+                swim = SdifSwim( fields, team_code, None )
+                relay_swim = None
+            else:
+                swim = SdifSwim( fields, fields['team_code'] or team_code, fields['relay'] )
+                relay_swim = swim
+            sdif_meet.event_swims.setdefault( int( fields['event_num'] ), [] ).append( swim )
+        elif record_code == 'F0':
+            if relay_swim is not None:
+                relay_swim.legs.append( get_fields( record, record_code ) )
+        elif record_code == 'C1':
+            fields = get_fields( record, record_code )
+            team_code = fields['team_code']
+            sdif_meet.teams[team_code] = fields
+        elif record_code == 'B1':
+            fields = get_fields( record, record_code )
+            sdif_meet.meet_name = fields['meet_name']
+            sdif_meet.meet_start = fields['meet_start']
+            sdif_meet.course = fields['course'] or sdif_meet.course
+        elif record_code == 'A0':
+            sdif_meet.file_code = get_fields( record, record_code )['file_code']
+
+    return sdif_meet
+
+
+#####################################################################################
+## get_school_names
+## (abbreviation, short name, full name) of a team, from schools.txt by its team code
+## (LSC and team abbreviation) or its full name.  A team not in schools.txt keeps the
+## names of its C1 record
+#####################################################################################
+def get_school_names( sdif_meet: SdifMeet, team_code: str ) -> tuple:
+
+    team = sdif_meet.teams.get( team_code, { 'team_code': team_code, 'team_name': team_code, 'team_abbr': "" } )
+    team_abbr = team_code[2:].strip() or team_code
+    for school_dict in sst_common.meet_state.school_name_list:
+        if school_dict['school_abbr_short'] == team_abbr or school_dict['school_abbr_full'] == team_code:
+            return school_dict['school_abbr_short'], school_dict['school_name_short'], school_dict['school_name_full']
+    try:
+        school_dict = sst_module_schools.get_schools_dict_by_full_name( team['team_name'] )
+        return school_dict['school_abbr_short'], school_dict['school_name_short'], school_dict['school_name_full']
+    except Exception:
+        sst_common.add_unmatched_school( team['team_name'] )
+    return team_abbr, team['team_abbr'] or team['team_name'], team['team_name']
+
+
+def get_swimmer_name( name_last_first: str, namesfirstlast: bool ) -> str:
+    return sst_common.reverse_lastname_firstname( name_last_first ) if namesfirstlast and ',' in name_last_first else name_last_first
+
+
+def get_time_secs( swim_time: str ) -> float:
+    """ 1:02.34 or X34.57 (exhibition) in seconds.  DQ, NS, ... after every time """
+
+    try:
+        minutes, colon, seconds = swim_time.lstrip( "Xx" ).rpartition( ":" )
+        return int( minutes or 0 ) * 60 + float( seconds )
+    except ValueError:
+        return float( "inf" )
+
+
+def get_points( swim: SdifSwim ) -> str:
+    """ As a text report prints them, - for none """
+
+    points = swim.fields['points']
+    try:
+        points_value = float( points )
+    except ValueError:
+        return "-"
+    if points_value <= 0 or 'DQ' in swim.fields['finals']:
+        return "-"
+    return f"{points_value:g}"
+
+
+#####################################################################################
+## get_relay_legs
+## The swimmers of a relay as the relay names line of a text report, in swim order.
+## leg_width is the columns of each swimmer, 22 in results and 18 in a program:
+##  1) Hough, Ryan SO     2) Park, Ian SO       3) Phillips, Tyler 8  4) Kim, Justin SO
+##  1) Park, Zack SO  2) Wang, Luke SO  3) Bang, Caleb 08 4) Sicks, Campbell
+## None if the relay has no F0 records
+#####################################################################################
+results_leg_width = 22
+program_leg_width = 18
+
+def get_relay_legs( swim: SdifSwim, leg_width: int ):
+
+    if not swim.legs:
+        return None
+    legs = sorted( swim.legs, key=lambda leg: leg['finals_order'] if leg['finals_order'].isdigit() else "9" )
+    leg_names = [ f"{leg_num}) {leg['name']} {leg['grade']}".strip() for leg_num, leg in enumerate( legs, 1 ) ]
+    return sst_records.RelayLegs( " ".join( leg_name.ljust( leg_width - 1 ) for leg_name in leg_names ).rstrip() )
+
+
+#####################################################################################
+## get_result_pages
+## ('results', event_num, EventPage) for each event, in event order.  The places in
+## order, then the swims without a place (DQ, exhibition) as they are in the file
+#####################################################################################
+def get_result_pages( sdif_meet: SdifMeet,
+                      shorten_school_names_relays: bool,
+                      shorten_school_names_individual: bool,
+                      namesfirstlast: bool,
+                      quote_output: bool,
+                      championshipmeet: bool ):
+
+    q = "'" if quote_output else ""
+    header_dict = sst_results.champsionship_result_header_dict if championshipmeet else sst_results.result_header_dict
+
+    for event_num in sorted( sdif_meet.event_swims ):
+        event_page = sst_records.EventPage( shorten_school_names_relays, shorten_school_names_individual, q )
+        event_page.event_num = event_num
+        event_page.add_header( 'H4', f"Event {event_num}  {sdif_meet.get_event_name( event_num )}" )
+        name_list_header = sst_common.get_header_line( event_num, shorten_school_names_relays, shorten_school_names_individual, header_dict )
+        if name_list_header != "":
+            event_page.add_header( 'H6', name_list_header )
+
+        swims = sdif_meet.event_swims[event_num]
+        placed_swims = sorted( ( swim for swim in swims if swim.get_int( 'place' ) ), key=lambda swim: swim.get_int( 'place' ) )
+        unplaced_swims = sorted( ( swim for swim in swims if not swim.get_int( 'place' ) ), key=lambda swim: get_time_secs( swim.fields['finals'] ) )
+        place_counts = collections.Counter( swim.get_int( 'place' ) for swim in placed_swims )
+        for swim in placed_swims + unplaced_swims:
+            ## A tie is *8, like in the report
+            place = "---" if not swim.get_int( 'place' ) else f"{'*' if place_counts[swim.get_int( 'place' )] > 1 else ''}{swim.get_int( 'place' )}"
+            school_abbr, school_name_short, school_name_full = get_school_names( sdif_meet, swim.team_code )
+            if swim.relay is None:
+                school = school_abbr if shorten_school_names_individual else school_name_short
+                event_page.rows.append( sst_records.ResultRow( place, get_swimmer_name( swim.fields['name'], namesfirstlast ), swim.fields['grade'], school, None,
+                                                               swim.fields['seed'], swim.fields['finals'], get_points( swim ),
+                                                               diving = event_num in sst_common.meet_state.event_num_diving ) )
+            else:
+                school = school_name_short if shorten_school_names_relays else school_name_full
+                event_page.rows.append( sst_records.ResultRow( place, "", "", school, swim.relay,
+                                                               swim.fields['seed'], swim.fields['finals'], get_points( swim ) ) )
+                relay_legs = get_relay_legs( swim, results_leg_width )
+                if relay_legs is not None:
+                    event_page.rows.append( relay_legs )
+
+        yield ( 'results', event_num, event_page )
+
+
+#####################################################################################
+## get_program_pages
+## ('program', (event_num, heat_num), HeatPage) for each heat, in event and heat order,
+## the lanes in order.  Swims without a heat and lane aren't seeded and are left out
+#####################################################################################
+def get_program_pages( sdif_meet: SdifMeet,
+                       shorten_school_names_relays: bool,
+                       shorten_school_names_individual: bool,
+                       namesfirstlast: bool,
+                       quote_output: bool ):
+
+    q = "'" if quote_output else ""
+
+    for event_num in sorted( sdif_meet.event_swims ):
+        heat_swims = {}
+        for swim in sdif_meet.event_swims[event_num]:
+            if swim.get_int( 'heat' ) and swim.get_int( 'lane' ):
+                heat_swims.setdefault( swim.get_int( 'heat' ), [] ).append( swim )
+
+        for heat_num in sorted( heat_swims ):
+            heat_page = sst_records.HeatPage( shorten_school_names_relays, shorten_school_names_individual, q )
+            heat_page.event_num = event_num
+            heat_page.heat_num = heat_num
+            heat_page.add_header( 'H4', f"Event  {event_num}   {sdif_meet.get_event_name( event_num )}" )
+            heat_page.add_header( 'H5', f"Heat {heat_num:>3} of {max( heat_swims )}   " )
+            name_list_header = sst_common.get_header_line( event_num, shorten_school_names_relays, shorten_school_names_individual, sst_program.program_header_dict )
+            if name_list_header != "":
+                heat_page.add_header( 'H6', name_list_header )
+
+            for swim in sorted( heat_swims[heat_num], key=lambda swim: swim.get_int( 'lane' ) ):
+                lane = str( swim.get_int( 'lane' ) )
+                school_abbr, school_name_short, school_name_full = get_school_names( sdif_meet, swim.team_code )
+                if swim.relay is None:
+                    school = school_abbr if shorten_school_names_individual else school_name_full
+                    heat_page.rows.append( sst_records.ProgramEntry( lane, get_swimmer_name( swim.fields['name'], namesfirstlast ), swim.fields['grade'], school,
+                                                                     None, swim.fields['seed'] ) )
+                else:
+                    school = school_abbr if shorten_school_names_relays else school_name_short[:28]
+                    heat_page.rows.append( sst_records.ProgramEntry( lane, "", "", school, swim.relay, swim.fields['seed'] ) )
+                    relay_legs = get_relay_legs( swim, program_leg_width )
+                    if relay_legs is not None:
+                        heat_page.rows.append( relay_legs )
+
+            yield ( 'program', (event_num, heat_num), heat_page )
@@ -0,0 +1,206 @@
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+
+
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+##########                                                                 ##########
+##########    S S T _ M O D U L E _ W A T C H E R S                        ##########
+##########                                                                 ##########
+##########    Directory watcher backends for watch_mm_reports.             ##########
+##########    Same schedule/start/stop/join interface as the watchdog      ##########
+##########    Observer, and they call handler.on_any_event()               ##########
+##########                                                                 ##########
+#####################################################################################
+#####################################################################################
+#####################################################################################
+#####################################################################################
+
+#####################################################################################
+## The event passed to the handler.  Both backends only report a file that is
+## new or has changed, which the handler treats the same as a watchdog created event
+#####################################################################################
+class FileEvent:
+    def __init__(self, src_path: str, event_type: str = 'created', is_directory: bool = False):
+        self.src_path = src_path
+        self.event_type = event_type
+        self.is_directory = is_directory
+
+
+#####################################################################################
+## inotify constants from <sys/inotify.h>
+#####################################################################################
+IN_CLOSE_WRITE  = 0x00000008
+IN_MOVED_TO     = 0x00000080
+IN_CREATE       = 0x00000100
+IN_DELETE_SELF  = 0x00000400
+IN_Q_OVERFLOW   = 0x00004000
+IN_IGNORED      = 0x00008000
+IN_ISDIR        = 0x40000000
+IN_NONBLOCK     = 0o4000
+IN_CLOEXEC      = 0o2000000
+
+inotify_event_header = struct.Struct('iIII')
+
+
+def is_inotify_available() -> bool:
+    return sys.platform.startswith('linux') and ctypes.util.find_library('c') is not None
+
+
+#####################################################################################
+## InotifyObserver
+## Linux only.  A report is only handed over when Meet Manager closes it after
+## writing (IN_CLOSE_WRITE) or it is renamed into the directory (IN_MOVED_TO), so
+## there is no created event for a file that is still empty.  New sub directories
+## are watched as they are created when recursive is set
+#####################################################################################
+class InotifyObserver(threading.Thread):
+    def __init__(self):
+        super().__init__( name="inotify-observer", daemon=True )
+        self.libc = ctypes.CDLL( ctypes.util.find_library('c'), use_errno=True )
+        self.inotify_fd = self.libc.inotify_init1( IN_NONBLOCK | IN_CLOEXEC )
+        if self.inotify_fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError( errno, f"inotify_init1 failed: {os.strerror(errno)}" )
+
+        ## Writing to this pipe wakes up the select() in run() to stop the thread
+        self.stop_read_fd, self.stop_write_fd = os.pipe()
+        self.handler = None
+        self.recursive = False
+        self.watch_dirs = {}
+
+    def schedule(self, handler, path: str, recursive: bool = False):
+        self.handler = handler
+        self.recursive = recursive
+        self.add_watch( path )
+
+    def add_watch(self, dir_path: str):
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF
+        wd = self.libc.inotify_add_watch( self.inotify_fd, os.fsencode(dir_path), mask )
+        if wd < 0:
+            errno = ctypes.get_errno()
+            logging.error(f"inotify_add_watch failed for {dir_path}: {os.strerror(errno)}")
+            return
+        self.watch_dirs[wd] = dir_path
+
+        if self.recursive:
+            with os.scandir( dir_path ) as dir_entries:
+                for dir_entry in dir_entries:
+                    if dir_entry.is_dir( follow_symlinks=False ):
+                        self.add_watch( dir_entry.path )
+
+    def run(self):
+        while True:
+            readable, writable, errors = select.select( [self.inotify_fd, self.stop_read_fd], [], [] )
+            if self.stop_read_fd in readable:
+                break
+
+            try:
+                buffer = os.read( self.inotify_fd, 64 * 1024 )
+            except BlockingIOError:
+                continue
+
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, cookie, name_len = inotify_event_header.unpack_from( buffer, offset )
+                offset += inotify_event_header.size
+                name = buffer[offset:offset + name_len].rstrip(b'\0')
+                offset += name_len
+                self.process_event( wd, mask, name )
+
+        os.close( self.inotify_fd )
+        os.close( self.stop_read_fd )
+        os.close( self.stop_write_fd )
+
+    def process_event(self, wd: int, mask: int, name: bytes):
+        if mask & IN_Q_OVERFLOW:
+            logging.warning("inotify event queue overflowed. Some reports may have been missed")
+            return
+
+        if mask & (IN_IGNORED | IN_DELETE_SELF):
+            self.watch_dirs.pop( wd, None )
+            return
+
+        dir_path = self.watch_dirs.get( wd )
+        if dir_path is None or not name:
+            return
+        path = os.path.join( dir_path, os.fsdecode(name) )
+
+        if mask & IN_ISDIR:
+            if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                self.add_watch( path )
+            return
+
+        if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self.handler.on_any_event( FileEvent( path ) )
+
+    def stop(self):
+        os.write( self.stop_write_fd, b'x' )
+
+
+#####################################################################################
+## PollingObserver
+## For inputs on a network share where inotify/watchdog don't see remote writes.
+## Scans the directory with os.scandir every poll_interval seconds and reports a file
+## that is new or whose size, mtime or inode changed (Meet Manager deletes and
+## recreates a report when overwriting it).  Files found on the first scan are not
+## reported.  schedule() may be called for more than one directory
+#####################################################################################
+class PollingObserver(threading.Thread):
+    def __init__(self, poll_interval: float):
+        super().__init__( name="polling-observer", daemon=True )
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.handler = None
+        self.paths = []
+        self.recursive = False
+
+    def schedule(self, handler, path: str, recursive: bool = False):
+        self.handler = handler
+        self.paths.append( path )
+        self.recursive = recursive
+
+    def scan_all(self) -> dict:
+        snapshot = {}
+        for path in self.paths:
+            self.scan( path, snapshot )
+        return snapshot
+
+    def scan(self, dir_path: str, snapshot: dict) -> dict:
+        try:
+            with os.scandir( dir_path ) as dir_entries:
+                for dir_entry in dir_entries:
+                    try:
+                        if dir_entry.is_dir( follow_symlinks=False ):
+                            if self.recursive:
+                                self.scan( dir_entry.path, snapshot )
+                            continue
+                        stat = dir_entry.stat( follow_symlinks=False )
+                    except FileNotFoundError:
+                        continue
+                    snapshot[dir_entry.path] = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        except FileNotFoundError:
+            pass
+
+        return snapshot
+
+    def run(self):
+        last_snapshot = self.scan_all()
+
+        while not self.stop_event.wait( self.poll_interval ):
+            snapshot = self.scan_all()
+            for path, file_state in snapshot.items():
+                if last_snapshot.get( path ) != file_state:
+                    self.handler.on_any_event( FileEvent( path ) )
+            last_snapshot = snapshot
+
+    def stop(self):
+        self.stop_event.set()
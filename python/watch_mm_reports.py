@@ -4,6 +4,57 @@
 #############################################################################################
 ###
 ### generate_heat_files
+###
+###  Watch the Meet Manager report directory and regenerate the wirecast files
+###  for every report that gets created.
+###
+###  --daemon runs the generate_wirecast_files pipeline in this process instead of
+###  starting a new python process per report. Modules, compiled regexes and the
+###  school list stay loaded between reports.
+###
+###  Meet Manager deletes/creates a report when overwriting it and operators often
+###  save several times in a row.  Events for the same file are debounced so a burst
+###  of saves produces a single regeneration of the final content.
+###
+###  Meet Manager may still be writing a large report when the created event arrives.
+###  Each report is only processed once its size and mtime have stopped changing.
+###
+###  Settled reports are queued by priority: results first, then scores, then the
+###  meet program.  A newer save of a report skips the queued job for the older
+###  version, or stops it if it is already running.  A pool of --workers threads
+###  runs reports in parallel, one at a time per output directory.
+###
+###  On startup (--daemon) every report in the directory is checked against the
+###  manifest of reports already processed.  Only reports whose outputs are
+###  missing or out of date are queued, through the same workers as live saves.
+###
+###  --routes serves several meets from one watcher: each route has its own watch
+###  directory (or meet name regex for meets saved to the same directory), output
+###  directory, schools file and options, and all routes share the workers.
+###
+###  A .wirecast_config.json (or .toml) in a watched directory holds the meet type,
+###  options and school file for its reports.  It is read again as soon as it is
+###  saved, and the options are parsed once per change rather than once per report.
+###
+###  --journal records every report ingested and the outcome of every run, for
+###  replaying the meet later with replay_mm_reports.py.
+###
+###  --backend picks how the directory is watched: watchdog (default), native
+###  inotify on Linux, or os.scandir polling for reports on a network share.
+###
+###  --metricsport serves Prometheus style metrics on http://127.0.0.1:PORT/metrics:
+###  reports detected and processed, latency, parse and render time, files written,
+###  queue depth, unmatched schools and lines the parsers couldn't read.
+###
+###  --controlport (with --daemon) takes operator commands from control_mm_reports.py:
+###  regenerate one event from the last results, rerun the last program, or change
+###  an option like numresults live.  Files are written again from the pages kept
+###  from the last report, without reading it again.
+###
+###  Any command line arguments not used by the watcher are passed on to
+###  generate_wirecast_files for every report.
+#############################################################################################
+#############################################################################################
 
 
 
@@ -14,16 +65,258 @@ from watchdog.events import FileSystemEventHandler
 import subprocess
 import sys, os
 import pathlib
+import argparse
+import logging
+import threading
+import heapq
+import json
+import re
+import copy
+import functools
+
+import generate_wirecast_files as gen_wc_files
+import sst_module_common as sst_common
+import sst_module_watchers as sst_watchers
+import sst_module_manifest as sst_manifest
+import sst_module_metrics as sst_metrics
+import sst_module_journal as sst_journal
+import sst_module_control as sst_control
+import sst_module_config as sst_config
+import sst_module_report_sniffer as sst_report_sniffer
+
+#####################################################################################
+## Create the observer for the selected watcher backend
+#####################################################################################
+def create_observer( backend: str, poll_interval: float ):
+
+    if backend == 'inotify':
+        if not sst_watchers.is_inotify_available():
+            print(f"ERROR: inotify backend is only available on Linux")
+            sys.exit(2)
+        return sst_watchers.InotifyObserver()
+    elif backend == 'poll':
+        return sst_watchers.PollingObserver( poll_interval )
+
+    return Observer()
+
+
+#####################################################################################
+## Metrics.  Report metrics are labeled with the report kind:
+## results, scores, program or unknown
+#####################################################################################
+metrics = sst_metrics.registry
+metric_reports_detected  = metrics.counter(   "wirecast_reports_detected_total",  "Reports queued for processing", ("kind",) )
+metric_reports_processed = metrics.counter(   "wirecast_reports_processed_total", "Reports processed by status: completed, failed, cancelled (stopped while running) or skipped (superseded in the queue)", ("kind", "status") )
+metric_report_latency    = metrics.histogram( "wirecast_report_latency_seconds",  "Seconds from the report being detected to its wirecast files being written", ("kind",) )
+metric_parse_secs        = metrics.histogram( "wirecast_report_parse_seconds",    "Seconds spent reading and parsing the report", ("kind",) )
+metric_render_secs       = metrics.histogram( "wirecast_report_render_seconds",   "Seconds spent formatting and writing the wirecast files", ("kind",) )
+metric_files_written     = metrics.counter(   "wirecast_files_written_total",     "Wirecast files written", ("kind",) )
+metric_files_skipped     = metrics.counter(   "wirecast_files_skipped_total",     "Wirecast files not rewritten because the run already wrote them from an earlier page", ("kind",) )
+metric_unmatched_schools = metrics.counter(   "wirecast_unmatched_schools_total", "School names in a report not found in schools.txt, counted once per run", ("kind",) )
+metric_lines_unparsed    = metrics.counter(   "wirecast_lines_unparsed_total",    "Entry lines the parser couldn't read. These swimmers are missing from the output", ("kind",) )
+metric_lines_parsed      = metrics.counter(   "wirecast_lines_parsed_total",      "Entry lines read by path: columns (cut at the page's column header) or regex (lines that didn't line up)", ("kind", "path") )
+metric_parse_cache       = metrics.counter(   "wirecast_parse_cache_total",       "-K parse cache lookups by result: hit, miss or evicted (reports removed to keep the cache in --cachesize)", ("kind", "result") )
+metric_incremental       = metrics.counter(   "wirecast_incremental_units_total", "-I events (results) or heats (program) by result: regenerated (pages changed) or unchanged", ("kind", "result") )
+metric_parse_lines       = metrics.counter(   "wirecast_parse_lines_total",       "--parsecoverage: report lines by parser, kind of line and outcome: matched, unmatched (patterns tried, none matched) or skipped", ("kind", "parser", "line_kind", "outcome") )
+metric_pattern_calls     = metrics.counter(   "wirecast_parse_pattern_calls_total", "--parsecoverage: calls of each parser pattern, by result: match or nomatch", ("kind", "pattern", "result") )
+metric_pattern_secs      = metrics.counter(   "wirecast_parse_pattern_seconds_total", "--parsecoverage: seconds spent in each parser pattern", ("kind", "pattern") )
+metric_queue_depth       = metrics.gauge(     "wirecast_queue_depth",             "Reports waiting for a worker" )
+metric_workers_busy      = metrics.gauge(     "wirecast_workers_busy",            "Workers processing a report" )
+metric_queue_wait        = metrics.histogram( "wirecast_queue_wait_seconds",      "Seconds reports waited in the queue for a worker" )
+metric_settle_wait       = metrics.histogram( "wirecast_settle_wait_seconds",     "Seconds spent waiting for Meet Manager to finish writing a report" )
+metric_events            = metrics.counter(   "wirecast_events_total",            "File created events seen by the watcher" )
+metric_runs_avoided      = metrics.counter(   "wirecast_runs_avoided_total",      "Runs avoided by debouncing repeated saves of the same report" )
+
+
+#####################################################################################
+## Route
+## One meet: the directory its reports are saved to and the generate_wirecast_files
+## options for it (output directory, schools file, meet type, ...).  Several meets
+## saving to the same directory are told apart by a regex on the meet name in the
+## report header.  Routes share the workers.  Each report runs with its route's
+## options only, and the meet state (events, school list) is per worker thread.
+## The options are the command line/routes file options, then the config file in
+## the watch directory, then the options set with control commands
+#####################################################################################
+class Route:
+    def __init__(self, name: str, watchdir: str, generate_argv: list, meet_name_pattern: str = None, manifest = None):
+        self.name = name
+        self.watchdir = os.path.abspath( watchdir )
+        self.generate_argv = generate_argv
+        self.meet_name_pattern = meet_name_pattern
+        self.meet_name_re = re.compile( meet_name_pattern, re.IGNORECASE ) if meet_name_pattern else None
+        self.manifest = manifest
+
+        ## dest -> value set with control commands
+        self.option_overrides = {}
+
+        ## Parsed once per config change.  Each report gets a copy with its inputdir/filename.
+        ## A new namespace replaces the old one, so a running report keeps the options it started with
+        self.lock = threading.Lock()
+        self.config = {}
+        self.config_state = None
+        self.generate_args = self.build_generate_args( self.config )
+        self.reload_config()
+
+        ## Report kind -> ParsedReport for the last report of that kind run in process
+        self.parsed_reports = {}
+
+    ## Jobs writing to the same output directory are run one at a time
+    @property
+    def output_key(self) -> str:
+        return os.path.abspath( self.generate_args.outputdir )
+
+    def build_generate_args(self, config: dict) -> argparse.Namespace:
+        parser = gen_wc_files.get_arg_parser()
+        generate_args = parser.parse_args( self.generate_argv )
+        sst_config.apply_config( generate_args, config, sst_config.get_option_actions( parser ) )
+        for dest, value in self.option_overrides.items():
+            setattr( generate_args, dest, value )
+        return generate_args
+
+    def reload_config(self) -> bool:
+        """ Apply the config file in the watch directory if it changed.  A config that
+            can't be read is reported and the current options are kept """
+
+        with self.lock:
+            config_filename = sst_config.get_config_filename( self.watchdir )
+            config_state = sst_config.get_file_state( config_filename )
+            if config_state == self.config_state:
+                return False
+            self.config_state = config_state
+
+            try:
+                config = sst_config.read_config( config_filename ) if config_filename else {}
+                generate_args = self.build_generate_args( config )
+            except ValueError as error:
+                print(f"ERROR: route {self.name}: config not applied, keeping the current options: {error}")
+                return False
+
+            self.config = config
+            self.generate_args = generate_args
+
+        if config_filename:
+            print(f"INFO: route {self.name}: options from {config_filename}: {json.dumps( config )}")
+        else:
+            print(f"INFO: route {self.name}: no config file, using the command line options")
+        return True
+
+    def set_option(self, dest: str, value):
+        """ Control command.  Kept over config file changes """
+
+        with self.lock:
+            self.option_overrides[dest] = value
+            self.generate_args = self.build_generate_args( self.config )
+
+    def contains(self, filepath: str) -> bool:
+        return os.path.abspath( filepath ).startswith( self.watchdir + os.sep )
+
+    def get_report_args(self, filepath: str) -> argparse.Namespace:
+        report_args = copy.copy( self.generate_args )
+        report_args.inputdir = os.path.dirname(filepath).replace(os.sep,'/')
+        report_args.filename = os.path.basename(filepath)
+        return report_args
+
+
+#####################################################################################
+## ParsedReport
+## The pages parsed from a route's last report of a kind and the options it was run
+## with, so control commands can write its files again without reading it again.
+## With -I the next run of the report keeps the pages of the events/heats whose
+## page_hashes haven't changed
+#####################################################################################
+class ParsedReport:
+    def __init__(self, filepath: str, args: argparse.Namespace, parsed_pages: list, page_hashes: dict = None):
+        self.filepath = filepath
+        self.args = args
+        self.parsed_pages = parsed_pages
+        self.page_hashes = page_hashes
+        self.parsed_time = time.time()
+
+    def get_event_nums(self) -> set:
+        return set( page_key if page_type == 'results' else page_key[0]
+                    for page_type, page_key, page in self.parsed_pages if page_type in ('results', 'program') )
+
+
+#####################################################################################
+## ReportRouter
+## Find the route for a report: a route for its directory whose meet name pattern
+## matches the report, otherwise the route for its directory without a pattern.
+## The deepest directory wins when routes watch nested directories
+#####################################################################################
+class ReportRouter:
+    def __init__(self, routes: list):
+        self.routes = sorted( routes, key=lambda route: len(route.watchdir), reverse=True )
+
+    def get_watchdirs(self) -> list:
+        return sorted( set( route.watchdir for route in self.routes ) )
+
+    def get_route(self, filepath: str, meet_name: str):
+        default_route = None
+        for route in self.routes:
+            if not route.contains( filepath ):
+                continue
+            if route.meet_name_re is None:
+                if default_route is None:
+                    default_route = route
+            elif route.meet_name_re.search( meet_name ):
+                return route
+
+        return default_route
+
+    def reload_config(self, config_filename: str):
+        config_dir = os.path.dirname( os.path.abspath( config_filename ) )
+        for route in self.routes:
+            if route.watchdir == config_dir:
+                route.reload_config()
+
+    def create_job(self, filepath: str, detected_time: float):
+        """ ReportJob for the report on its route. None if no route takes this meet """
+
+        meet_name, report_kind = get_report_meet_name_and_kind( filepath )
+        route = self.get_route( filepath, meet_name )
+        if route is None:
+            print(f"WARNING: {os.path.basename(filepath)}: no route for meet '{meet_name}'. Ignoring file")
+            return None
+
+        return ReportJob( filepath, detected_time, report_kind, route )
+
 
 class Watcher:
-    def __init__(self, path):
-        self.observer = Observer()
-        self.path = path
+    def __init__(self, router, daemon: bool, debounce_secs: float, settler, num_workers: int, observer, journal = None, control_port: int = 0):
+        self.control_port = control_port
+        self.observer = observer
+        self.router = router
+        self.journal = journal
+        self.daemon = daemon
+        self.debounce_secs = debounce_secs
+        self.settler = settler
+        self.num_workers = num_workers
 
     def run(self):
-        event_handler = Handler()
-        self.observer.schedule(event_handler, self.path, recursive=True)
+        scheduler = ReportScheduler( self.run_job, self.num_workers, self.job_done )
+        scheduler.start()
+
+        event_handler = Handler( scheduler, self.router, self.debounce_secs, self.settler, self.journal )
+        for watchdir in self.router.get_watchdirs():
+            self.observer.schedule(event_handler, watchdir, recursive=True)
+
+        metric_queue_depth.set_function( lambda: scheduler.stats()["queue_depth"] )
+        metric_workers_busy.set_function( lambda: scheduler.stats()["workers_busy"] )
+        metric_events.set_function( lambda: event_handler.debouncer.stats()["events"] )
+        metric_runs_avoided.set_function( lambda: event_handler.debouncer.stats()["runs_avoided"] )
+
+        if self.control_port:
+            control_commands = ControlCommands( self.router, scheduler )
+            if sst_control.start_control_server( self.control_port, control_commands.run_command ) is not None:
+                print(f"INFO: control commands on 127.0.0.1:{self.control_port}")
+
         self.observer.start()
+
+        ## Start watching first so a report saved during the scan isn't missed
+        if any( route.manifest is not None for route in self.router.routes ):
+            self.reconcile( scheduler )
+
         try:
             while True:
                 time.sleep(1)
@@ -32,46 +325,925 @@ class Watcher:
             print("Error")
 
         self.observer.join()
+        scheduler.stop()
+
+    #####################################################################################
+    ## Warm start. Queue the reports whose outputs are missing or out of date
+    ## Oldest report first so the newest report's outputs are written last
+    #####################################################################################
+    def reconcile(self, scheduler):
+        report_files = []
+        for watchdir in self.router.get_watchdirs():
+            for root, dirs, files in os.walk( watchdir ):
+                for file_name in files:
+                    if pathlib.Path(file_name).suffix == '.txt' and file_name != 'schools.txt':
+                        report_files.append( os.path.join( root, file_name ) )
+        report_files = sorted( set(report_files), key=os.path.getmtime )
+
+        num_queued = 0
+        num_checked = 0
+        for report_file in report_files:
+            job = self.router.create_job( report_file, time.time() )
+            if job is None or job.route.manifest is None:
+                continue
+
+            num_checked += 1
+            stale_reason = job.route.manifest.get_stale_reason( report_file )
+            if stale_reason:
+                print(f"INFO: startup: regenerating {os.path.basename(report_file)} ({job.route.name}): {stale_reason}")
+                scheduler.submit( job )
+                num_queued += 1
+
+        print(f"INFO: startup: {num_checked} reports found, {num_queued} queued, {num_checked - num_queued} up to date")
+
+    def run_job(self, job) -> bool:
+        if job.action is not None:
+            return job.action( job )
+        if self.daemon:
+            return generate_wirecast_files_in_process( job )
+
+        generate_argv = sst_config.get_option_argv( gen_wc_files.get_arg_parser(), job.route.generate_args )
+        completed = generate_wirecast_files( job.filepath, generate_argv, job.cancel_event )
+        job.status = "completed" if completed else "cancelled"
+        metric_reports_processed.inc( job.report_kind, job.status )
+        return completed
+
+    def job_done(self, job):
+        ## Control commands write files again from kept pages, not a save to replay
+        if self.journal is not None and job.action is None:
+            self.journal.record_done( job )
 
 
 class Handler(FileSystemEventHandler):
-    @staticmethod
-    def on_any_event(event):
+    def __init__(self, scheduler, router, debounce_secs: float, settler, journal = None):
+        super().__init__()
+        self.scheduler = scheduler
+        self.router = router
+        self.journal = journal
+        self.debouncer = Debouncer( debounce_secs, self.schedule_report )
+        self.settler = settler
+
+    def on_any_event(self, event):
         if event.is_directory:
             return None
 
+        ## Editors save the config in place, through a temporary file, or delete it
+        config_path = event.dest_path if event.event_type == 'moved' else event.src_path
+
+        ## Other dot-files are our own, like the manifest (and its temp file) written into the
+        ## watched directory after every run.  Dropped here so they aren't counted or debounced
+        if os.path.basename( config_path ).startswith('.') and not sst_config.is_config_file( config_path ):
+            return
+
         ## Meet manager will delete/create a file when overwriting existing file
         if event.event_type == 'created':
-            generate_wirecast_files(event.src_path)
+            self.debouncer.submit( event.src_path, time.time() )
+            return
 
-def generate_wirecast_files(filepath):
+        if event.event_type in ('modified', 'moved', 'deleted') and sst_config.is_config_file( config_path ):
+            self.debouncer.submit( config_path, time.time() )
+
+    def schedule_report(self, filepath: str, detected_time: float):
+        if sst_config.is_config_file( filepath ):
+            self.router.reload_config( filepath )
+            return
+
+        if not is_report_file( filepath ):
+            return
+
+        ## Don't parse a report Meet Manager is still writing
+        if not self.settler.wait( filepath ):
+            return
+
+        job = self.router.create_job( filepath, detected_time )
+        if job is None:
+            return
+
+        ## Snapshot exactly the version being queued
+        if self.journal is not None and not self.journal.record_ingest( job ):
+            return
+
+        self.scheduler.submit( job )
+
+
+#####################################################################################
+## Debouncer
+## Hold each path for debounce_secs after its last event.  Any new event for the
+## same path restarts the wait, so only the latest version of the file is processed.
+#####################################################################################
+class Debouncer:
+    def __init__(self, debounce_secs: float, dispatch_fn):
+        self.debounce_secs = debounce_secs
+        self.dispatch_fn = dispatch_fn
+        self.lock = threading.Lock()
+
+        ## path -> (timer, detected_time of the latest event)
+        self.pending = {}
+
+        ## Counters
+        self.num_events = 0
+        self.num_runs = 0
+        self.num_runs_avoided = 0
+
+    def submit(self, filepath: str, detected_time: float):
+        with self.lock:
+            self.num_events += 1
+
+            if self.debounce_secs <= 0:
+                self.num_runs += 1
+            else:
+                ## Latest wins. Cancel the wait for the older version of this file
+                if filepath in self.pending:
+                    self.pending[filepath][0].cancel()
+                    self.num_runs_avoided += 1
+
+                timer = threading.Timer( self.debounce_secs, self.fire, args=(filepath,) )
+                timer.daemon = True
+                self.pending[filepath] = (timer, detected_time)
+                timer.start()
+                return
+
+        ## Debounce disabled, dispatch on the caller's thread
+        self.dispatch_fn( filepath, detected_time )
+
+    def fire(self, filepath: str):
+        with self.lock:
+            ## A newer event may have replaced this timer after it already started to run
+            pending = self.pending.get( filepath )
+            if pending is None or pending[0] is not threading.current_thread():
+                return
+            del self.pending[filepath]
+            detected_time = pending[1]
+            self.num_runs += 1
+
+        self.dispatch_fn( filepath, detected_time )
+
+        print(f"INFO: debounce: {self.num_events} events, {self.num_runs} runs, {self.num_runs_avoided} runs avoided")
+
+    def stats(self) -> dict:
+        with self.lock:
+            return { "events": self.num_events,
+                     "runs": self.num_runs,
+                     "runs_avoided": self.num_runs_avoided,
+                     "pending": len(self.pending) }
+
+
+#####################################################################################
+## FileSettler
+## Wait until a file's size and mtime are unchanged for settle_polls polls in a row,
+## settle_interval seconds apart.  An empty file is never considered settled.
+## Gives up waiting after settle_timeout seconds and processes the file anyway
+#####################################################################################
+class FileSettler:
+    def __init__(self, settle_polls: int, settle_interval: float, settle_timeout: float):
+        self.settle_polls = settle_polls
+        self.settle_interval = settle_interval
+        self.settle_timeout = settle_timeout
+        self.lock = threading.Lock()
+
+        ## Counters.  Time spent waiting is added to the report latency so track it
+        self.num_waits = 0
+        self.num_timeouts = 0
+        self.num_vanished = 0
+        self.total_wait_secs = 0.0
+        self.max_wait_secs = 0.0
+
+    def get_file_state( self, filepath: str ):
+        try:
+            stat = os.stat( filepath )
+        except FileNotFoundError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def wait( self, filepath: str ) -> bool:
+        """ Returns False if the file was removed while waiting """
+
+        start_time = time.time()
+        num_polls = 0
+        stable_polls = 0
+        settled = True
+        last_state = self.get_file_state( filepath )
+
+        while last_state is not None and stable_polls < self.settle_polls:
+            if time.time() - start_time >= self.settle_timeout:
+                settled = False
+                break
+
+            time.sleep( self.settle_interval )
+            num_polls += 1
+            state = self.get_file_state( filepath )
+            if state == last_state and state is not None and state[0] > 0:
+                stable_polls += 1
+            else:
+                stable_polls = 0
+            last_state = state
+
+        wait_secs = time.time() - start_time
+        input_file_name = os.path.basename(filepath)
+
+        metric_settle_wait.observe( wait_secs )
+        with self.lock:
+            self.num_waits += 1
+            self.total_wait_secs += wait_secs
+            self.max_wait_secs = max( self.max_wait_secs, wait_secs )
+            if last_state is None:
+                self.num_vanished += 1
+            elif not settled:
+                self.num_timeouts += 1
+
+        if last_state is None:
+            print(f"INFO: {input_file_name} was removed before it settled. Waiting for it to be created again")
+            return False
+        if not settled:
+            print(f"WARNING: {input_file_name} still changing after {wait_secs:.3f}s. Processing it anyway")
+        else:
+            print(f"INFO: {input_file_name} settled after {wait_secs:.3f}s ({num_polls} polls)")
+
+        return True
+
+    def stats(self) -> dict:
+        with self.lock:
+            return { "waits": self.num_waits,
+                     "timeouts": self.num_timeouts,
+                     "vanished": self.num_vanished,
+                     "wait_secs_total": self.total_wait_secs,
+                     "wait_secs_max": self.max_wait_secs }
+
+
+#####################################################################################
+## Report kind, from the kind sst_report_sniffer finds.  Used for the queue priority
+## and as the metrics label.
+## Results are needed on air first, then scores, then the program.
+## Reports we can't identify go last
+#####################################################################################
+report_kind_dict = {
+    sst_report_sniffer.report_kind_results:             'results',
+    sst_report_sniffer.report_kind_team_rankings:       'scores',
+    sst_report_sniffer.report_kind_dual_meet_scores:    'scores',
+    sst_report_sniffer.report_kind_program:             'program',
+}
+
+report_priority_dict = {
+    'results':  0,
+    'scores':   1,
+    'program':  2,
+    'unknown':  3,
+}
+
+def get_report_meet_name_and_kind( filepath: str ) -> tuple:
+
+    try:
+        with sst_report_sniffer.sniff_report( filepath ) as report_sniff:
+            meet_name = report_sniff.header_info[0]
+            report_kind = report_sniff.report_kind
+    except Exception:
+        return "", 'unknown'
+
+    return meet_name, report_kind_dict.get( report_kind, 'unknown' )
+
+
+#####################################################################################
+## ReportJob
+## One save of one report, run with its route's options.  cancel_event is set when a
+## newer save supersedes it.  status: completed, failed, cancelled or skipped.
+## Jobs with the same output_key (the output directory) never run at the same time
+#####################################################################################
+class ReportJob:
+    def __init__(self, filepath: str, detected_time: float, report_kind: str, route: Route):
+        self.filepath = filepath
+        self.detected_time = detected_time
+        self.report_kind = report_kind
+        self.priority = report_priority_dict[report_kind]
+        self.route = route
+        self.output_key = route.output_key
+
+        ## Set when journaling.  status is set when the job is done or skipped
+        self.sha256 = None
+        self.status = "queued"
+        self.num_files = 0
+        self.done_event = threading.Event()
+
+        ## A newer job for the same report replaces this one.  Control command jobs
+        ## set action, which is run instead of generating the report, and replace nothing
+        self.supersede_key = filepath
+        self.action = None
+        self.queued_time = time.time()
+        self.cancel_event = threading.Event()
+
+
+#####################################################################################
+## ReportScheduler
+## Priority queue of report jobs processed by a pool of num_workers threads.
+## Equal priorities run in arrival order.  Reports for different output directories
+## run in parallel, jobs for the same output directory one at a time so the
+## RESULTS/AWARDS files are never written by two runs at once.
+## Only the newest save of each report is worth running: submitting a report
+## cancels the older job for the same file, whether it is still queued (skipped
+## when it comes up) or already running (stops at its next file write)
+#####################################################################################
+class ReportScheduler:
+    def __init__(self, run_fn, num_workers: int, done_fn = None):
+        self.run_fn = run_fn
+        self.num_workers = max( 1, num_workers )
+        self.done_fn = done_fn
+        self.cond = threading.Condition()
+        self.queue = []
+        self.seq = 0
+        self.stopping = False
+        self.workers = []
+
+        ## supersede_key (filepath) -> newest job for that file, queued or running
+        self.latest_job = {}
+        ## output_keys with a job running
+        self.busy_output_keys = set()
+
+        ## Counters
+        self.num_submitted = 0
+        self.num_completed = 0
+        self.num_skipped = 0
+        self.num_cancelled = 0
+        self.num_busy_workers = 0
+        self.max_queue_depth = 0
+        self.total_queue_wait_secs = 0.0
+        self.max_queue_wait_secs = 0.0
+
+    def start(self):
+        for worker_num in range( self.num_workers ):
+            worker = threading.Thread( target=self.worker_loop, name=f"report-worker-{worker_num}", daemon=True )
+            worker.start()
+            self.workers.append( worker )
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        for worker in self.workers:
+            worker.join()
+
+    def submit(self, job: ReportJob):
+        if job.action is None:
+            metric_reports_detected.inc( job.report_kind )
+
+        with self.cond:
+            if job.supersede_key is not None:
+                older_job = self.latest_job.get( job.supersede_key )
+                if older_job is not None:
+                    older_job.cancel_event.set()
+                self.latest_job[job.supersede_key] = job
+
+            heapq.heappush( self.queue, (job.priority, self.seq, job) )
+            self.seq += 1
+            self.num_submitted += 1
+            self.max_queue_depth = max( self.max_queue_depth, len(self.queue) )
+            self.cond.notify_all()
+
+    def next_job(self):
+        """ Highest priority queued job whose output directory isn't busy. Call holding self.cond """
+
+        for queue_entry in sorted( self.queue ):
+            job = queue_entry[2]
+            if job.cancel_event.is_set():
+                self.queue.remove( queue_entry )
+                heapq.heapify( self.queue )
+                self.num_skipped += 1
+                job.status = "skipped"
+                metric_reports_processed.inc( job.report_kind, "skipped" )
+                if self.done_fn is not None:
+                    self.done_fn( job )
+                job.done_event.set()
+                print(f"INFO: {os.path.basename(job.filepath)}: skipped, superseded by a newer save")
+                continue
+            if job.output_key not in self.busy_output_keys:
+                self.queue.remove( queue_entry )
+                heapq.heapify( self.queue )
+                return job
+
+        return None
+
+    def worker_loop(self):
+        while True:
+            with self.cond:
+                job = None
+                while not self.stopping:
+                    job = self.next_job()
+                    if job is not None:
+                        break
+                    self.cond.wait()
+                if self.stopping:
+                    return
+
+                self.busy_output_keys.add( job.output_key )
+                self.num_busy_workers += 1
+                queue_wait_secs = time.time() - job.queued_time
+                self.total_queue_wait_secs += queue_wait_secs
+                self.max_queue_wait_secs = max( self.max_queue_wait_secs, queue_wait_secs )
+                metric_queue_wait.observe( queue_wait_secs )
+                print(f"INFO: {os.path.basename(job.filepath)}: started after {queue_wait_secs:.3f}s in queue "
+                      f"(queue depth {len(self.queue)}, {self.num_busy_workers} of {self.num_workers} workers busy)")
+
+            try:
+                completed = self.run_fn( job )
+            finally:
+                with self.cond:
+                    self.busy_output_keys.discard( job.output_key )
+                    self.num_busy_workers -= 1
+                    if job.supersede_key is not None and self.latest_job.get( job.supersede_key ) is job:
+                        del self.latest_job[job.supersede_key]
+                    self.cond.notify_all()
+
+            with self.cond:
+                if completed:
+                    self.num_completed += 1
+                else:
+                    self.num_cancelled += 1
+
+            if self.done_fn is not None:
+                self.done_fn( job )
+            job.done_event.set()
+
+    def stats(self) -> dict:
+        with self.cond:
+            num_started = self.num_completed + self.num_cancelled + self.num_busy_workers
+            return { "submitted": self.num_submitted,
+                     "completed": self.num_completed,
+                     "skipped": self.num_skipped,
+                     "cancelled": self.num_cancelled,
+                     "queue_depth": len(self.queue),
+                     "queue_depth_max": self.max_queue_depth,
+                     "workers": self.num_workers,
+                     "workers_busy": self.num_busy_workers,
+                     "queue_wait_secs_total": self.total_queue_wait_secs,
+                     "queue_wait_secs_max": self.max_queue_wait_secs,
+                     "queue_wait_secs_avg": self.total_queue_wait_secs / num_started if num_started else 0.0 }
+
+
+#####################################################################################
+## ControlCommands
+## Commands from the operator on --controlport (see control_mm_reports.py).
+## Files are written again from the pages kept from the route's last report of the
+## kind, without reading the report again.  These runs go through the scheduler,
+## ahead of queued reports and one at a time with other runs for the output directory
+#####################################################################################
+control_help = """Commands.  Add 'route NAME' when the watcher serves more than one route
+  status                                  routes, their options and the last report of each kind
+  regenerate event N [results|program]    write one event's files again from the last results (or program)
+  rerun last results|program|scores       write all the files again.  Scores read the report again
+  set OPTION VALUE                        change an option for the route.  Rewrites the files of the
+                                          last reports when the option changes them
+  help"""
+
+control_timeout_secs = 120.0
+
+class ControlCommands:
+    def __init__(self, router, scheduler):
+        self.router = router
+        self.scheduler = scheduler
+
+        ## The options a config file can set, named by their long option: set numresults 10
+        self.option_actions = sst_config.get_option_actions( gen_wc_files.get_arg_parser() )
+
+    def run_command(self, command: str) -> str:
+        words = command.split()
+
+        ## Trailing 'route NAME'
+        route_name = None
+        if len(words) >= 2 and words[-2].lower() == 'route':
+            route_name = words[-1]
+            words = words[:-2]
+        if not words:
+            return control_help
+
+        verb = words[0].lower()
+        if verb == 'help':
+            return control_help
+        if verb == 'status':
+            return self.get_status( self.get_routes( route_name, all_routes=True ) )
+
+        routes = self.get_routes( route_name, all_routes=(verb == 'set') )
+        if isinstance( routes, str ):
+            return routes
+
+        if verb == 'regenerate' and len(words) in (3, 4) and words[1].lower() == 'event':
+            report_kind = words[3].lower() if len(words) == 4 else 'results'
+            try:
+                event_num = int( words[2] )
+            except ValueError:
+                return f"ERROR event number '{words[2]}' is not a number"
+            return self.regenerate( routes[0], report_kind, event_num )
+
+        if verb == 'rerun' and len(words) == 3 and words[1].lower() == 'last':
+            return self.regenerate( routes[0], words[2].lower(), None )
+
+        if verb == 'set' and len(words) == 3:
+            return self.set_option( routes, words[1], words[2] )
+
+        return f"ERROR unknown command '{command}'. Try: help"
+
+    def get_routes(self, route_name: str, all_routes: bool):
+        """ The named route, all routes, or the only route.  An ERROR response if there isn't one """
+
+        if route_name is not None:
+            routes = [ route for route in self.router.routes if route.name == route_name ]
+            if not routes:
+                return f"ERROR no route named '{route_name}'"
+            return routes
+
+        if all_routes or len(self.router.routes) == 1:
+            return sorted( self.router.routes, key=lambda route: route.name )
+
+        route_names = ", ".join( sorted( route.name for route in self.router.routes ) )
+        return f"ERROR more than one route, add: route NAME ({route_names})"
+
+    def get_status(self, routes) -> str:
+        if isinstance( routes, str ):
+            return routes
+
+        scheduler_stats = self.scheduler.stats()
+        lines = [ f"OK queue depth {scheduler_stats['queue_depth']}, {scheduler_stats['workers_busy']} of {scheduler_stats['workers']} workers busy, "
+                  f"{scheduler_stats['completed']} runs completed" ]
+        for route in routes:
+            option_values = " ".join( f"{dest}={getattr(route.generate_args, dest)}" for dest in sst_config.config_options )
+            lines.append( f"route {route.name}: {route.watchdir} -> {route.output_key}" )
+            lines.append( f"  options: {option_values}" )
+            if route.config_state is not None:
+                lines.append( f"  config: {route.config_state[0]}" )
+            if route.option_overrides:
+                lines.append( f"  set by command: {' '.join( f'{dest}={value}' for dest, value in route.option_overrides.items() )}" )
+            for report_kind, parsed_report in sorted( route.parsed_reports.items() ):
+                age_secs = time.time() - parsed_report.parsed_time
+                lines.append( f"  last {report_kind}: {os.path.basename(parsed_report.filepath)} "
+                              f"({len(parsed_report.parsed_pages)} pages, {age_secs:.0f}s ago)" )
+        return "\n".join( lines )
+
+    def regenerate(self, route: Route, report_kind: str, event_num: int) -> str:
+        if report_kind not in ('results', 'program', 'scores'):
+            return f"ERROR unknown report kind '{report_kind}': results, program or scores"
+
+        parsed_report = route.parsed_reports.get( report_kind )
+        if parsed_report is None:
+            return f"ERROR no {report_kind} report processed yet for route {route.name}"
+        report_name = os.path.basename( parsed_report.filepath )
+
+        if event_num is not None:
+            if report_kind == 'scores':
+                return f"ERROR scores have no events"
+            if event_num not in parsed_report.get_event_nums():
+                return f"ERROR event {event_num} is not in the last {report_kind} report {report_name}"
+
+        ## Team scores pages aren't kept.  Read the report again
+        if report_kind == 'scores':
+            job = ReportJob( parsed_report.filepath, time.time(), report_kind, route )
+        else:
+            job = self.create_render_job( route, parsed_report, report_kind, event_num )
+
+        what = f"event {event_num}" if event_num is not None else f"all {report_kind} files"
+        return self.run_jobs( [ job ], f"{what} from {report_name}" )
+
+    def create_render_job(self, route: Route, parsed_report: ParsedReport, report_kind: str, event_num: int) -> ReportJob:
+        job = ReportJob( parsed_report.filepath, time.time(), report_kind, route )
+        job.priority = -1
+        job.supersede_key = None
+        job.action = functools.partial( render_parsed_report, parsed_report, event_num )
+        return job
+
+    def set_option(self, routes: list, option_name: str, value_str: str) -> str:
+        try:
+            action = sst_config.get_option_action( self.option_actions, option_name )
+            value = sst_config.convert_option_value( action, option_name, value_str )
+        except ValueError as error:
+            return f"ERROR {error}"
+
+        ## Render options only change how the kept pages are written.  Other options
+        ## change how reports are parsed, so the last reports are read again
+        jobs = []
+        for route in routes:
+            route.set_option( action.dest, value )
+            for report_kind, parsed_report in sorted( route.parsed_reports.items() ):
+                if action.dest in gen_wc_files.render_options and report_kind in ('results', 'program'):
+                    jobs.append( self.create_render_job( route, parsed_report, report_kind, None ) )
+                elif action.dest not in gen_wc_files.render_options:
+                    jobs.append( ReportJob( parsed_report.filepath, time.time(), report_kind, route ) )
+
+        route_names = ", ".join( route.name for route in routes )
+        message = f"{action.dest}={value} for route {route_names}"
+        if not jobs:
+            return f"OK {message}. Used from the next report"
+        return self.run_jobs( jobs, f"{message}. Last reports" )
+
+    def run_jobs(self, jobs: list, description: str) -> str:
+        start_time = time.time()
+        for job in jobs:
+            self.scheduler.submit( job )
+
+        for job in jobs:
+            if not job.done_event.wait( max( 0.0, start_time + control_timeout_secs - time.time() ) ):
+                return f"ERROR {description}: still running after {control_timeout_secs:.0f}s"
+
+        num_files = sum( job.num_files for job in jobs )
+        statuses = sorted( set( job.status for job in jobs ) )
+        done_secs = time.time() - start_time
+        if statuses != ['completed']:
+            return f"ERROR {description}: {', '.join(statuses)} in {done_secs * 1000:.1f}ms. See the watcher log"
+        return f"OK {description}: {num_files} files written in {done_secs * 1000:.1f}ms"
+
+
+#####################################################################################
+## Control command job: write the files for a report (or one of its events) again
+## from its kept pages, with the route's current render options
+#####################################################################################
+def render_parsed_report( parsed_report: ParsedReport, event_num: int, job: ReportJob ) -> bool:
+
+    render_args = copy.copy( parsed_report.args )
+    for option in gen_wc_files.render_options:
+        setattr( render_args, option, getattr( job.route.generate_args, option ) )
+
+    start_time = time.time()
+    job.status = "failed"
+    try:
+        job.num_files = gen_wc_files.render_parsed_pages( parsed_report.parsed_pages, render_args, event_num )
+        job.status = "completed"
+    except Exception:
+        logging.exception(f"ERROR: {os.path.basename(job.filepath)} files not written again")
+
+    print(f"INFO: {os.path.basename(job.filepath)} ({job.route.name}): control command, "
+          f"{job.num_files} files written again in {time.time() - start_time:.3f}s")
+    return True
+
+
+#####################################################################################
+## Only .txt files other than the schools.txt reference file are reports
+#####################################################################################
+def is_report_file( filepath: str ) -> bool:
 
-    input_dir_name = os.path.dirname(filepath).replace(os.sep,'/')
     input_file_name = os.path.basename(filepath)
     input_file_extension = pathlib.Path(input_file_name).suffix
 
-    if input_file_extension == '.txt':
+    ## Our own files, like the manifest
+    if input_file_name.startswith('.'):
+        return False
 
-        # schools.txt is required for processing, but its just an input file so nothing to do here
-        if input_file_name != 'schools.txt':
+    if input_file_extension != '.txt':
+        print(f"WARNING: Filetype not '.txt'. Ignorning file {input_file_name}")
+        return False
 
-            ## Define the python application to call when a new report file has been created
-            external_app = ['python', 'c:/Users/SetonSwimTeam/git/sst-mm-to-wirecast/python/generate_wirecast_files.py']
+    # schools.txt is required for processing, but its just an input file so nothing to do here
+    if input_file_name == 'schools.txt':
+        print(f"INFO: Found file {input_file_name}: ignoring as its a reference file")
+        return False
 
-            ## Automatically generate input directory and input filename based on file that was just created
-            arg_list = ['-i', input_dir_name, '-f', input_file_name]
-            external_app.extend( arg_list )
+    return True
+
+
+#####################################################################################
+## Automatically generate input directory and input filename based on file that was just created
+## and add the command line arguments passed through from the watcher
+#####################################################################################
+def get_generate_arg_list( filepath: str, generate_argv: list ) -> list:
+
+    input_dir_name = os.path.dirname(filepath).replace(os.sep,'/')
+    input_file_name = os.path.basename(filepath)
+
+    arg_list = ['-i', input_dir_name, '-f', input_file_name]
+    arg_list.extend( generate_argv )
+
+    return arg_list
+
+
+#####################################################################################
+## Run generate_wirecast_files as a separate process.  Returns False if the run
+## was stopped because a newer save superseded it
+#####################################################################################
+def generate_wirecast_files( filepath, generate_argv: list, cancel_event: threading.Event ) -> bool:
+
+    ## Define the python application to call when a new report file has been created
+    external_app = ['python', 'c:/Users/SetonSwimTeam/git/sst-mm-to-wirecast/python/generate_wirecast_files.py']
+    external_app.extend( get_generate_arg_list( filepath, generate_argv ) )
+
+    input_file_name = os.path.basename(filepath)
+    print(f"INFO: New file CREATION detected on filename {input_file_name}")
+    process = subprocess.Popen(external_app)
+    while process.poll() is None:
+        if cancel_event.wait( 0.05 ):
+            process.terminate()
+            process.wait()
+            print(f"INFO: {input_file_name}: stopped, superseded by a newer save")
+            return False
+
+    return True
+
+
+#####################################################################################
+## Daemon mode: run the report pipeline in this process and report the latency
+## from the report file being written to the wirecast files being written.
+## Returns False if the run was stopped because a newer save superseded it.
+## The outputs of a successful run are saved to the manifest
+#####################################################################################
+def generate_wirecast_files_in_process( job: ReportJob ) -> bool:
+
+    filepath = job.filepath
+    manifest = job.route.manifest
+    input_file_name = os.path.basename(filepath)
+    print(f"INFO: New file CREATION detected on filename {input_file_name}")
+
+    try:
+        last_write_time = os.stat(filepath).st_mtime
+        report_sha256 = job.sha256
+        if manifest is not None and report_sha256 is None:
+            report_sha256 = sst_manifest.compute_file_sha256( filepath )
+    except FileNotFoundError:
+        print(f"WARNING: {input_file_name} was removed before it could be processed")
+        job.status = "skipped"
+        return True
+
+    start_time = time.time()
+    num_files = 0
+    job.status = "failed"
+    try:
+        previous_run = job.route.parsed_reports.get( job.report_kind )
+        if previous_run is not None and previous_run.filepath != filepath:
+            previous_run = None
+        num_files = gen_wc_files.generate_wc_files_from_args( job.route.get_report_args( filepath ), job.cancel_event, keep_parsed_pages=True, previous_run=previous_run )
+        job.status = "completed"
+        job.num_files = num_files
+        job.route.parsed_reports[job.report_kind] = ParsedReport( filepath, sst_common.run_state.args, sst_common.run_state.parsed_pages,
+                                                                  sst_common.run_state.page_hashes )
+    except sst_common.ReportCancelled:
+        print(f"INFO: {input_file_name}: stopped, superseded by a newer save")
+        job.status = "cancelled"
+    except SystemExit as se:
+        ## generate_wc_files exits on bad input. Don't take the daemon down with it
+        print(f"ERROR: {input_file_name} not processed (exit code {se.code})")
+    except Exception:
+        logging.exception(f"ERROR: {input_file_name} failed to process")
+    done_time = time.time()
+
+    record_run_metrics( job, done_time - start_time )
+    if job.status == "cancelled":
+        return False
+    if job.status == "failed":
+        return True
+
+    if manifest is not None:
+        manifest.record( filepath, report_sha256, sst_common.run_state.files_written )
+
+    print(f"INFO: {input_file_name} ({job.route.name}): {num_files} files written. "
+          f"Latency {done_time - job.detected_time:.3f}s from file creation "
+          f"(wait {start_time - job.detected_time:.3f}s, process {done_time - start_time:.3f}s, {done_time - last_write_time:.3f}s after last write)")
+
+    return True
+
+
+#####################################################################################
+## Add the counters the pipeline kept for this run (sst_common.run_state.stats) to
+## the metrics.  Failed runs are counted too, they are usually why the
+## unmatched school and unparsed line counters go up
+#####################################################################################
+def record_run_metrics( job: ReportJob, process_secs: float ):
+
+    report_kind = job.report_kind
+    metric_reports_processed.inc( report_kind, job.status )
+
+    ## Taken so a run that fails before start_run() can't count the last run's stats again
+    run_stats = getattr( sst_common.run_state, 'stats', None ) or {}
+    sst_common.run_state.stats = None
+
+    metric_files_written.inc( report_kind, amount=run_stats.get( 'files_written', 0 ) )
+    metric_files_skipped.inc( report_kind, amount=run_stats.get( 'files_skipped', 0 ) )
+    metric_unmatched_schools.inc( report_kind, amount=run_stats.get( 'unmatched_schools', 0 ) )
+    metric_lines_unparsed.inc( report_kind, amount=run_stats.get( 'lines_unparsed', 0 ) )
+    metric_lines_parsed.inc( report_kind, "columns", amount=run_stats.get( 'lines_fixed_width', 0 ) )
+    metric_lines_parsed.inc( report_kind, "regex", amount=run_stats.get( 'lines_regex', 0 ) )
+    metric_parse_cache.inc( report_kind, "hit", amount=run_stats.get( 'parse_cache_hits', 0 ) )
+    metric_parse_cache.inc( report_kind, "miss", amount=run_stats.get( 'parse_cache_misses', 0 ) )
+    metric_parse_cache.inc( report_kind, "evicted", amount=run_stats.get( 'parse_cache_evictions', 0 ) )
+    metric_incremental.inc( report_kind, "regenerated", amount=run_stats.get( 'incremental_regenerated', 0 ) )
+    metric_incremental.inc( report_kind, "unchanged", amount=run_stats.get( 'incremental_unchanged', 0 ) )
+
+    ## Only runs with --parsecoverage have them
+    coverage = getattr( sst_common.run_state, 'coverage', None )
+    sst_common.run_state.coverage = None
+    if coverage is not None:
+        for parser_name, line_kinds in coverage.lines.items():
+            for line_kind, line_counts in line_kinds.items():
+                for outcome, amount in line_counts.items():
+                    metric_parse_lines.inc( report_kind, parser_name, line_kind, outcome, amount=amount )
+        for pattern_name, pattern_counts in coverage.patterns.items():
+            metric_pattern_calls.inc( report_kind, pattern_name, "match", amount=pattern_counts['matches'] )
+            metric_pattern_calls.inc( report_kind, pattern_name, "nomatch", amount=pattern_counts['calls'] - pattern_counts['matches'] )
+            metric_pattern_secs.inc( report_kind, pattern_name, amount=pattern_counts['secs'] )
+
+    if job.status == "completed":
+        render_secs = run_stats.get( 'render_secs', 0.0 )
+        metric_render_secs.observe( render_secs, report_kind )
+        metric_parse_secs.observe( max( 0.0, process_secs - render_secs ), report_kind )
+        metric_report_latency.observe( time.time() - job.detected_time, report_kind )
+
+
+#####################################################################################
+## Options for the watcher itself. Everything else is passed to generate_wirecast_files
+## Long options only so they never collide with the generate_wirecast_files options
+#####################################################################################
+def get_watcher_arg_parser() -> argparse.ArgumentParser:
+
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('--watchdir',   dest='watchdir',    default=r'C:\Users\SetonSwimTeam\Dropbox\wc_meetreports',
+                                                                                                help="Meet Manager report directory to watch")
+    parser.add_argument('--daemon',     dest='daemon',      action='store_true',                help="Process reports in this process instead of a new python process per report")
+    parser.add_argument('--debounce',   dest='debounce',    type=float, default=0.5,            help="Seconds to wait for more saves of the same report before processing it. 0 to disable")
+    parser.add_argument('--settlepolls',    dest='settlepolls',     type=int,   default=2,      help="Number of polls a report's size and mtime must be unchanged before processing it")
+    parser.add_argument('--settleinterval', dest='settleinterval',  type=float, default=0.05,   help="Seconds between settle polls")
+    parser.add_argument('--settletimeout',  dest='settletimeout',   type=float, default=10.0,   help="Process a report anyway if it is still changing after this many seconds")
+    parser.add_argument('--workers',    dest='workers',     type=int,   default=2,              help="Number of reports processed in parallel. Reports for the same output directory always run one at a time")
+    parser.add_argument('--backend',    dest='backend',     default='watchdog', choices=['watchdog', 'inotify', 'poll'],
+                                                                                                help="How to watch the directory. inotify: Linux only, lowest latency. poll: for a network share")
+    parser.add_argument('--pollinterval', dest='pollinterval', type=float, default=0.25,        help="Seconds between directory scans for the poll backend")
+    parser.add_argument('--reconcile',  dest='reconcile',   action=argparse.BooleanOptionalAction, default=True,
+                                                                                                help="With --daemon, regenerate reports with missing or out of date outputs on startup")
+    parser.add_argument('--manifest',   dest='manifest',    default=None,                       help="Manifest of processed reports. Default: .wirecast_manifest.json in WATCHDIR")
+    parser.add_argument('--journal',    dest='journal',     default=None,                       help="Directory to record every report ingested, with a snapshot of its content, and the outcome of every run. For replay_mm_reports.py")
+    parser.add_argument('--routes',     dest='routes',      default=None,                       help="JSON file of meets to serve, each with its own watch directory/meet name, output directory, schools file and options. Replaces --watchdir")
+    parser.add_argument('--metricsport', dest='metricsport', type=int,  default=0,               help="Serve metrics on http://127.0.0.1:PORT/metrics. 0 to disable")
+    parser.add_argument('--controlport', dest='controlport', type=int,  default=0,               help="With --daemon, take operator commands (control_mm_reports.py) on 127.0.0.1:PORT. 0 to disable")
+    parser.set_defaults(daemon=False)
+
+    return parser
+
+
+#####################################################################################
+## Load the routes file.  Each route's options are added after the command line
+## options passed through, so they override them:
+## { "routes": [ { "name":      "vcac",                  required
+##                 "watchdir":  "C:/meets/vcac",         required
+##                 "meetname":  "VCAC",                  regex on the report meet name, optional
+##                 "outputdir": "C:/wirecast/vcac",      -o, optional
+##                 "schools":   "schools.txt",           -s, optional. Relative to the report directory
+##                 "args":      [ "-C", "-a" ] }, ... ] } other generate_wirecast_files options, optional
+#####################################################################################
+def load_routes( routes_filename: str, generate_argv: list ) -> list:
+
+    try:
+        with open( routes_filename, "r" ) as routes_file:
+            route_configs = json.load( routes_file )["routes"]
+    except (OSError, ValueError, KeyError) as error:
+        print(f"ERROR: Can't read routes file {routes_filename}: {error}")
+        sys.exit(2)
+
+    routes = []
+    for route_config in route_configs:
+        if "name" not in route_config or "watchdir" not in route_config:
+            print(f"ERROR: {routes_filename}: every route needs a name and a watchdir: {route_config}")
+            sys.exit(2)
+
+        route_argv = list( generate_argv ) + list( route_config.get( "args", [] ) )
+        if "outputdir" in route_config:
+            route_argv.extend( ['-o', route_config["outputdir"]] )
+        if "schools" in route_config:
+            route_argv.extend( ['-s', route_config["schools"]] )
+
+        routes.append( Route( route_config["name"], route_config["watchdir"], route_argv, route_config.get( "meetname" ) ) )
+
+    return routes
 
-            ## Pull in command line argements
-            external_app.extend(sys.argv[1:])
-                
-            print(f"INFO: New file CREATION detected on filename {input_file_name}")
-            subprocess.run(external_app)
-        else:
-            print(f"INFO: Found file {input_file_name}: ignoring as its a reference file")
-    else:
-            print(f"WARNING: Filetype not '.txt'. Ignorning file {input_file_name}")
 
 if __name__ == "__main__":
-    w = Watcher(r'C:\Users\SetonSwimTeam\Dropbox\wc_meetreports')
-    w.run()
\ No newline at end of file
+    watcher_args, generate_argv = get_watcher_arg_parser().parse_known_args()
+    settler = FileSettler( watcher_args.settlepolls, watcher_args.settleinterval, watcher_args.settletimeout )
+    observer = create_observer( watcher_args.backend, watcher_args.pollinterval )
+
+    if watcher_args.routes:
+        routes = load_routes( watcher_args.routes, generate_argv )
+    else:
+        routes = [ Route( "default", watcher_args.watchdir, generate_argv ) ]
+
+    for route in routes:
+        print(f"INFO: route {route.name}: {route.watchdir}" +
+              (f" meet '{route.meet_name_pattern}'" if route.meet_name_pattern else "") +
+              f" -> {route.output_key}")
+        if not os.path.isdir( route.watchdir ):
+            print(f"WARNING: route {route.name}: watch directory {route.watchdir} not found")
+
+    ## The outputs written are only known when running in process.
+    ## One manifest per watched directory, shared by the routes for that directory
+    if watcher_args.daemon and watcher_args.reconcile:
+        manifests = {}
+        for route in routes:
+            if route.watchdir not in manifests:
+                manifest_filename = os.path.join( route.watchdir, '.wirecast_manifest.json' )
+                if watcher_args.manifest and not watcher_args.routes:
+                    manifest_filename = watcher_args.manifest
+                manifests[route.watchdir] = sst_manifest.ReportManifest( manifest_filename )
+            route.manifest = manifests[route.watchdir]
+
+    if watcher_args.metricsport:
+        if sst_metrics.start_metrics_server( watcher_args.metricsport ) is not None:
+            print(f"INFO: metrics on http://127.0.0.1:{watcher_args.metricsport}/metrics")
+
+    journal = sst_journal.ReportJournal( watcher_args.journal ) if watcher_args.journal else None
+
+    ## Control commands use the pages kept from the reports run in process
+    if watcher_args.controlport and not watcher_args.daemon:
+        print(f"WARNING: --controlport needs --daemon. Control commands disabled")
+        watcher_args.controlport = 0
+
+    w = Watcher( ReportRouter( routes ), watcher_args.daemon, watcher_args.debounce, settler, watcher_args.workers, observer, journal, watcher_args.controlport )
+    w.run()